@@ -0,0 +1,25 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Standalone benchmarks that run without Source.Python.
+
+geometry_primitives.py
+    Construction cost of the classes/geometry.py primitives.
+jail_map
+    Area lookups, map loading and occupancy on synthetic jail maps.
+stage_engine
+    Checks and times complete game lifecycles on classes/stage_engine.
+"""
@@ -0,0 +1,143 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Micro-benchmark of geometry primitive construction and area tests.
+
+Compares the way player positions used to be built
+(Point(tuple(origin)) + Vector(0, 0, offset)) with the from_xyz() and
+offset() fast paths, and the old `point in area` test with the
+contains_xyz() path that jail_map uses for players now.
+
+from_xyz() and offset() mostly save time. __slots__ makes a Point a bit
+smaller, but the result still costs an object and three floats. The
+allocations only go away when no Point is built at all, so compare the
+area cases in the bytes/call column. That column is the peak of memory
+allocated during a call, temporaries included.
+
+classes/geometry.py has no Source.Python imports, so this runs with a
+plain interpreter:
+
+    python benchmarks/geometry_primitives.py [path/to/geometry.py]
+"""
+
+import os
+import sys
+import tracemalloc
+from importlib.util import module_from_spec, spec_from_file_location
+from timeit import repeat
+
+
+GEOMETRY_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'srcds', 'addons',
+    'source-python', 'plugins', 'arcjail', 'classes', 'geometry.py')
+
+ORIGIN = (1024.5, -512.25, 64.0)
+ORIGIN_OFFSET_Z = 64.0
+
+# A 2048 units cube around the origin, as a compiled ConvexArea
+AREA_COEFFICIENTS = (
+    (1.0, 0.0, 0.0, -1024.0), (-1.0, 0.0, 0.0, -1024.0),
+    (0.0, 1.0, 0.0, -1024.0), (0.0, -1.0, 0.0, -1024.0),
+    (0.0, 0.0, 1.0, -1024.0), (0.0, 0.0, -1.0, -1024.0),
+)
+AREA_BOUNDS = ((-1024.0, -1024.0, -1024.0), (1024.0, 1024.0, 1024.0))
+
+NUMBER = 100000
+REPEAT = 5
+ALLOCATION_CALLS = 1000
+
+
+def load_geometry(path):
+    spec = spec_from_file_location('geometry', path)
+    module = module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def get_cases(geometry):
+    Point, Vector = geometry.Point, geometry.Vector
+    origin = ORIGIN
+
+    cases = [
+        ('legacy: Point(tuple) + Vector',
+         lambda: Point(tuple(origin)) + Vector(0, 0, ORIGIN_OFFSET_Z)),
+        ('legacy: Point(x, y, z)', lambda: Point(*origin)),
+    ]
+
+    if hasattr(Point, 'from_xyz'):
+        offset = Vector.from_xyz(0.0, 0.0, ORIGIN_OFFSET_Z)
+        cases.extend((
+            ('fast: Point.from_xyz().offset()',
+             lambda: Point.from_xyz(*origin).offset(
+                 0.0, 0.0, ORIGIN_OFFSET_Z)),
+            ('fast: Point.from_xyz() + Vector',
+             lambda: Point.from_xyz(*origin) + offset),
+            ('fast: Point.from_xyz()', lambda: Point.from_xyz(*origin)),
+        ))
+
+    if hasattr(geometry.ConvexArea, 'from_compiled'):
+        area = geometry.ConvexArea.from_compiled(
+            (0.0, 0.0, 0.0), AREA_COEFFICIENTS, AREA_BOUNDS)
+
+        def get_xyz():
+            # Same as jail_map.get_player_xyz()
+            x, y, z = origin
+            return x, y, z + ORIGIN_OFFSET_Z
+
+        cases.extend((
+            ('area: Point(tuple) + Vector in area',
+             lambda: Point(tuple(origin)) + Vector(
+                 0, 0, ORIGIN_OFFSET_Z) in area),
+            ('area: contains_xyz(*get_xyz())',
+             lambda: area.contains_xyz(*get_xyz())),
+        ))
+
+    return cases
+
+
+def measure_time(func):
+    return min(repeat(func, number=NUMBER, repeat=REPEAT)) / NUMBER
+
+
+def measure_allocation(func):
+    """Return the average peak of bytes allocated during a call.
+
+    Temporaries count as well as the result.
+    """
+    total = 0
+    for i in range(ALLOCATION_CALLS):
+        tracemalloc.start()
+        try:
+            func()
+            total += tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return total / ALLOCATION_CALLS
+
+
+def main(argv):
+    path = argv[1] if len(argv) > 1 else GEOMETRY_PATH
+    geometry = load_geometry(path)
+
+    print("{:<36} {:>10} {:>12}".format("case", "ns/call", "bytes/call"))
+    for name, func in get_cases(geometry):
+        print("{:<36} {:>10.0f} {:>12.0f}".format(
+            name, measure_time(func) * 1e9, measure_allocation(func)))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
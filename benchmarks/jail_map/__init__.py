@@ -0,0 +1,26 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Benchmarks of map areas on synthetic jail maps.
+
+Generates mapdata with N areas x M structures x K faces and random player
+movement, then times area lookups, map loading and occupancy refreshes
+of modules/jail_map.py. Source.Python is replaced with the stubs in
+stubs.py. Run from the repository root:
+
+    python -m benchmarks.jail_map --output results.json
+    python -m benchmarks.jail_map --baseline results.json
+"""
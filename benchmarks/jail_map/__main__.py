@@ -0,0 +1,82 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import sys
+from argparse import ArgumentParser
+
+from .suite import compare, Suite
+
+
+def format_duration(seconds):
+    if seconds < 1e-3:
+        return "{:.2f}us".format(seconds * 1e6)
+
+    return "{:.2f}ms".format(seconds * 1e3)
+
+
+def main(argv=None):
+    parser = ArgumentParser(prog='python -m benchmarks.jail_map')
+    parser.add_argument('--areas', type=int, default=100)
+    parser.add_argument('--structures', type=int, default=3)
+    parser.add_argument('--faces', type=int, default=6)
+    parser.add_argument('--players', type=int, default=64)
+    parser.add_argument('--ticks', type=int, default=64)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write the results to this file")
+    parser.add_argument(
+        '--baseline', help="Compare the results with this results file")
+    parser.add_argument(
+        '--tolerance', type=float, default=0.2,
+        help="Allowed slowdown relative to the baseline (default 0.2)")
+
+    args = parser.parse_args(argv)
+
+    suite = Suite(args.areas, args.structures, args.faces, args.players,
+                  args.ticks, args.repeat, args.seed)
+    suite.run()
+    report = suite.get_report()
+
+    for name, result in sorted(report['results'].items()):
+        print("{:<32} {:>12} {:>12}".format(
+            name, format_duration(result['median']),
+            "(min {})".format(format_duration(result['min']))))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        if baseline['params'] != report['params']:
+            print("Warning: baseline was recorded with different "
+                  "parameters: {}".format(baseline['params']))
+
+        regressions = compare(report, baseline, args.tolerance)
+        for name in regressions:
+            print("Regression: {} is more than {:.0%} slower".format(
+                name, args.tolerance))
+
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
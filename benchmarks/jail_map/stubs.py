@@ -0,0 +1,146 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Minimal stand-ins for the Source.Python modules jail_map imports.
+
+install() registers them in sys.modules and returns the stubbed
+global_vars and player_manager so benchmarks can drive them.
+"""
+
+import os
+import sys
+from types import ModuleType, SimpleNamespace
+
+
+PLUGINS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'srcds',
+    'addons', 'source-python', 'plugins')
+
+
+class Path(str):
+    """The parts of path.py's Path that jail_map uses."""
+    def __truediv__(self, other):
+        return Path(os.path.join(self, other))
+
+    def __add__(self, other):
+        return Path(str(self) + other)
+
+    def isfile(self):
+        return os.path.isfile(self)
+
+
+class ConfigManager(dict):
+    def controlled_cvar(self, handler, name, default=None, description=''):
+        self[name] = default
+
+
+class Logger:
+    def __init__(self):
+        self.messages = []
+
+    def __getattr__(self, name):
+        def log(message, *args, **kwargs):
+            self.messages.append((name, message))
+
+        return log
+
+
+class Player:
+    def __init__(self, index, origin):
+        self.index = index
+        self.origin = origin
+
+    def __repr__(self):
+        return "Player({})".format(self.index)
+
+
+class PlayerManager(dict):
+    pass
+
+
+class Event:
+    """events.Event; resource/profiler.py subclasses it."""
+    def __init__(self, *event_names):
+        self._event_names = event_names
+
+    def __call__(self, callback):
+        return callback
+
+
+def _listener_decorator(*args):
+    def decorator(func):
+        return func
+
+    # Used both as @OnTick and as @ServerCommand('name')
+    if len(args) == 1 and callable(args[0]):
+        return args[0]
+
+    return decorator
+
+
+def _add_module(name, path=None, **attrs):
+    module = ModuleType(name)
+    if path is not None:
+        module.__path__ = [path]
+
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def install(data_path):
+    """Stub Source.Python and return (global_vars, player_manager)."""
+    global_vars = SimpleNamespace(map_name='bench_map', tick_count=0)
+    player_manager = PlayerManager()
+
+    _add_module('commands')
+    _add_module('commands.server', ServerCommand=_listener_decorator)
+    _add_module('core', echo_console=lambda text: None)
+    _add_module('engines')
+    _add_module('engines.server', global_vars=global_vars)
+    _add_module('events', Event=Event)
+    _add_module('listeners', OnTick=_listener_decorator)
+    _add_module(
+        'mathlib', QAngle=lambda *args: tuple(args),
+        Vector=lambda *args: tuple(args))
+    _add_module('path', Path=Path)
+    _add_module('advanced_ts', BaseLangStrings=lambda *args: {})
+    _add_module('controlled_cvars')
+    _add_module('controlled_cvars.handlers', int_handler=int)
+
+    arcjail_path = os.path.join(PLUGINS_PATH, 'arcjail')
+    _add_module('arcjail', arcjail_path)
+    _add_module('arcjail.info', info=SimpleNamespace(basename='arcjail'))
+    _add_module(
+        'arcjail.resource', os.path.join(arcjail_path, 'resource'))
+    _add_module('arcjail.resource.logger', logger=Logger())
+    _add_module(
+        'arcjail.resource.paths',
+        ARCJAIL_DATA_PATH=Path(data_path),
+        MAPDATA_PATH=Path(data_path),
+        MAP_TRANSLATION_PATH=Path(data_path),
+    )
+    _add_module(
+        'arcjail.modules', os.path.join(arcjail_path, 'modules'),
+        build_module_config=lambda path: ConfigManager(),
+    )
+    _add_module(
+        'arcjail.modules.ent_fire',
+        new_output_connection=lambda connection_json: None,
+    )
+    _add_module('arcjail.modules.players', player_manager=player_manager)
+
+    return global_vars, player_manager
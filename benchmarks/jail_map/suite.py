@@ -0,0 +1,230 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+"""The benchmarks themselves and their JSON results."""
+
+import json
+import os
+import platform
+import sys
+from importlib import import_module
+from statistics import median
+from tempfile import mkdtemp
+from time import perf_counter, time
+
+from . import stubs
+from .synthetic import make_map_data, make_origin_stream
+
+
+class Suite:
+    def __init__(self, areas, structures, faces, players, ticks, repeat,
+                 seed=0):
+
+        self.params = {
+            'areas': areas,
+            'structures': structures,
+            'faces': faces,
+            'players': players,
+            'ticks': ticks,
+            'repeat': repeat,
+            'seed': seed,
+        }
+        self.repeat = repeat
+
+        self._data_path = mkdtemp(prefix='arcjail-bench-')
+        self.global_vars, self.player_manager = stubs.install(
+            self._data_path)
+
+        self.geometry = import_module('arcjail.classes.geometry')
+        self.jail_map = import_module('arcjail.modules.jail_map')
+
+        self.data = make_map_data(areas, structures, faces, seed)
+        self.stream = make_origin_stream(self.data, players, ticks, seed)
+
+        self._json_path = os.path.join(self._data_path, 'bench_map.json')
+        self._cache_path = os.path.join(self._data_path, 'bench_map.cache')
+        with open(self._json_path, 'w') as f:
+            json.dump(self.data, f)
+
+        self.results = {}
+
+    def measure(self, name, func, count=1, setup=None):
+        """Time func() self.repeat times, record seconds per operation.
+
+        count is how many operations one call of func performs.
+        """
+        samples = []
+        for i in range(self.repeat):
+            if setup is not None:
+                setup()
+
+            start = perf_counter()
+            func()
+            samples.append((perf_counter() - start) / count)
+
+        self.results[name] = {
+            'min': min(samples),
+            'median': median(samples),
+            'count': count,
+        }
+
+    def _remove_cache(self):
+        if os.path.exists(self._cache_path):
+            os.remove(self._cache_path)
+
+    def bench_map_load(self):
+        self.measure(
+            'map_load_cold', self.jail_map.reload_map_info,
+            setup=self._remove_cache)
+
+        # Leaves a cache behind for the warm load
+        self.jail_map.reload_map_info()
+        self.measure('map_load_cached', self.jail_map.reload_map_info)
+
+        self.measure('map_update_unchanged', self.jail_map.update_map_info)
+
+    def bench_contains(self):
+        Point = self.geometry.Point
+        structures = [
+            structure
+            for area in self.jail_map.MapData.areas.values()
+            for structure in area.structures
+        ]
+        xyz = [self.jail_map.get_player_xyz(stubs.Player(0, origin))
+               for origin in self.stream[0]]
+        points = [Point.from_xyz(*point) for point in xyz]
+
+        def contains():
+            for point in points:
+                for structure in structures:
+                    point in structure
+
+        def contains_xyz():
+            for x, y, z in xyz:
+                for structure in structures:
+                    structure.contains_xyz(x, y, z)
+
+        count = len(points) * len(structures)
+        self.measure('convex_area_contains', contains, count)
+        self.measure('convex_area_contains_xyz', contains_xyz, count)
+
+        compiled_areas = self.jail_map.MapData.compiled_areas
+        self.measure(
+            'area_set_test', lambda: compiled_areas.test(xyz), len(xyz))
+        self.measure(
+            'area_set_test_dense',
+            lambda: compiled_areas.test_dense(xyz), len(xyz))
+        self.measure(
+            'area_set_signed_distances',
+            lambda: compiled_areas.signed_distances(xyz), len(xyz))
+
+        next_xyz = [self.jail_map.get_player_xyz(stubs.Player(0, origin))
+                    for origin in self.stream[-1]]
+
+        def intersect_segment():
+            for start, end in zip(xyz, next_xyz):
+                compiled_areas.intersect_segment(start, end)
+
+        self.measure(
+            'area_set_intersect_segment', intersect_segment, len(xyz))
+
+    def _set_origins(self, origins):
+        for player, origin in zip(self.player_manager.values(), origins):
+            player.origin = origin
+
+    def bench_occupancy(self):
+        self.player_manager.clear()
+        for index, origin in enumerate(self.stream[0], 1):
+            self.player_manager[index] = stubs.Player(index, origin)
+
+        jail_map = self.jail_map
+        global_vars = self.global_vars
+
+        def refresh():
+            jail_map.area_occupancy.reset()
+            for origins in self.stream:
+                global_vars.tick_count += 1
+                self._set_origins(origins)
+                jail_map.area_occupancy.refresh()
+
+        self.measure('occupancy_refresh', refresh, len(self.stream))
+
+        # The OnTick path, which also fires area enter/leave events
+        def sample():
+            jail_map.area_occupancy.reset()
+            for origins in self.stream:
+                global_vars.tick_count += 1
+                self._set_origins(origins)
+                jail_map.area_occupancy.sample()
+
+        self.measure('occupancy_sample', sample, len(self.stream))
+
+        players = list(self.player_manager.values())
+
+        def get_player_areas():
+            for player in players:
+                jail_map.get_player_areas(player)
+
+        self.measure(
+            'get_player_areas_same_tick', get_player_areas, len(players))
+
+        area_names = list(jail_map.MapData.areas)
+
+        def get_players_in_area():
+            for area_name in area_names:
+                jail_map.get_players_in_area(area_name)
+
+        self.measure(
+            'get_players_in_area_same_tick', get_players_in_area,
+            len(area_names))
+
+    def run(self):
+        self.bench_map_load()
+        self.bench_contains()
+        self.bench_occupancy()
+
+    def get_report(self):
+        try:
+            import numpy
+            numpy_version = numpy.__version__
+        except ImportError:
+            numpy_version = None
+
+        return {
+            'time': time(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'numpy': numpy_version,
+            'params': self.params,
+            'results': self.results,
+        }
+
+
+def compare(report, baseline, tolerance):
+    """Return names of results that are slower than in baseline.
+
+    Medians are compared. A result regressed if it's more than tolerance
+    (a fraction) slower. Results missing in either report are skipped.
+    """
+    regressions = []
+    for name, result in sorted(report['results'].items()):
+        baseline_result = baseline['results'].get(name)
+        if baseline_result is None:
+            continue
+
+        if result['median'] > baseline_result['median'] * (1 + tolerance):
+            regressions.append(name)
+
+    return regressions
@@ -0,0 +1,126 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Synthetic mapdata and player movement."""
+
+from math import cos, pi, sin
+from random import Random
+
+
+MAP_SIZE = 8192
+STRUCTURE_RADIUS = (64, 384)
+STRUCTURE_HEIGHT = (128, 512)
+AREA_SPREAD = 768
+PLAYER_SPEED = 16
+
+
+def format_point(point):
+    return "{:.3f} {:.3f} {:.3f}".format(*point)
+
+
+def make_prism(center, radius, z0, z1, faces):
+    """Return the sides of a vertical prism with the given face count.
+
+    The base is a regular polygon of faces - 2 corners. Every side is
+    given by 3 of its vertices, the way the mapdata stores it.
+    """
+    cx, cy = center
+    corners = []
+    for i in range(faces - 2):
+        angle = 2 * pi * i / (faces - 2)
+        corners.append((cx + radius * cos(angle), cy + radius * sin(angle)))
+
+    def side(*points):
+        return "({})".format(") (".join(map(format_point, points)))
+
+    (x0, y0), (x1, y1), (x2, y2) = corners[:3]
+    sides = [
+        side((x0, y0, z0), (x1, y1, z0), (x2, y2, z0)),
+        side((x0, y0, z1), (x1, y1, z1), (x2, y2, z1)),
+    ]
+    for i, (x0, y0) in enumerate(corners):
+        x1, y1 = corners[(i + 1) % len(corners)]
+        sides.append(side((x0, y0, z0), (x1, y1, z0), (x0, y0, z1)))
+
+    return sides
+
+
+def make_map_data(areas, structures, faces, seed=0):
+    """Return mapdata JSON with areas x structures x faces."""
+    if faces < 5:
+        raise ValueError("A structure needs at least 5 faces")
+
+    random = Random(seed)
+    half_size = MAP_SIZE / 2
+
+    data = {
+        'areas': {},
+        'spawnpoints': {},
+        'cages': [],
+        'jails': [],
+    }
+    for area_index in range(areas):
+        area_center = (random.uniform(-half_size, half_size),
+                       random.uniform(-half_size, half_size))
+
+        area_structures = []
+        for structure_index in range(structures):
+            center = (
+                area_center[0] + random.uniform(-AREA_SPREAD, AREA_SPREAD),
+                area_center[1] + random.uniform(-AREA_SPREAD, AREA_SPREAD),
+            )
+            z0 = random.uniform(-256, 256)
+            z1 = z0 + random.uniform(*STRUCTURE_HEIGHT)
+            area_structures.append(make_prism(
+                center, random.uniform(*STRUCTURE_RADIUS), z0, z1, faces))
+
+        area_name = 'area{}'.format(area_index)
+        data['areas'][area_name] = {'structures': area_structures}
+
+        data['spawnpoints']['spawn{}'.format(area_index)] = {
+            'origin': format_point(area_center + (0.0, )),
+            'angles': "0 0 0",
+        }
+
+        if area_index % 4 == 0:
+            data['cages'].append(area_name)
+
+    return data
+
+
+def make_origin_stream(data, players, ticks, seed=0):
+    """Return per tick lists of player origins.
+
+    Players start at area spawnpoints and wander around, so they keep
+    crossing area borders.
+    """
+    random = Random(seed)
+    spawnpoints = [
+        tuple(map(float, spawnpoint['origin'].split()))
+        for spawnpoint in data['spawnpoints'].values()
+    ] or [(0.0, 0.0, 0.0)]
+
+    origins = [random.choice(spawnpoints) for i in range(players)]
+    stream = []
+    for tick in range(ticks):
+        origins = [
+            (x + random.uniform(-PLAYER_SPEED, PLAYER_SPEED),
+             y + random.uniform(-PLAYER_SPEED, PLAYER_SPEED),
+             z)
+            for x, y, z in origins
+        ]
+        stream.append(origins)
+
+    return stream
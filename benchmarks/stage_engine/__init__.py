@@ -0,0 +1,27 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Game lifecycle harness for classes/stage_engine.
+
+Runs complete games (init, event handling, pushes, undo and destroy) on
+the shared stage engine with several instances of the same class alive
+at once, then a MapGame subclass through the real games base classes
+from prepare countdown to destroy. Checks the stages that ran, then
+times whole lifecycles. Source.Python and the modules the games import
+are replaced with the stubs in stubs.py. Run from the repository root:
+
+    python -m benchmarks.stage_engine
+"""
@@ -0,0 +1,56 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+from argparse import ArgumentParser
+
+from ..jail_map.__main__ import format_duration
+from .lifecycle import Harness
+
+
+def main(argv=None):
+    parser = ArgumentParser(prog='python -m benchmarks.stage_engine')
+    parser.add_argument('--lifecycles', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+
+    args = parser.parse_args(argv)
+
+    harness = Harness()
+
+    failures = harness.check()
+    for failure in failures:
+        print("FAIL: {}".format(failure))
+
+    if failures:
+        return 1
+
+    print("Lifecycle checks passed")
+
+    for name, run_lifecycle in (
+            ('two-game lifecycle', harness.run_lifecycle),
+            ('MapGame lifecycle', harness.map_game_harness.run_lifecycle)):
+
+        median_duration, min_duration = harness.time_lifecycles(
+            args.lifecycles, args.repeat, run_lifecycle)
+
+        print("{:<32} {:>12} {:>12}".format(
+            name, format_duration(median_duration),
+            "(min {})".format(format_duration(min_duration))))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,226 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Game classes the harness runs and the checks of their lifecycle."""
+
+from importlib import import_module
+from statistics import median
+from time import perf_counter
+
+from . import stubs
+from .map_game import MapGameHarness
+
+
+def build_game_classes(stage_engine):
+    """Return (LifecycleGame, BonusLifecycleGame) built on the engine."""
+    stage = stage_engine.stage
+    game_event_handler = stage_engine.game_event_handler
+    game_internal_event_handler = stage_engine.game_internal_event_handler
+    push = stage_engine.push
+
+    class LifecycleGame(stage_engine.StageEngine):
+        stage_groups = {
+            'init': [
+                "register-event-handlers",
+                "prepare",
+                "start",
+            ],
+            'round-won': [
+                "finish",
+            ],
+            'destroy': [
+                "destroy",
+            ],
+        }
+
+        def __init__(self, name, target_userid, log):
+            super().__init__()
+
+            self.name = name
+            self.target_userid = target_userid
+            self.log = log
+            self.pushes = {}
+
+        def record(self, entry):
+            self.log.append((self.name, entry))
+
+        @stage('register-event-handlers')
+        def stage_register_event_handlers(self):
+            self.register_event_handlers()
+            self.pushes = self.bind_push_handlers()
+
+        @stage('undo-register-event-handlers')
+        def stage_undo_register_event_handlers(self):
+            self.unregister_event_handlers()
+            self.record('undo-register-event-handlers')
+
+        @stage('prepare')
+        def stage_prepare(self):
+            self.record('prepare')
+
+        @stage('undo-prepare')
+        def stage_undo_prepare(self):
+            self.record('undo-prepare')
+
+        @stage('start')
+        def stage_start(self):
+            self.record('start')
+
+        @stage('finish')
+        def stage_finish(self):
+            self.record('finish')
+            self.set_stage_group('destroy')
+
+        @stage('destroy')
+        def stage_destroy(self):
+            self.undo_stages()
+            self._lock_stage_queue = True
+            self.record('destroy')
+
+        @game_event_handler('lifecycle-player-death', 'player_death')
+        def event_player_death(self, game_event):
+            self.record(('player_death', game_event['userid']))
+            if game_event['userid'] == self.target_userid:
+                self.set_stage_group('round-won')
+
+        @game_internal_event_handler(
+            'lifecycle-player-deleted', 'player_deleted')
+        def event_player_deleted(self, player):
+            self.record(('player_deleted', player))
+
+        @push(None, 'finish')
+        def push_finish(self, args):
+            self.record(('push', args))
+            self.set_stage_group('round-won')
+
+    class BonusLifecycleGame(LifecycleGame):
+        stage_groups = {
+            'bonus': [
+                "bonus",
+            ],
+        }
+
+        @stage('start')
+        def stage_start(self):
+            self.record('start')
+            self.insert_stage_group('bonus')
+
+        @stage('bonus')
+        def stage_bonus(self):
+            self.record('bonus')
+
+    return LifecycleGame, BonusLifecycleGame
+
+
+EXPECTED_LOG = [
+    ('a', 'prepare'),
+    ('a', 'start'),
+    ('b', 'prepare'),
+    ('b', 'start'),
+    ('b', 'bonus'),
+    ('a', ('player_death', 1)),
+    ('a', 'finish'),
+    ('a', 'undo-register-event-handlers'),
+    ('a', 'undo-prepare'),
+    ('a', 'destroy'),
+    ('b', ('player_death', 1)),
+    ('b', ('player_deleted', 'player-1')),
+    ('b', ('push', 'push-args')),
+    ('b', 'finish'),
+    ('b', 'undo-register-event-handlers'),
+    ('b', 'undo-prepare'),
+    ('b', 'destroy'),
+]
+
+
+class Harness:
+    def __init__(self):
+        self.event_manager = stubs.install()
+
+        self.stage_engine = import_module('arcjail.classes.stage_engine')
+        self.internal_events = import_module('arcjail.internal_events')
+
+        self.game_class, self.bonus_game_class = build_game_classes(
+            self.stage_engine)
+
+        self.map_game_harness = MapGameHarness(self.event_manager)
+
+        # Modules register their own handlers on import (timer_wheel)
+        self.internal_handlers = dict(
+            self.internal_events.internal_event_manager)
+
+    def run_lifecycle(self):
+        """Run two overlapping games and return the log of both."""
+        log = []
+        game_a = self.game_class('a', 1, log)
+        game_b = self.bonus_game_class('b', 2, log)
+
+        game_a.set_stage_group('init')
+        game_b.set_stage_group('init')
+
+        self.event_manager.fire('player_death', {'userid': 1})
+        self.internal_events.InternalEvent.fire(
+            'player_deleted', player='player-1')
+
+        game_b.pushes[(None, 'finish')]('push-args')
+
+        return log
+
+    def check(self):
+        """Return a list of failed checks, empty if everything passed."""
+        failures = []
+
+        log = self.run_lifecycle()
+        if log != EXPECTED_LOG:
+            failures.append(
+                "Unexpected lifecycle log:\n  {}".format(
+                    "\n  ".join(map(repr, log))))
+
+        failures.extend(self.map_game_harness.check())
+
+        if self.event_manager:
+            failures.append("Game event handlers left registered: {}".format(
+                dict(self.event_manager)))
+
+        internal_event_manager = self.internal_events.internal_event_manager
+        if internal_event_manager != self.internal_handlers:
+            failures.append("Internal event handlers left registered")
+
+        try:
+            class BrokenGame(self.stage_engine.StageEngine):
+                stage_groups = {
+                    'init': ["missing-stage", ],
+                }
+        except self.stage_engine.UnknownStageError:
+            pass
+        else:
+            failures.append("Unknown stage ID wasn't rejected")
+
+        return failures
+
+    def time_lifecycles(self, lifecycles, repeat, run_lifecycle=None):
+        """Return the median and minimum duration of a single lifecycle."""
+        if run_lifecycle is None:
+            run_lifecycle = self.run_lifecycle
+
+        durations = []
+        for i in range(repeat):
+            start_time = perf_counter()
+            for j in range(lifecycles):
+                run_lifecycle()
+
+            durations.append((perf_counter() - start_time) / lifecycles)
+
+        return median(durations), min(durations)
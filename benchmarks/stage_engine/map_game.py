@@ -0,0 +1,235 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Lifecycle of a game built on the real games base classes.
+
+The game is a MapGame subclass, so it runs the stage tables of BaseGame,
+JailGame, PrepareTime and MapGame: prepare countdown, prepare-continue,
+map game start, a player death, the end push and destroy with all of its
+undo stages.
+"""
+
+from importlib import import_module
+
+from . import stubs
+
+
+def build_map_game_class(map_game):
+    """Return a MapGame subclass declared the way game_classes do."""
+    MapGame = map_game.MapGame
+    games = import_module('arcjail.modules.games')
+
+    class HarnessMapGame(MapGame):
+        module = 'harness'
+        _caption = games.strings_module['title harness']
+
+        stage_groups = {
+            'mapgame-start': [
+                "mapgame-equip-weapons",
+                "mapgame-register-push-handlers",
+                "mapgame-apply-cvars",
+                "mapgame-fire-mapdata-outputs",
+                "mapgame-entry",
+            ],
+        }
+
+        @games.push(None, 'end')
+        def push_end(self, args):
+            self.set_stage_group('game-end-draw')
+
+    return HarnessMapGame
+
+
+class SpawnpointAllocator(list):
+    def __init__(self, team, log):
+        super().__init__(["spawnpoint-{}".format(team)])
+
+        self.team = team
+        self.log = log
+
+    def shuffle(self):
+        self.log.append(('shuffle_spawnpoints', self.team))
+
+    def teleport(self, players):
+        self.log.append(('teleport_players', self.team, tuple(players)))
+
+
+class MapData(dict):
+    """The parts of jail_map's map data MapGame uses."""
+    slot_id = 1
+    caption = None
+
+    def __init__(self, log):
+        super().__init__({
+            'PUSHSCALE': 2.0,
+            'PUSHSCALE_OVERRIDE': 1,
+            'TIMESCALE': 0.5,
+            'TIMESCALE_OVERRIDE': 0,
+            'GRAVITY': 400.0,
+            'GRAVITY_OVERRIDE': 1,
+            'ENABLE_NOBLOCK': 1,
+            'ENABLE_EQUIPMENT': 1,
+            'ARENA_EQUIPMENT': ['weapon_knife', ],
+        })
+
+        self.log = log
+        self.prepare = log.recorder('map_data_prepare')
+        self.start = log.recorder('map_data_start')
+        self.end = log.recorder('map_data_end')
+
+    def get_spawnpoint_allocator(self, team):
+        return SpawnpointAllocator(team, self.log)
+
+
+PLAYERS = (1, 2, 3)
+LEADER = 4
+DEAD_PLAYER = 3
+
+EXPECTED_LOG = [
+    ('TextMsg', '3', (1, 2, 3, 4)),
+    ('broadcast', 'stage_prepare'),
+    ('unprotect', 'Player(1)'),
+    ('unprotect', 'Player(2)'),
+    ('unprotect', 'Player(3)'),
+    ('lock_noblock', ),
+    ('noblock_set_force_on', 'Player(1)'),
+    ('noblock_set_force_on', 'Player(2)'),
+    ('noblock_set_force_on', 'Player(3)'),
+    ('shuffle_spawnpoints', 'team1'),
+    ('teleport_players', 'team1', ('Player(1)', 'Player(2)', 'Player(3)')),
+    ('teleport_to_spawnpoint', 'Player(4)', 'spawnpoint-team0'),
+    ('map_data_prepare', ),
+    ('TextMsg', '2', (1, 2, 3, 4)),
+    ('TextMsg', '1', (1, 2, 3, 4)),
+    ('broadcast', "game_started [('game', 'title harness')]"),
+    ('save_weapons', 1),
+    ('give_named_item', 1, 'weapon_knife'),
+    ('infinite_on', 1),
+    ('save_weapons', 2),
+    ('give_named_item', 2, 'weapon_knife'),
+    ('infinite_on', 2),
+    ('save_weapons', 3),
+    ('give_named_item', 3, 'weapon_knife'),
+    ('infinite_on', 3),
+    ('register_drop_filter', ),
+    ('register_pickup_filter', ),
+    ('register_push_handler', 'slot-gameslot-1', 'end'),
+    ('silent_set', 'sv_gravity', 400.0),
+    ('map_data_start', ),
+    ('broadcast', 'draw'),
+    ('unlock_noblock', ),
+    ('noblock_set_default', 'Player(1)'),
+    ('noblock_set_default', 'Player(2)'),
+    ('noblock_set_default', 'Player(3)'),
+    ('unregister_drop_filter', ),
+    ('unregister_pickup_filter', ),
+    ('restore_weapons', 1),
+    ('infinite_off', 1),
+    ('restore_weapons', 2),
+    ('infinite_off', 2),
+    ('infinite_off', 3),
+    ('unregister_push_handler', 'slot-gameslot-1', 'end'),
+    ('silent_set', 'sv_gravity', 800.0),
+    ('map_data_end', ),
+    ('set_instance', None),
+]
+
+
+class MapGameHarness:
+    def __init__(self, event_manager):
+        self.event_manager = event_manager
+        self.log = stubs.CallLog()
+        self.games = stubs.install_games(self.log)
+
+        self.timer_wheel = import_module(
+            'arcjail.resource.timer_wheel').timer_wheel
+
+        map_game = import_module(
+            'arcjail.modules.games.base_classes.map_game')
+
+        self.game_class = build_map_game_class(map_game)
+        self.cvar_values = dict(stubs.ConVar.values)
+
+        self.players = {}
+        for index in PLAYERS + (LEADER, ):
+            self.players[index] = stubs.GamePlayer(index, self.log)
+
+        self.games.player_manager.update(self.players)
+
+    def run_lifecycle(self):
+        """Run the game from init to destroy and return the game."""
+        self.log.clear()
+
+        game = self.game_class(
+            self.players[LEADER],
+            [self.players[index] for index in PLAYERS],
+            map_data=MapData(self.log),
+        )
+        game.set_stage_group('init')
+
+        # Wait for the prepare countdown to finish
+        for i in range(3 * 64):
+            self.timer_wheel.tick()
+
+        self.event_manager.fire(
+            'player_death', {'userid': self.players[DEAD_PLAYER].userid})
+
+        self.games.push_handlers[('slot-gameslot-1', 'end')]('push-args')
+
+        return game
+
+    def check(self):
+        """Return a list of failed checks, empty if everything passed."""
+        failures = []
+
+        game = self.run_lifecycle()
+
+        log = [tuple(map(_format_log_arg, entry)) for entry in self.log]
+        if log != EXPECTED_LOG:
+            failures.append(
+                "Unexpected MapGame log:\n  {}".format(
+                    "\n  ".join(map(repr, log))))
+
+        if game.players != (self.players[1], self.players[2]):
+            failures.append("Dead player wasn't removed from the MapGame")
+
+        if stubs.ConVar.values != self.cvar_values:
+            failures.append("MapGame cvars weren't restored: {}".format(
+                stubs.ConVar.values))
+
+        if self.games.tick_listeners:
+            failures.append("MapGame tick listeners left registered")
+
+        if self.games.push_handlers:
+            failures.append("MapGame push handlers left registered")
+
+        if self.timer_wheel.count(game):
+            failures.append("MapGame delays left scheduled")
+
+        if any(player.stuck for player in self.players.values()):
+            failures.append("MapGame players left frozen")
+
+        return failures
+
+
+def _format_log_arg(arg):
+    if isinstance(arg, stubs.GamePlayer):
+        return repr(arg)
+
+    if isinstance(arg, (list, tuple)):
+        return tuple(map(_format_log_arg, arg))
+
+    return arg
@@ -0,0 +1,313 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Minimal stand-ins for the Source.Python modules the stage engine imports.
+
+install() registers them in sys.modules and returns the stubbed event
+manager so the harness can fire game events. install_games() adds what
+the real games base classes import; its stand-ins append every call
+they receive to a shared log.
+"""
+
+import os
+import sys
+from types import ModuleType, SimpleNamespace
+
+from ..jail_map.stubs import Event, Logger, PLUGINS_PATH
+
+
+class EventManager(dict):
+    """The parts of events.manager.event_manager the engine uses."""
+    def register_for_event(self, event_name, callback):
+        self.setdefault(event_name, []).append(callback)
+
+    def unregister_for_event(self, event_name, callback):
+        self[event_name].remove(callback)
+        if not self[event_name]:
+            del self[event_name]
+
+    def fire(self, event_name, game_event):
+        for callback in list(self.get(event_name, ())):
+            callback(game_event)
+
+
+class CallLog(list):
+    """Log of the calls the games stand-ins received."""
+    def recorder(self, name, *bound_args, result=None):
+        """Return a function appending (name, *bound_args, *args)."""
+        def record(*args):
+            self.append((name, ) + bound_args + args)
+            return result
+
+        return record
+
+
+class ConVar:
+    """cvars.ConVar holding its value as a float."""
+    values = {
+        'phys_pushscale': 1.0,
+        'phys_timescale': 1.0,
+        'sv_gravity': 800.0,
+    }
+
+    def __init__(self, name):
+        self.name = name
+
+    def get_float(self):
+        return self.values[self.name]
+
+    def set_float(self, value):
+        self.values[self.name] = value
+
+
+class TextMsg:
+    log = None
+
+    def __init__(self, text):
+        self.text = text
+
+    def send(self, *indexes):
+        self.log.append(('TextMsg', self.text, indexes))
+
+
+class TickListenerManager(list):
+    def register_listener(self, listener):
+        self.append(listener)
+
+    def unregister_listener(self, listener):
+        self.remove(listener)
+
+
+class GamePlayer:
+    """The parts of a player the games base classes touch."""
+    def __init__(self, index, log):
+        self.index = index
+        self.userid = index + 100
+        self.stuck = False
+        self.active_weapon = None
+        self.give_named_item = log.recorder('give_named_item', index)
+
+    def __repr__(self):
+        return "Player({})".format(self.index)
+
+
+class GamePlayerManager(dict):
+    def get_by_userid(self, userid):
+        for player in self.values():
+            if player.userid == userid:
+                return player
+
+        raise ValueError(userid)
+
+
+class SavedPlayer:
+    """equipment_switcher's saved player."""
+    def __init__(self, index, log):
+        self.infinite_weapons = []
+        for name in ('save_weapons', 'restore_weapons', 'infinite_on',
+                     'infinite_off'):
+            setattr(self, name, log.recorder(name, index))
+
+
+class SavedPlayerManager(dict):
+    def __init__(self, log):
+        super().__init__()
+
+        self.log = log
+
+    def __missing__(self, index):
+        saved_player = self[index] = SavedPlayer(index, self.log)
+        return saved_player
+
+
+class LangString(str):
+    """A translated string of the games package."""
+    def tokenize(self, **tokens):
+        return LangString("{} {}".format(self, sorted(tokens.items())))
+
+
+class Strings(dict):
+    def __missing__(self, key):
+        return LangString(key)
+
+
+class GameLauncher:
+    def __init__(self, game_class):
+        self.game_class = game_class
+
+
+def _server_command(*args):
+    def decorator(func):
+        return func
+
+    return decorator
+
+
+def _listener(func):
+    return func
+
+
+def _add_module(name, path=None, **attrs):
+    module = ModuleType(name)
+    if path is not None:
+        module.__path__ = [path]
+
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def install():
+    """Stub Source.Python and return the stubbed event manager."""
+    event_manager = EventManager()
+
+    _add_module('commands')
+    _add_module('commands.server', ServerCommand=_server_command)
+    _add_module('core', echo_console=lambda text: None)
+    _add_module('events', Event=Event)
+    _add_module('events.manager', event_manager=event_manager)
+
+    arcjail_path = os.path.join(PLUGINS_PATH, 'arcjail')
+    _add_module('arcjail', arcjail_path)
+    _add_module('arcjail.classes', os.path.join(arcjail_path, 'classes'))
+    _add_module(
+        'arcjail.resource', os.path.join(arcjail_path, 'resource'))
+    _add_module('arcjail.resource.logger', logger=Logger())
+
+    return event_manager
+
+
+def install_games(log):
+    """Stub what the games base classes import besides the stage engine.
+
+    Return the stand-ins the harness drives or inspects.
+    """
+    arcjail_path = os.path.join(PLUGINS_PATH, 'arcjail')
+    stage_engine = sys.modules['arcjail.classes.stage_engine']
+
+    global_vars = SimpleNamespace(interval_per_tick=1 / 64)
+    player_manager = GamePlayerManager()
+    push_handlers = {}
+    tick_listeners = TickListenerManager()
+    TextMsg.log = log
+
+    def register_push_handler(slot_id, push_id, handler):
+        log.append(('register_push_handler', slot_id, push_id))
+        push_handlers[(slot_id, push_id)] = handler
+
+    def unregister_push_handler(slot_id, push_id, handler):
+        log.append(('unregister_push_handler', slot_id, push_id))
+        del push_handlers[(slot_id, push_id)]
+
+    def filter_recorder(name):
+        return lambda filter_: log.append((name, ))
+
+    def silent_set(cvar, type_, value):
+        log.append(('silent_set', cvar.name, value))
+        cvar.set_float(value)
+
+    _add_module('cvars', ConVar=ConVar)
+    _add_module('engines')
+    _add_module('engines.server', global_vars=global_vars)
+    _add_module('entities')
+    _add_module('entities.helpers', edict_from_index=None)
+    _add_module('listeners', OnLevelInit=_listener, OnTick=_listener)
+    _add_module('listeners.tick', on_tick_listener_manager=tick_listeners)
+    _add_module('messages', TextMsg=TextMsg)
+
+    _add_module('arcjail.modules', os.path.join(arcjail_path, 'modules'))
+    _add_module(
+        'arcjail.modules.equipment_switcher',
+        register_weapon_drop_filter=filter_recorder('register_drop_filter'),
+        register_weapon_pickup_filter=filter_recorder(
+            'register_pickup_filter'),
+        saved_player_manager=SavedPlayerManager(log),
+        unregister_weapon_drop_filter=filter_recorder(
+            'unregister_drop_filter'),
+        unregister_weapon_pickup_filter=filter_recorder(
+            'unregister_pickup_filter'),
+    )
+    _add_module(
+        'arcjail.modules.falldmg_protector',
+        unprotect=log.recorder('unprotect'),
+    )
+    _add_module(
+        'arcjail.modules.jail_map',
+        get_cage_names=lambda: (),
+        get_games=lambda module: (),
+        get_map_string=lambda key: Strings()[key],
+        get_players_in_area=lambda area_name: (),
+        register_push_handler=register_push_handler,
+        teleport_to_spawnpoint=log.recorder('teleport_to_spawnpoint'),
+        unregister_push_handler=unregister_push_handler,
+    )
+    _add_module(
+        'arcjail.modules.noblock',
+        lock=log.recorder('lock_noblock'),
+        set_default=log.recorder('noblock_set_default'),
+        set_force_off=log.recorder('noblock_set_force_off'),
+        set_force_on=log.recorder('noblock_set_force_on'),
+        unlock=log.recorder('unlock_noblock'),
+    )
+    _add_module(
+        'arcjail.modules.overlays', show_overlay=log.recorder('show_overlay'))
+    _add_module(
+        'arcjail.modules.players',
+        broadcast=log.recorder('broadcast'),
+        player_manager=player_manager,
+    )
+    _add_module('arcjail.modules.rebels', get_rebels=lambda: ())
+    _add_module('arcjail.modules.silent_cvars', silent_set=silent_set)
+
+    # The games package itself loads every game, so only the names the
+    # base classes import from it are provided
+    games_path = os.path.join(arcjail_path, 'modules', 'games')
+    _add_module(
+        'arcjail.modules.games', games_path,
+        config_manager={
+            'prepare_timeout': 3,
+            'countdown_1_material': "",
+            'countdown_2_material': "",
+            'countdown_3_material': "",
+            'countdown_sound': None,
+            'prepare_sound': None,
+            'min_players_number': 2,
+        },
+        format_player_names=lambda players: ", ".join(map(repr, players)),
+        game_event_handler=stage_engine.game_event_handler,
+        game_internal_event_handler=(
+            stage_engine.game_internal_event_handler),
+        GameLauncher=GameLauncher,
+        helper_set_loser=log.recorder('helper_set_loser'),
+        helper_set_neutral=log.recorder('helper_set_neutral'),
+        helper_set_winner=log.recorder('helper_set_winner'),
+        MIN_PLAYERS_IN_GAME=2,
+        push=stage_engine.push,
+        set_instance=log.recorder('set_instance'),
+        stage=stage_engine.stage,
+        strings_game_captions=Strings(),
+        strings_module=Strings(),
+    )
+    _add_module(
+        'arcjail.modules.games.base_classes',
+        os.path.join(games_path, 'base_classes'),
+    )
+
+    return SimpleNamespace(
+        player_manager=player_manager,
+        push_handlers=push_handlers,
+        tick_listeners=tick_listeners,
+    )
@@ -48,3 +48,12 @@ from . import modules
 from . import models
 from .resource.sqlalchemy import Base, engine
 Base.metadata.create_all(engine)
+
+from .modules.arcjail.migration import migrate
+migrate()
+
+from .modules.arcjail.journal import replay
+replay()
+
+from .modules.credits.ledger import rebuild_balances
+rebuild_balances()
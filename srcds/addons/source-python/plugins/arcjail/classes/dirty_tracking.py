@@ -0,0 +1,40 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+
+class DirtyTracking:
+    """Remember whether an object has changes that aren't saved yet.
+
+    Every change bumps the revision. A save remembers the revision it
+    started with, so changes made while the save is running keep the
+    object dirty.
+    """
+    def __init__(self):
+        self._revision = 0
+        self._saved_revision = 0
+
+    @property
+    def revision(self):
+        return self._revision
+
+    @property
+    def dirty(self):
+        return self._revision != self._saved_revision
+
+    def mark_dirty(self):
+        self._revision += 1
+
+    def mark_saved(self, revision):
+        self._saved_revision = revision
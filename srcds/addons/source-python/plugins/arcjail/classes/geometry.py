@@ -14,7 +14,20 @@
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+BOUNDS_EPSILON = 1e-9
+BOUNDS_TOLERANCE = 0.01
+GRID_CELL_SIZE = 512
+
+
 class _3DTuple(object):
+    __slots__ = ('x', 'y', 'z')
+
     def __init__(self, *args, **kwargs):
         x, y, z = 0.0, 0.0, 0.0
         if len(args) == 1:
@@ -63,15 +76,45 @@ class _3DTuple(object):
         self.y = float(kwargs.get('y', y))
         self.z = float(kwargs.get('z', z))
 
+    @classmethod
+    def from_xyz(cls, x, y, z):
+        """Create an instance bypassing argument parsing of __init__.
+
+        x, y and z are stored as they are, so pass floats.
+        """
+        obj = object.__new__(cls)
+        obj.x = x
+        obj.y = y
+        obj.z = z
+        return obj
+
+    def offset(self, dx, dy, dz):
+        """Return a copy moved by the given deltas."""
+        return self.from_xyz(self.x+dx, self.y+dy, self.z+dz)
+
+    def translate(self, dx, dy, dz):
+        """Move this object in place by the given deltas."""
+        self.x += dx
+        self.y += dy
+        self.z += dz
+        return self
+
     def __str__(self, *args):
         return "%s %s %s" % (self.x, self.y, self.z)
 
     def __iter__(self):
-        for arg in (self.x, self.y, self.z):
-            yield arg
+        return iter((self.x, self.y, self.z))
+
+    def __len__(self):
+        return 3
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
 
 
 class _2DTuple(object):
+    __slots__ = ('x', 'y')
+
     def __init__(self, *args, **kwargs):
         x, y = 0.0, 0.0
         if len(args) == 1:
@@ -110,24 +153,52 @@ class _2DTuple(object):
         self.x = float(kwargs.get('x', x))
         self.y = float(kwargs.get('y', y))
 
+    @classmethod
+    def from_xy(cls, x, y):
+        """Create an instance bypassing argument parsing of __init__.
+
+        x and y are stored as they are, so pass floats.
+        """
+        obj = object.__new__(cls)
+        obj.x = x
+        obj.y = y
+        return obj
+
+    def offset(self, dx, dy):
+        """Return a copy moved by the given deltas."""
+        return self.from_xy(self.x+dx, self.y+dy)
+
+    def translate(self, dx, dy):
+        """Move this object in place by the given deltas."""
+        self.x += dx
+        self.y += dy
+        return self
+
     def __str__(self, *args):
         return "%s %s" % (self.x, self.y)
 
     def __iter__(self):
-        for arg in (self.x, self.y):
-            yield arg
+        return iter((self.x, self.y))
+
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, index):
+        return (self.x, self.y)[index]
 
 
 class Point(_3DTuple):
+    __slots__ = ()
+
     def __add__(self, item):
         if isinstance(item, Vector):
-            return Point(self.x+item.x, self.y+item.y, self.z+item.z)
+            return Point.from_xyz(self.x+item.x, self.y+item.y, self.z+item.z)
 
         raise TypeError
 
     def __sub__(self, item):
         if isinstance(item, Vector):
-            return Point(self.x-item.x, self.y-item.y, self.z-item.z)
+            return Point.from_xyz(self.x-item.x, self.y-item.y, self.z-item.z)
 
         raise TypeError
 
@@ -136,15 +207,17 @@ class Point(_3DTuple):
 
 
 class Point2D(_2DTuple):
+    __slots__ = ()
+
     def __add__(self, item):
         if isinstance(item, Vector2D):
-            return Point2D(self.x+item.x, self.y+item.y)
+            return Point2D.from_xy(self.x+item.x, self.y+item.y)
 
         raise TypeError
 
     def __sub__(self, item):
         if isinstance(item, Vector2D):
-            return Point2D(self.x-item.x, self.y-item.y)
+            return Point2D.from_xy(self.x-item.x, self.y-item.y)
 
         raise TypeError
 
@@ -153,21 +226,23 @@ class Point2D(_2DTuple):
 
 
 class Vector(_3DTuple):
+    __slots__ = ()
+
     def __add__(self, item):
         if isinstance(item, Vector):
-            return Vector(self.x+item.x, self.y+item.y, self.z+item.z)
+            return Vector.from_xyz(self.x+item.x, self.y+item.y, self.z+item.z)
 
         if isinstance(item, Point):
-            return Point(self.x+item.x, self.y+item.y, self.z+item.z)
+            return Point.from_xyz(self.x+item.x, self.y+item.y, self.z+item.z)
 
         raise TypeError
 
     def __sub__(self, item):
         if isinstance(item, Vector):
-            return Vector(self.x-item.x, self.y-item.y, self.z-item.z)
+            return Vector.from_xyz(self.x-item.x, self.y-item.y, self.z-item.z)
 
         if isinstance(item, Point):
-            return Point(self.x-item.x, self.y-item.y, self.z-item.z)
+            return Point.from_xyz(self.x-item.x, self.y-item.y, self.z-item.z)
 
         raise TypeError
 
@@ -176,13 +251,13 @@ class Vector(_3DTuple):
             return self.x*item.x + self.y*item.y + self.z*item.z
 
         if isinstance(item, (int, float)):
-            return Vector(self.x*item, self.y*item, self.z*item)
+            return Vector.from_xyz(self.x*item, self.y*item, self.z*item)
 
         raise TypeError
 
     def __truediv__(self, k):
         if isinstance(k, (int, float)):
-            return Vector(self.x/k, self.y/k, self.z/k)
+            return Vector.from_xyz(self.x/k, self.y/k, self.z/k)
 
         raise TypeError
 
@@ -191,21 +266,23 @@ class Vector(_3DTuple):
 
 
 class Vector2D(_2DTuple):
+    __slots__ = ()
+
     def __add__(self, item):
         if isinstance(item, Vector2D):
-            return Vector2D(self.x+item.x, self.y+item.y)
+            return Vector2D.from_xy(self.x+item.x, self.y+item.y)
 
         if isinstance(item, Point2D):
-            return Point2D(self.x+item.x, self.y+item.y)
+            return Point2D.from_xy(self.x+item.x, self.y+item.y)
 
         raise TypeError
 
     def __sub__(self, item):
         if isinstance(item, Vector2D):
-            return Vector2D(self.x-item.x, self.y-item.y)
+            return Vector2D.from_xy(self.x-item.x, self.y-item.y)
 
         if isinstance(item, Point2D):
-            return Point2D(self.x-item.x, self.y-item.y)
+            return Point2D.from_xy(self.x-item.x, self.y-item.y)
 
         raise TypeError
 
@@ -214,13 +291,13 @@ class Vector2D(_2DTuple):
             return self.x*item.x + self.y*item.y
 
         if isinstance(item, (int, float)):
-            return Vector2D(self.x*item, self.y*item)
+            return Vector2D.from_xy(self.x*item, self.y*item)
 
         raise TypeError
 
     def __truediv__(self, k):
         if isinstance(k, (int, float)):
-            return Vector2D(self.x/k, self.y/k)
+            return Vector2D.from_xy(self.x/k, self.y/k)
 
         raise TypeError
 
@@ -417,17 +494,454 @@ class ConvexArea(object):
 
         self._inner_point = Point(self._inner_point / c)
 
-    def __contains__(self, point):
-        if not isinstance(point, Point):
-            raise TypeError("Point expected")
+        # Plane equations with their signs flipped so that
+        # a*x + b*y + c*z + d <= 0 holds for every point of the area
+        self.coefficients = self._compile_coefficients()
+
+        # Same planes scaled to unit normals, a*x + b*y + c*z + d is then
+        # the distance of the point to the plane
+        self.unit_coefficients = normalize_coefficients(self.coefficients)
+
+        # Axis-aligned bounding box ((min x, y, z), (max x, y, z)), or None
+        # if the planes don't enclose a finite volume
+        self.bounds = self._compile_bounds()
+
+    @classmethod
+    def from_compiled(cls, inner_point, coefficients, bounds):
+        """Restore an area from the attributes of a compiled one.
+
+        Such an area has no planes, only what the point tests need.
+        """
+        obj = object.__new__(cls)
+        obj.planes = set()
+        obj._inner_point = Point.from_xyz(*inner_point)
+        obj.coefficients = tuple(map(tuple, coefficients))
+        obj.unit_coefficients = normalize_coefficients(obj.coefficients)
+        obj.bounds = (None if bounds is None else
+                      (tuple(bounds[0]), tuple(bounds[1])))
+
+        return obj
+
+    def get_compiled(self):
+        """Return (inner point, coefficients, bounds) for from_compiled()."""
+        return tuple(self._inner_point), self.coefficients, self.bounds
+
+    def _compile_bounds(self):
+        planes = self.unit_coefficients
+
+        # Vertices are the intersections of any 3 planes that lie inside
+        vertices = []
+        for i, (a1, b1, c1, d1) in enumerate(planes):
+            for j in range(i + 1, len(planes)):
+                a2, b2, c2, d2 = planes[j]
+                for k in range(j + 1, len(planes)):
+                    a3, b3, c3, d3 = planes[k]
+
+                    # Cross products of the normals
+                    x23, y23, z23 = b2*c3 - c2*b3, c2*a3 - a2*c3, a2*b3 - b2*a3
+                    x31, y31, z31 = b3*c1 - c3*b1, c3*a1 - a3*c1, a3*b1 - b3*a1
+                    x12, y12, z12 = b1*c2 - c1*b2, c1*a2 - a1*c2, a1*b2 - b1*a2
+
+                    det = a1*x23 + b1*y23 + c1*z23
+                    if abs(det) < BOUNDS_EPSILON:
+                        continue
+
+                    x = -(d1*x23 + d2*x31 + d3*x12) / det
+                    y = -(d1*y23 + d2*y31 + d3*y12) / det
+                    z = -(d1*z23 + d2*z31 + d3*z12) / det
+
+                    for a, b, c, d in planes:
+                        if a*x + b*y + c*z + d > BOUNDS_TOLERANCE:
+                            break
+
+                    else:
+                        vertices.append((x, y, z))
 
+        if not vertices:
+            return None
+
+        return (
+            tuple(min(v[i] for v in vertices) - BOUNDS_TOLERANCE
+                  for i in range(3)),
+            tuple(max(v[i] for v in vertices) + BOUNDS_TOLERANCE
+                  for i in range(3)),
+        )
+
+    def _compile_coefficients(self):
         x0, y0, z0 = self._inner_point
-        x, y, z = point
+        coefficients = []
         for plane in self.planes:
             a, b, c, d = plane.equation
-            ref0 = a*x0 + b*y0 + c*z0 + d
-            ref = a*x + b*y + c*z + d
-            if (ref != 0) and ((ref > 0) != (ref0 > 0)):
+            if a*x0 + b*y0 + c*z0 + d > 0:
+                a, b, c, d = -a, -b, -c, -d
+
+            coefficients.append((a, b, c, d))
+
+        return tuple(coefficients)
+
+    def __contains__(self, point):
+        if not isinstance(point, Point):
+            raise TypeError("Point expected")
+
+        return self.contains_xyz(point.x, point.y, point.z)
+
+    def contains_xyz(self, x, y, z):
+        if self.bounds is not None:
+            (x0, y0, z0), (x1, y1, z1) = self.bounds
+            if not (x0 <= x <= x1 and y0 <= y <= y1 and z0 <= z <= z1):
+                return False
+
+        for a, b, c, d in self.coefficients:
+            if a*x + b*y + c*z + d > 0:
                 return False
 
         return True
+
+    def signed_distance_xyz(self, x, y, z):
+        """Return the signed distance from the point to the area boundary.
+
+        Negative inside, positive outside. Inside and in front of a face
+        this is exact, outside near edges and corners it's a lower bound:
+        the distance to the farthest plane the point is outside of.
+        """
+        return max(a*x + b*y + c*z + d
+                   for a, b, c, d in self.unit_coefficients)
+
+    def intersect_segment_xyz(self, x0, y0, z0, x1, y1, z1):
+        """Return where the segment is inside the area, None if nowhere.
+
+        The result is (t_enter, t_exit), fractions of the way from
+        (x0, y0, z0) to (x1, y1, z1) with 0 <= t_enter <= t_exit <= 1.
+        """
+        dx, dy, dz = x1 - x0, y1 - y0, z1 - z0
+        t_enter, t_exit = 0.0, 1.0
+        for a, b, c, d in self.coefficients:
+            distance = a*x0 + b*y0 + c*z0 + d
+            speed = a*dx + b*dy + c*dz
+            if speed == 0:
+                if distance > 0:
+                    return None
+
+                continue
+
+            t = -distance / speed
+            if speed > 0:
+                if t < t_exit:
+                    t_exit = t
+
+            elif t > t_enter:
+                t_enter = t
+
+            if t_enter > t_exit:
+                return None
+
+        return t_enter, t_exit
+
+
+def normalize_coefficients(coefficients):
+    """Scale plane coefficients so that (a, b, c) are unit vectors.
+
+    Degenerate planes with a zero normal are left out.
+    """
+    result = []
+    for a, b, c, d in coefficients:
+        length = (a*a + b*b + c*c) ** 0.5
+        if length:
+            result.append((a/length, b/length, c/length, d/length))
+
+    return tuple(result)
+
+
+def merge_bounds(bounds_list):
+    """Return the bounding box of the given bounding boxes.
+
+    None (unbounded) wins over everything.
+    """
+    bounds_list = tuple(bounds_list)
+    if not bounds_list or None in bounds_list:
+        return None
+
+    return (
+        tuple(min(bounds[0][i] for bounds in bounds_list) for i in range(3)),
+        tuple(max(bounds[1][i] for bounds in bounds_list) for i in range(3)),
+    )
+
+
+class ConvexAreaSet(object):
+    """Named groups of ConvexArea objects compiled for batched tests.
+
+    A point belongs to a group if it belongs to any of the group's areas.
+    test() checks many points against all groups at once. Only the areas
+    whose bounding boxes share a cell of a uniform XY grid with the point
+    get the exact plane test.
+
+    signed_distances(), nearest() and intersect_segment() answer distance
+    and movement queries against the same groups.
+    """
+    def __init__(self, groups=(), cell_size=GRID_CELL_SIZE):
+        self.names = []
+        self.cell_size = cell_size
+        self._groups = []
+        self._areas = []
+
+        # Cell -> ((group index, ConvexArea), ...) and areas without bounds
+        self._grid = {}
+        self._unbounded = []
+
+        planes = []
+        unit_planes = []
+        plane_starts = []
+        unit_plane_starts = []
+        structure_starts = []
+        columns = []
+
+        for name, areas in groups:
+            areas = tuple(areas)
+
+            group_index = len(self.names)
+            self.names.append(name)
+            self._groups.append(tuple(area.coefficients for area in areas))
+            self._areas.append(areas)
+
+            for area in areas:
+                self._add_to_grid(group_index, area)
+
+            if not areas:
+                continue
+
+            columns.append(group_index)
+            structure_starts.append(len(plane_starts))
+            for area in areas:
+                plane_starts.append(len(planes))
+                planes.extend(area.coefficients)
+                unit_plane_starts.append(len(unit_planes))
+                unit_planes.extend(area.unit_coefficients)
+
+        self.names = tuple(self.names)
+        self._groups = tuple(self._groups)
+        self._areas = tuple(self._areas)
+        self._grid = {
+            cell: tuple(candidates) for cell, candidates in self._grid.items()}
+
+        self._unbounded = tuple(self._unbounded)
+
+        # Every area fits a ball of at least this diameter, so shorter
+        # segments can't pass through an area without ending inside of it
+        # (except for clipping its edges)
+        self.min_thickness = min(
+            (-2 * area.signed_distance_xyz(*area._inner_point)
+             for areas in self._areas for area in areas),
+            default=float('inf'))
+
+        if numpy is not None and planes:
+            planes = numpy.array(planes, dtype=float)
+            self._normals = planes[:, :3].T.copy()
+            self._offsets = planes[:, 3].copy()
+            self._plane_starts = numpy.array(plane_starts, dtype=int)
+            self._structure_starts = numpy.array(structure_starts, dtype=int)
+            self._columns = numpy.array(columns, dtype=int)
+
+            unit_planes = numpy.array(unit_planes, dtype=float)
+            self._unit_normals = unit_planes[:, :3].T.copy()
+            self._unit_offsets = unit_planes[:, 3].copy()
+            self._unit_plane_starts = numpy.array(
+                unit_plane_starts, dtype=int)
+
+        else:
+            self._normals = None
+
+    def _get_cell(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def _add_to_grid(self, group_index, area):
+        if area.bounds is None:
+            self._unbounded.append((group_index, area))
+            return
+
+        (x0, y0, z0), (x1, y1, z1) = area.bounds
+        cx0, cy0 = self._get_cell(x0, y0)
+        cx1, cy1 = self._get_cell(x1, y1)
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                self._grid.setdefault((cx, cy), []).append(
+                    (group_index, area))
+
+    def __len__(self):
+        return len(self.names)
+
+    def get_candidates(self, x, y):
+        """Return (group index, ConvexArea) pairs that may contain (x, y)."""
+        return self._grid.get(self._get_cell(x, y), ()) + self._unbounded
+
+    def test(self, points):
+        """Return a points x groups matrix of booleans.
+
+        points is a sequence of (x, y, z) triples. Rows and columns of the
+        result follow the order of points and self.names.
+        """
+        rows = []
+        for x, y, z in points:
+            row = [False] * len(self.names)
+            for group_index, area in self.get_candidates(x, y):
+                if not row[group_index] and area.contains_xyz(x, y, z):
+                    row[group_index] = True
+
+            rows.append(tuple(row))
+
+        return tuple(rows)
+
+    def test_dense(self, points):
+        """Same as test(), but evaluate every plane for every point.
+
+        Uses NumPy if it's available and returns a NumPy array then. The
+        grid makes test() faster for player counts, this is meant for
+        testing lots of points at once.
+        """
+        if self._normals is None:
+            return self._test_dense_python(points)
+
+        points = numpy.array(points, dtype=float).reshape(-1, 3)
+        result = numpy.zeros((len(points), len(self.names)), dtype=bool)
+        if not len(points):
+            return result
+
+        inside_planes = points.dot(self._normals) + self._offsets <= 0
+        inside_areas = numpy.logical_and.reduceat(
+            inside_planes, self._plane_starts, axis=1)
+
+        result[:, self._columns] = numpy.logical_or.reduceat(
+            inside_areas, self._structure_starts, axis=1)
+
+        return result
+
+    def _test_dense_python(self, points):
+        rows = []
+        for x, y, z in points:
+            row = []
+            for group in self._groups:
+                for coefficients in group:
+                    for a, b, c, d in coefficients:
+                        if a*x + b*y + c*z + d > 0:
+                            break
+
+                    else:
+                        row.append(True)
+                        break
+
+                else:
+                    row.append(False)
+
+            rows.append(tuple(row))
+
+        return tuple(rows)
+
+    def signed_distances(self, points):
+        """Return a points x groups matrix of signed distances.
+
+        A group's distance is the smallest ConvexArea.signed_distance_xyz()
+        of its areas, infinity for groups without areas. Uses NumPy if
+        it's available and returns a NumPy array then.
+        """
+        if self._normals is None:
+            return tuple(
+                tuple(
+                    min((area.signed_distance_xyz(x, y, z) for area in areas),
+                        default=float('inf'))
+                    for areas in self._areas
+                ) for x, y, z in points
+            )
+
+        points = numpy.array(points, dtype=float).reshape(-1, 3)
+        result = numpy.full((len(points), len(self.names)), numpy.inf)
+        if not len(points):
+            return result
+
+        plane_distances = (
+            points.dot(self._unit_normals) + self._unit_offsets)
+
+        area_distances = numpy.maximum.reduceat(
+            plane_distances, self._unit_plane_starts, axis=1)
+
+        result[:, self._columns] = numpy.minimum.reduceat(
+            area_distances, self._structure_starts, axis=1)
+
+        return result
+
+    def nearest(self, x, y, z):
+        """Return (name, signed distance) of the nearest group.
+
+        Return (None, inf) if there are no areas at all.
+        """
+        distances = tuple(self.signed_distances(((x, y, z), ))[0])
+        if not distances:
+            return None, float('inf')
+
+        index = min(range(len(distances)), key=distances.__getitem__)
+        return self.names[index], float(distances[index])
+
+    def _get_segment_candidates(self, x0, y0, x1, y1):
+        cx0, cy0 = self._get_cell(min(x0, x1), min(y0, y1))
+        cx1, cy1 = self._get_cell(max(x0, x1), max(y0, y1))
+
+        # Long segments (teleports) touch too many cells to be worth it
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self._grid):
+            return tuple(
+                (group_index, area)
+                for group_index, areas in enumerate(self._areas)
+                for area in areas
+            )
+
+        candidates = []
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                candidates.extend(self._grid.get((cx, cy), ()))
+
+        return tuple(candidates) + self._unbounded
+
+    def intersect_segment(self, start, end):
+        """Return the groups the segment from start to end goes through.
+
+        The result is a tuple of (name, t_enter, t_exit) sorted by
+        t_enter. For each group the earliest entry and latest exit over
+        its areas are given, as fractions of the way from start to end.
+        """
+        x0, y0, z0 = start
+        x1, y1, z1 = end
+
+        min_x, max_x = min(x0, x1), max(x0, x1)
+        min_y, max_y = min(y0, y1), max(y0, y1)
+        min_z, max_z = min(z0, z1), max(z0, z1)
+
+        spans = {}
+        tested = set()
+        for group_index, area in self._get_segment_candidates(
+                x0, y0, x1, y1):
+
+            # Areas spanning several cells are listed more than once
+            if id(area) in tested:
+                continue
+
+            tested.add(id(area))
+
+            if area.bounds is not None:
+                (bx0, by0, bz0), (bx1, by1, bz1) = area.bounds
+                if (max_x < bx0 or min_x > bx1 or max_y < by0 or
+                        min_y > by1 or max_z < bz0 or min_z > bz1):
+
+                    continue
+
+            span = area.intersect_segment_xyz(x0, y0, z0, x1, y1, z1)
+            if span is None:
+                continue
+
+            if group_index in spans:
+                t_enter, t_exit = spans[group_index]
+                span = min(t_enter, span[0]), max(t_exit, span[1])
+
+            spans[group_index] = span
+
+        return tuple(sorted(
+            ((self.names[group_index], t_enter, t_exit)
+             for group_index, (t_enter, t_exit) in spans.items()),
+            key=lambda crossing: crossing[1]
+        ))
@@ -0,0 +1,30 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Stage engine shared by jail games and last requests.
+
+Games declare stages, stage groups, event handlers and push handlers on
+the class. GameMeta validates and compiles them once per class, and every
+game instance binds them to itself, so several instances of the same
+class can run at once.
+"""
+
+from .declarations import (
+    BoundEventHandler, BoundInternalEventHandler, game_event_handler,
+    game_internal_event_handler, GameEventHandler, GameInternalEventHandler,
+    push, Push, stage, Stage)
+from .engine import StageEngine, UnknownStageWarning
+from .meta import GameMeta, UnknownStageError
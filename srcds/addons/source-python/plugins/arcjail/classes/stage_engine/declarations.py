@@ -0,0 +1,144 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+from types import MethodType
+
+from ...resource.profiler import get_handler_name, handler_profiler
+
+
+# =============================================================================
+# >> DECLARATIONS
+# =============================================================================
+class Stage:
+    """Stage declaration; behaves like a method on game instances."""
+    __slots__ = ('stage_id', 'callback')
+
+    def __init__(self, stage_id, callback):
+        self.stage_id = stage_id
+        self.callback = callback
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        return MethodType(self.callback, instance)
+
+
+class GameEventHandler:
+    __slots__ = ('alias', 'event', 'callback')
+
+    def __init__(self, alias, event, callback):
+        self.alias = alias
+        self.event = event
+        self.callback = callback
+
+    def bind(self, game_instance):
+        return BoundEventHandler(self, game_instance)
+
+
+class GameInternalEventHandler(GameEventHandler):
+    __slots__ = ()
+
+    def bind(self, game_instance):
+        return BoundInternalEventHandler(self, game_instance)
+
+
+class Push:
+    __slots__ = ('slot_id', 'push_id', 'callback')
+
+    def __init__(self, slot_id, push_id, callback):
+        self.slot_id = slot_id
+        self.push_id = push_id
+        self.callback = callback
+
+    def bind(self, game_instance):
+        return MethodType(self.callback, game_instance)
+
+
+# =============================================================================
+# >> BOUND HANDLERS
+# =============================================================================
+class BoundEventHandler:
+    """Game event handler bound to a single game instance."""
+    __slots__ = ('handler', 'game_instance')
+
+    def __init__(self, handler, game_instance):
+        self.handler = handler
+        self.game_instance = game_instance
+
+    def __call__(self, event_data):
+        handler = self.handler
+        if handler_profiler.enabled:
+            handler_profiler.call(
+                handler.event, handler.callback, self.game_instance,
+                event_data)
+
+        else:
+            handler.callback(self.game_instance, event_data)
+
+    def __eq__(self, other):
+        if not isinstance(other, BoundEventHandler):
+            return False
+
+        return (
+            (self.handler, self.game_instance) ==
+            (other.handler, other.game_instance)
+        )
+
+    def __hash__(self):
+        return hash((self.handler, self.game_instance))
+
+
+class BoundInternalEventHandler(BoundEventHandler):
+    """Game internal event handler bound to a single game instance.
+
+    InternalEventManager profiles its handlers itself, so this only
+    provides a name to report the handler under.
+    """
+    __slots__ = ()
+
+    def __call__(self, **kwargs):
+        self.handler.callback(self.game_instance, **kwargs)
+
+    @property
+    def profile_name(self):
+        return get_handler_name(self.handler.callback)
+
+
+# =============================================================================
+# >> DECORATORS
+# =============================================================================
+def stage(stage_id):
+    def stage_gen(func):
+        return Stage(stage_id, func)
+    return stage_gen
+
+
+def game_event_handler(alias, event):
+    def decorator(func):
+        return GameEventHandler(alias, event, func)
+    return decorator
+
+
+def game_internal_event_handler(alias, event):
+    def decorator(func):
+        return GameInternalEventHandler(alias, event, func)
+    return decorator
+
+
+def push(slot_id, push_id):
+    def decorator(func):
+        return Push(slot_id, push_id, func)
+    return decorator
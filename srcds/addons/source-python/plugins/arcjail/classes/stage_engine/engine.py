@@ -0,0 +1,156 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import Counter, deque
+from itertools import chain
+import json
+from warnings import warn
+
+from core import echo_console
+from events.manager import event_manager
+
+from ...internal_events import internal_event_manager
+
+from .meta import GameMeta
+
+
+class UnknownStageWarning(Warning):
+    pass
+
+
+class StageEngine(metaclass=GameMeta):
+    """Run the stages of a single game instance."""
+    stage_groups = {}
+
+    def __init__(self):
+        self._lock_stage_queue = False
+        self._cur_stage_id = None
+        self._stage_queue = deque()
+        # Stage -> how many times it has been executed and not undone yet
+        self._executed_stages = Counter()
+
+        self._bound_events = tuple(
+            handler.bind(self) for handler in self._events.values())
+
+        self._bound_internal_events = tuple(
+            handler.bind(self) for handler in self._internal_events.values())
+
+    def launch_stages(self):
+        while self._stage_queue:
+            stage_ = self._stage_queue.popleft()
+            self._cur_stage_id = stage_.stage_id
+
+            stage_.callback(self)
+
+            self._executed_stages[stage_] += 1
+
+        self._cur_stage_id = None
+
+    def _check_stage_group(self, stage_group_id):
+        if stage_group_id in self._compiled_stage_groups:
+            return True
+
+        warn(UnknownStageWarning(
+            "{}: Unknown stage group id '{}', destroying".format(
+                self.__class__.__name__, stage_group_id)))
+
+        self.set_stage_group('destroy')
+        return False
+
+    def set_stage_group(self, stage_group_id):
+        if self._lock_stage_queue:
+            return
+
+        if not self._check_stage_group(stage_group_id):
+            return
+
+        self._stage_queue = deque(self._compiled_stage_groups[stage_group_id])
+
+        if self._cur_stage_id is None:
+            self.launch_stages()
+
+    def insert_stage_group(self, stage_group_id):
+        if self._lock_stage_queue:
+            return
+
+        if not self._check_stage_group(stage_group_id):
+            return
+
+        self._stage_queue.extendleft(
+            reversed(self._compiled_stage_groups[stage_group_id]))
+
+        if self._cur_stage_id is None:
+            self.launch_stages()
+
+    def append_stage_group(self, stage_group_id):
+        if self._lock_stage_queue:
+            return
+
+        if not self._check_stage_group(stage_group_id):
+            return
+
+        self._stage_queue.extend(self._compiled_stage_groups[stage_group_id])
+
+        if self._cur_stage_id is None:
+            self.launch_stages()
+
+    def undo_stages(self, stage_group_ids=None):
+        if stage_group_ids is None:
+            undo_chain = self._undo_chain_all
+        else:
+            if isinstance(stage_group_ids, str):
+                stage_group_ids = (stage_group_ids, )
+
+            undo_chain = chain.from_iterable(
+                self._undo_chains[stage_group_id]
+                for stage_group_id in stage_group_ids
+            )
+
+        for stage_, undo_stage in undo_chain:
+            if not self._executed_stages[stage_]:
+                continue
+
+            self._executed_stages[stage_] -= 1
+
+            if undo_stage is not None:
+                undo_stage.callback(self)
+
+    @property
+    def current_stage_id(self):
+        return self._cur_stage_id
+
+    def print_stages(self):
+        echo_console(json.dumps(self._stage_groups, indent=2))
+
+    def register_event_handlers(self):
+        for handler in self._bound_events:
+            event_manager.register_for_event(handler.handler.event, handler)
+
+        for handler in self._bound_internal_events:
+            internal_event_manager.register_event_handler(
+                handler.handler.event, handler)
+
+    def unregister_event_handlers(self):
+        for handler in self._bound_events:
+            event_manager.unregister_for_event(handler.handler.event, handler)
+
+        for handler in self._bound_internal_events:
+            internal_event_manager.unregister_event_handler(
+                handler.handler.event, handler)
+
+    def bind_push_handlers(self):
+        """Return {(slot_id, push_id): bound push handler} of the game."""
+        return {key: push_.bind(self)
+                for key, push_ in self._push_handlers.items()}
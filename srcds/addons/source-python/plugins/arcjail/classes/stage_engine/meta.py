@@ -0,0 +1,91 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+from itertools import chain
+
+from .declarations import (
+    GameEventHandler, GameInternalEventHandler, Push, Stage)
+
+
+class UnknownStageError(Exception):
+    pass
+
+
+class GameMeta(type):
+    def __new__(mcs, name, bases, namespace):
+        cls = super().__new__(mcs, name, bases, namespace)
+
+        cls._stages_map = {}
+        cls._internal_events = {}
+        cls._events = {}
+        cls._push_handlers = {}
+        cls._stage_groups = {}
+        for base in bases[::-1]:
+            if not isinstance(base, GameMeta):
+                continue
+
+            cls._events.update(base._events)
+            cls._internal_events.update(base._internal_events)
+            cls._push_handlers.update(base._push_handlers)
+            cls._stages_map.update(base._stages_map)
+            cls._stage_groups.update(base._stage_groups)
+
+        for key, value in namespace.items():
+            if isinstance(value, Stage):
+                cls._stages_map[value.stage_id] = value
+
+            elif isinstance(value, GameInternalEventHandler):
+                cls._internal_events[value.alias] = value
+
+            elif isinstance(value, GameEventHandler):
+                cls._events[value.alias] = value
+
+            elif isinstance(value, Push):
+                cls._push_handlers[(value.slot_id, value.push_id)] = value
+
+            elif key == 'stage_groups':
+                cls._stage_groups.update(value)
+
+        compile_stage_groups(cls)
+
+        return cls
+
+
+def compile_stage_groups(cls):
+    """Resolve stage groups of the class into tuples of stages.
+
+    Also precompute undo chains: (stage, undo stage or None) pairs for
+    every stage group and for all of them together.
+    """
+    for stage_group_id, stage_ids in cls._stage_groups.items():
+        for stage_id in stage_ids:
+            if stage_id not in cls._stages_map:
+                raise UnknownStageError(
+                    "{}: Unknown stage id '{}' in stage group '{}'".format(
+                        cls.__name__, stage_id, stage_group_id))
+
+    cls._compiled_stage_groups = {}
+    cls._undo_chains = {}
+    for stage_group_id, stage_ids in cls._stage_groups.items():
+        stages = tuple(cls._stages_map[stage_id] for stage_id in stage_ids)
+        cls._compiled_stage_groups[stage_group_id] = stages
+
+        cls._undo_chains[stage_group_id] = tuple(
+            (stage_, cls._stages_map.get('undo-{}'.format(stage_.stage_id)))
+            for stage_ in stages
+        )
+
+    cls._undo_chain_all = tuple(
+        chain.from_iterable(cls._undo_chains.values()))
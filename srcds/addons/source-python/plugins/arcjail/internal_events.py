@@ -13,44 +13,139 @@
 # You should have received a copy of the GNU General Public License
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
+from time import perf_counter
 from traceback import format_exc
 
 from core import echo_console
 
+from .resource.profiler import handler_profiler
+
 
 class InternalEventManager(dict):
-    def register_event_handler(self, event_name, handler):
-        if event_name not in self:
-            self[event_name] = []
+    """Map event names to compiled tuples of their handlers.
+
+    Dispatch tuples are rebuilt on every (un)registration, so firing an
+    event never sorts or copies anything, and handlers that unregister
+    themselves during the dispatch don't affect the current one.
+    """
+    def __init__(self):
+        super().__init__()
+
+        self._registrations = {}
+        self._registration_count = 0
+        self._stats = {}
+
+    def _compile(self, event_name):
+        registrations = self._registrations[event_name]
+        if not registrations:
+            del self._registrations[event_name]
+            del self[event_name]
+            return
+
+        # Higher priority first, then in order of registration
+        registrations = sorted(
+            registrations.values(), key=lambda r: (-r[0], r[1]))
 
-        if handler in self[event_name]:
+        self[event_name] = tuple(
+            handler for priority, order, handler in registrations)
+
+    def register_event_handler(self, event_name, handler, priority=0):
+        """Register the handler to be called when the event fires.
+
+        Handlers with higher priority are called first.
+        """
+        registrations = self._registrations.setdefault(event_name, {})
+        if handler in registrations:
             raise ValueError("Handler {} is already registered to "
                              "handle '{}'".format(handler, event_name))
 
-        self[event_name].append(handler)
+        self._registration_count += 1
+        registrations[handler] = (
+            priority, self._registration_count, handler)
+
+        self._compile(event_name)
 
     def unregister_event_handler(self, event_name, handler):
-        if event_name not in self:
+        if event_name not in self._registrations:
             raise KeyError("No '{}' event handlers are registered".format(
                 event_name))
 
-        self[event_name].remove(handler)
+        if handler not in self._registrations[event_name]:
+            raise ValueError("Handler {} is not registered to handle "
+                             "'{}'".format(handler, event_name))
 
-        if not self[event_name]:
-            del self[event_name]
+        del self._registrations[event_name][handler]
+
+        self._compile(event_name)
+
+    def _get_event_stats(self, event_name):
+        stats = self._stats.get(event_name)
+        if stats is None:
+            stats = self._stats[event_name] = {
+                'fired': 0,
+                'handler_calls': 0,
+                'exceptions': 0,
+                'total_duration': 0.0,
+                'max_duration': 0.0,
+            }
+
+        return stats
 
     def fire(self, event_name, event_var):
-        exceptions = []
-        for handler in self.get(event_name, ()):
+        dispatch = self.get(event_name)
+        if dispatch is None:
+            return
+
+        if handler_profiler.enabled:
+            self._fire_profiled(event_name, dispatch, event_var)
+            return
+
+        exceptions = 0
+        for handler in dispatch:
             try:
                 handler(**event_var)
-            except Exception as e:
-                exceptions.append(e)
+            except Exception:
+                exceptions += 1
                 echo_console(format_exc())
 
         if exceptions:
             echo_console("{} exceptions were raised during handling of "
-                         "'{}' event".format(len(exceptions), event_name))
+                         "'{}' event".format(exceptions, event_name))
+
+    def _fire_profiled(self, event_name, dispatch, event_var):
+        exceptions = 0
+
+        start_time = perf_counter()
+        for handler in dispatch:
+            try:
+                handler_profiler.call(event_name, handler, **event_var)
+            except Exception:
+                exceptions += 1
+                echo_console(format_exc())
+
+        duration = perf_counter() - start_time
+
+        stats = self._get_event_stats(event_name)
+        stats['fired'] += 1
+        stats['handler_calls'] += len(dispatch)
+        stats['exceptions'] += exceptions
+        stats['total_duration'] += duration
+        stats['max_duration'] = max(stats['max_duration'], duration)
+
+        if exceptions:
+            echo_console("{} exceptions were raised during handling of "
+                         "'{}' event".format(exceptions, event_name))
+
+    def get_stats(self):
+        """Return a copy of per-event counters keyed by event name.
+
+        Counters are only collected while the handler profiler is enabled.
+        """
+        return {event_name: dict(stats)
+                for event_name, stats in self._stats.items()}
+
+    def reset_stats(self):
+        self._stats.clear()
 
 internal_event_manager = InternalEventManager()
 
@@ -58,14 +153,16 @@ internal_event_manager = InternalEventManager()
 class InternalEventBase:
     manager = None
 
-    def __init__(self, event_name):
+    def __init__(self, event_name, priority=0):
         self.event_name = event_name
+        self.priority = priority
 
     def __call__(self, handler):
         self.register(handler)
 
     def register(self, handler):
-        self.manager.register_event_handler(self.event_name, handler)
+        self.manager.register_event_handler(
+            self.event_name, handler, self.priority)
 
     def unregister(self, handler):
         self.manager.unregister_event_handler(self.event_name, handler)
@@ -23,12 +23,14 @@ class ArcjailUser(Base):
     __tablename__ = config['database']['prefix'] + "arcjail_users"
 
     id = Column(Integer, primary_key=True)
-    steamid = Column(String(32))
+    steamid = Column(String(32), index=True, unique=True)
 
     last_seen = Column(Integer)
     last_used_name = Column(String(32))
     last_online_reward = Column(Integer)
     account = Column(Integer)
+
+    # Legacy JSON list of item IDs, moved to user_items on plugin load
     slot_data = Column(Text)
 
     def __repr__(self):
@@ -0,0 +1,37 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+from sqlalchemy import Column, Integer, String
+
+from ..resource.config import config
+from ..resource.sqlalchemy import Base
+
+
+class CreditTransaction(Base):
+    __tablename__ = config['database']['prefix'] + "credit_transactions"
+
+    id = Column(Integer, primary_key=True)
+    steamid = Column(String(32), index=True)
+
+    time = Column(Integer)
+    amount = Column(Integer)
+
+    # Account balance right after this transaction, NULL if the account
+    # wasn't loaded yet
+    balance = Column(Integer)
+    reason = Column(String(64))
+
+    def __repr__(self):
+        return "<CreditTransaction({})>".format(self.id)
@@ -13,7 +13,7 @@
 # You should have received a copy of the GNU General Public License
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Index, Integer, String
 
 from ..resource.config import config
 from ..resource.sqlalchemy import Base
@@ -29,5 +29,10 @@ class Item(Base):
     instance_id = Column(String(32))
     amount = Column(Integer)
 
+    __table_args__ = (
+        Index(config['database']['prefix'] + "items_owner_class_instance",
+              'current_owner', 'class_id', 'instance_id'),
+    )
+
     def __repr__(self):
         return "<Item({})>".format(self.id)
@@ -13,24 +13,36 @@
 # You should have received a copy of the GNU General Public License
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
-import json
 from time import time
 
-from events import Event
-from listeners.tick import GameThread
-
 from ...classes.base_player_manager import BasePlayerManager
+from ...classes.dirty_tracking import DirtyTracking
 from ...internal_events import InternalEvent
 from ...models.arcjail_user import ArcjailUser as DB_ArcjailUser
+from ...models.user_item import UserItem as DB_UserItem
+from ...resource.db_executor import db_executor
 from ...resource.logger import logger
-from ...resource.sqlalchemy import Session
+from ...resource.profiler import Event
+from ...resource.sqlalchemy import Session, upsert
 
 from .item import Item
 from .global_inventory import global_inventory
+from .journal import journal
+from .save_queue import save_queue
+
+
+# Columns that are overwritten when a user row already exists
+USER_UPDATE_COLUMNS = (
+    'last_seen', 'last_used_name', 'last_online_reward', 'account')
+
+# Keeps IN (...) lists below the bound parameter limit of SQLite
+DELETE_CHUNK_SIZE = 500
 
 
-class ArcjailUser:
+class ArcjailUser(DirtyTracking):
     def __init__(self, player):
+        super().__init__()
+
         self.player = player
 
         # We're saving to database asynchronously, and some properties will
@@ -42,12 +54,24 @@ class ArcjailUser:
         self.account = 0
         self.slot_data = []
 
+        # (class_id, instance_id) -> Item and class_id -> [Item, ...]
+        self._items_by_instance_id = {}
+        self._items_by_class_id = {}
+
         self._loaded = False
 
     @property
     def loaded(self):
         return self._loaded
 
+    @property
+    def steamid(self):
+        return self._steamid
+
+    def mark_dirty(self):
+        super().mark_dirty()
+        journal.track_user(self)
+
     def load_from_database(self):
         if self._steamid == "BOT":
             return
@@ -57,51 +81,157 @@ class ArcjailUser:
         db_arcjail_user = db_session.query(DB_ArcjailUser).filter_by(
             steamid=self._steamid).first()
 
-        if db_arcjail_user is not None:
+        if db_arcjail_user is None:
+            from ..credits import credits_config
+
+            self.account = int(
+                credits_config['initial_credits']['initial_credits'])
+
+            self.mark_dirty()
+
+        else:
             self.account = db_arcjail_user.account
             self.last_online_reward = db_arcjail_user.last_online_reward
-            self.slot_data = json.loads(db_arcjail_user.slot_data)
 
-        self._loaded = True
+        # Load all of our items into global_inventory at once, so that
+        # the whole inventory is present by the time we're marked as loaded
+        self.slot_data = global_inventory.load_user_items(
+            self._steamid, db_session)
 
         db_session.close()
 
-        # Iter over all of our items to initialize them in global_inventory
-        list(self.iter_all_items())
+        self._rebuild_item_index()
+        self._loaded = True
 
-    def save_to_database(self):
-        from ..credits import credits_config
+    def load_from_pending_user(self, arcjail_user):
+        """Take over the state of a user who is still waiting to be saved."""
+        self.account = arcjail_user.account
+        self.last_online_reward = arcjail_user.last_online_reward
+        self.slot_data = list(arcjail_user.slot_data)
 
-        if self._steamid == "BOT":
-            return
+        if arcjail_user.dirty:
+            self.mark_dirty()
 
-        if not self._loaded:
-            raise RuntimeError("User couldn't be synced with database")
+        self._rebuild_item_index()
+        self._loaded = True
 
-        db_session = Session()
+    def _get_db_row(self):
+        return {
+            'steamid': self._steamid,
+            'last_seen': time(),
+            'last_used_name': self._name,
+            'last_online_reward': self.last_online_reward,
+            'account': self.account,
+        }
 
-        db_arcjail_user = db_session.query(DB_ArcjailUser).filter_by(
-            steamid=self._steamid).first()
+    def save_to_database(self, db_session=None):
+        own_session = db_session is None
+        if own_session:
+            db_session = Session()
 
-        if db_arcjail_user is None:
-            self.account = int(
-                credits_config['initial_credits']['initial_credits'])
+        revisions = self.save_many((self, ), db_session)
 
-            db_arcjail_user = DB_ArcjailUser()
-            db_arcjail_user.steamid = self._steamid
-            db_session.add(db_arcjail_user)
+        if own_session:
+            db_session.commit()
+            db_session.close()
 
-        db_arcjail_user.last_seen = time()
-        db_arcjail_user.last_used_name = self._name
-        db_arcjail_user.last_online_reward = self.last_online_reward
-        db_arcjail_user.account = self.account
-        db_arcjail_user.slot_data = json.dumps(self.slot_data)
+            for obj, revision in revisions:
+                obj.mark_saved(revision)
 
-        db_session.commit()
-        db_session.close()
+    @classmethod
+    def save_many(cls, arcjail_users, db_session):
+        """Write users, their inventory links and their changed items.
+
+        Every table is written with a single upsert, no matter how many
+        users are saved. Return (object, revision) pairs to pass to
+        mark_saved() once the transaction is committed.
+        """
+        save_data = cls.get_save_data(arcjail_users)
+        cls.write_save_data(save_data, db_session)
+
+        return save_data['revisions']
+
+    @staticmethod
+    def get_save_data(arcjail_users):
+        """Copy what save_many() writes into plain rows.
+
+        Must be called on the game thread. The rows can then be written
+        by write_save_data() on any thread, and the (object, revision)
+        pairs under 'revisions' passed to mark_saved() after the commit.
+        """
+        arcjail_users = [arcjail_user for arcjail_user in arcjail_users
+                         if arcjail_user.steamid != "BOT"]
+
+        for arcjail_user in arcjail_users:
+            if not arcjail_user.loaded:
+                raise RuntimeError("User couldn't be synced with database")
+
+        items = [item for arcjail_user in arcjail_users
+                 for item in arcjail_user.iter_all_items()
+                 if item.loaded and item.dirty]
+
+        revisions = [(arcjail_user, arcjail_user.revision)
+                     for arcjail_user in arcjail_users]
+
+        revisions.extend((item, item.revision) for item in items)
+
+        return {
+            'user_rows': [
+                arcjail_user._get_db_row() for arcjail_user in arcjail_users],
+            'slot_data': {
+                arcjail_user.steamid: list(arcjail_user.slot_data)
+                for arcjail_user in arcjail_users
+            },
+            'item_rows': [item._get_db_row() for item in items],
+            'revisions': revisions,
+        }
 
-        for item in self.iter_all_items():
-            global_inventory.save(item, async=False)
+    @classmethod
+    def write_save_data(cls, save_data, db_session):
+        """Write rows returned by get_save_data()."""
+        if save_data['user_rows']:
+            upsert(
+                db_session, DB_ArcjailUser.__table__, save_data['user_rows'],
+                index_elements=('steamid', ),
+                update_columns=USER_UPDATE_COLUMNS,
+            )
+
+            cls.save_slot_data(save_data['slot_data'], db_session)
+
+        Item.write_rows(save_data['item_rows'], db_session)
+
+    @staticmethod
+    def save_slot_data(slot_data_by_steamid, db_session):
+        """Make user_items match the given SteamID -> item IDs mapping."""
+        steamids = list(slot_data_by_steamid.keys())
+
+        links = {}
+        for steamid, slot_data in slot_data_by_steamid.items():
+            for item_id in slot_data:
+                if item_id is not None:
+                    links[item_id] = steamid
+
+        db_links = dict(db_session.query(
+            DB_UserItem.item_id, DB_UserItem.steamid).filter(
+            DB_UserItem.steamid.in_(steamids)))
+
+        removed_item_ids = [
+            item_id for item_id in db_links if item_id not in links]
+
+        for i in range(0, len(removed_item_ids), DELETE_CHUNK_SIZE):
+            db_session.query(DB_UserItem).filter(DB_UserItem.item_id.in_(
+                removed_item_ids[i:i + DELETE_CHUNK_SIZE])).delete(
+                synchronize_session=False)
+
+        # An item that changed hands is relinked by the same upsert
+        upsert(
+            db_session, DB_UserItem.__table__,
+            [{'steamid': steamid, 'item_id': item_id}
+             for item_id, steamid in links.items()
+             if db_links.get(item_id) != steamid],
+            index_elements=('item_id', ),
+            update_columns=('steamid', ),
+        )
 
     @classmethod
     def save_temp_item(cls, steamid, item):
@@ -113,40 +243,57 @@ class ArcjailUser:
 
         db_session = Session()
 
-        db_arcjail_user = db_session.query(DB_ArcjailUser).filter_by(
-            steamid=steamid).first()
+        upsert(
+            db_session, DB_UserItem.__table__,
+            [{'steamid': steamid, 'item_id': item.id}],
+            index_elements=('item_id', ),
+            update_columns=('steamid', ),
+        )
 
-        if db_arcjail_user is None:
-            db_arcjail_user = DB_ArcjailUser()
-            db_arcjail_user.steamid = steamid
-            db_session.add(db_arcjail_user)
+        db_session.commit()
+        db_session.close()
 
-            slot_data = []
+    def _index_item(self, item):
+        self._items_by_instance_id[item.class_id, item.instance_id] = item
+        self._items_by_class_id.setdefault(item.class_id, []).append(item)
 
-        else:
-            slot_data = json.loads(db_arcjail_user.slot_data)
+    def _unindex_item(self, item):
+        self._items_by_instance_id.pop((item.class_id, item.instance_id), None)
 
-        db_arcjail_user.slot_data = json.dumps(slot_data + [item.id, ])
+        items = self._items_by_class_id.get(item.class_id, [])
+        if item in items:
+            items.remove(item)
+
+        if not items:
+            self._items_by_class_id.pop(item.class_id, None)
+
+    def _rebuild_item_index(self):
+        self._items_by_instance_id.clear()
+        self._items_by_class_id.clear()
+
+        for item in self.iter_all_items():
+            self._index_item(item)
+
+    def _add_item(self, item):
+        self.slot_data.append(item.id)
+        self._index_item(item)
+        self.mark_dirty()
+
+    def _remove_item(self, item):
+        self.slot_data.remove(item.id)
+        self._unindex_item(item)
+        self.mark_dirty()
 
-        db_session.commit()
-        db_session.close()
-    
     def iter_all_items(self):
         for item_id in self.slot_data:
             yield global_inventory[item_id]
-    
+
     def iter_items_by_class_id(self, class_id):
-        for item in self.iter_all_items():
-            if item.class_.class_id == class_id:
-                yield item
-    
+        yield from tuple(self._items_by_class_id.get(class_id, ()))
+
     def get_item_by_instance_id(self, class_id, instance_id):
-        for item in self.iter_items_by_class_id(class_id):
-            if item.class_.instance_id == instance_id:
-                return item
-        
-        return None
-    
+        return self._items_by_instance_id.get((class_id, instance_id))
+
     def give_item(self, *args, amount=1, async=True):
         if isinstance(args[0], Item):
             item = args[0]
@@ -169,7 +316,7 @@ class ArcjailUser:
                     item = Item.create(class_id, instance_id, self.player,
                                        amount, async=False)
 
-                    self.slot_data.append(item.id)
+                    self._add_item(item)
                     logger.log_debug(
                         "ArcjailUser.give_item: ... finished creating new "
                         "item {} (async=True) "
@@ -180,14 +327,14 @@ class ArcjailUser:
                     "instance_id={}) to (SteamID={}) (async=True)...".format(
                         class_id, instance_id, self.player.steamid))
 
-                GameThread(target=create_item).start()
+                db_executor.submit(create_item, key=self._steamid)
                 return None
 
             else:
                 item = Item.create(
                     class_id, instance_id, self.player, amount, async=False)
 
-                self.slot_data.append(item.id)
+                self._add_item(item)
 
                 logger.log_debug(
                     "ArcjailUser.give_item: Created new item {} to "
@@ -198,6 +345,7 @@ class ArcjailUser:
                 return item
 
         item.give(amount, async)
+        self.mark_dirty()
         return item
 
     def take_item(self, *args, amount=1, async=True):
@@ -224,11 +372,12 @@ class ArcjailUser:
             raise ValueError(msg)
 
         if item.amount - amount <= 0:
-            self.slot_data.remove(item.id)
+            self._remove_item(item)
             logger.log_debug("ArcjailUser.take_item: "
                              "-- ID removed from slot data")
 
         item.take(amount, async)
+        self.mark_dirty()
         return item
 
     def __str__(self):
@@ -239,7 +388,12 @@ class ArcjailUserManager(BasePlayerManager):
     def create(self, player):
         self[player.index] = arcjail_user = self._base_class(player)
 
-        GameThread(target=arcjail_user.load_from_database).start()
+        pending_user = save_queue.get_pending_user(arcjail_user.steamid)
+        if pending_user is None:
+            db_executor.submit(
+                arcjail_user.load_from_database, key=arcjail_user.steamid)
+        else:
+            arcjail_user.load_from_pending_user(pending_user)
 
         for callback in self._callbacks_on_player_registered:
             callback(self[player.index])
@@ -251,7 +405,8 @@ class ArcjailUserManager(BasePlayerManager):
         for callback in self._callbacks_on_player_unregistered:
             callback(arcjail_user)
 
-        GameThread(target=arcjail_user.save_to_database).start()
+        if arcjail_user.steamid != "BOT":
+            save_queue.enqueue_user(arcjail_user)
 
         return self.pop(player.index)
 
@@ -268,13 +423,18 @@ def on_player_deleted(player):
     arcjail_user_manager.delete(player)
 
 
+def save_all():
+    """Enqueue users that have changed since they were last saved."""
+    for arcjail_user in arcjail_user_manager.values():
+        if arcjail_user.steamid != "BOT" and arcjail_user.dirty:
+            save_queue.enqueue_user(arcjail_user)
+
+
 @Event('round_end')
 def on_round_end(game_event):
-    for arcjail_user in arcjail_user_manager.values():
-        GameThread(target=arcjail_user.save_to_database).start()
+    save_all()
 
 
 @InternalEvent('unload')
 def on_unload():
-    for arcjail_user in arcjail_user_manager.values():
-        GameThread(target=arcjail_user.save_to_database).start()
+    save_all()
@@ -13,11 +13,14 @@
 # You should have received a copy of the GNU General Public License
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
-from listeners.tick import GameThread
-
+from ...models.item import Item as DB_Item
+from ...models.user_item import UserItem as DB_UserItem
+from ...resource.db_executor import db_executor
 from ...resource.logger import logger
 
 from .item import Item
+from .journal import journal
+from .save_queue import save_queue
 
 
 class GlobalInventory(dict):
@@ -29,12 +32,40 @@ class GlobalInventory(dict):
     def __missing__(self, key):
         item = Item(key)
 
-        GameThread(target=item.load_from_database).start()
+        db_executor.submit(item.load_from_database)
 
         self[key] = item
 
         return item
 
+    def load_user_items(self, steamid, db_session):
+        """Load all items of the given user with a single query.
+
+        Items that are already cached are kept as they are, because they
+        may hold changes that are not written to the database yet.
+        Items whose deletion is not written yet are skipped.
+        Return the list of the user's item IDs.
+        """
+        items = [
+            Item.from_db_item(db_item) for db_item in db_session.query(
+                DB_Item).join(
+                DB_UserItem, DB_UserItem.item_id == DB_Item.id).filter(
+                DB_UserItem.steamid == steamid)
+            if not save_queue.is_item_deleted(db_item.id)
+        ]
+
+        new_items = {
+            item.id: item for item in items if item.id not in self}
+
+        self.update(new_items)
+
+        logger.log_debug(
+            "GlobalInventory.load_user_items: Loaded {} items of "
+            "(SteamID={}), {} of them were not cached".format(
+                len(items), steamid, len(new_items)))
+
+        return [item.id for item in items]
+
     def create(self, class_id, instance_id, player=None, amount=1, async=True):
         from .arcjail_user import ArcjailUser
 
@@ -73,7 +104,8 @@ class GlobalInventory(dict):
 
             self._temp_items.append(item)
 
-            GameThread(target=save_to_database).start()
+            db_executor.submit(
+                save_to_database, key=item.current_owner or None)
 
         else:
             logger.log_debug("GlobalInventory.create: Saving created item {} "
@@ -89,11 +121,15 @@ class GlobalInventory(dict):
                          "(async={})".format(item, async))
 
         del self[item.id]
+        save_queue.discard_item(item)
+        journal.track_item_deletion(item)
 
         if async:
-            GameThread(target=item.delete_from_database).start()
+            save_queue.enqueue_item_deletion(item)
         else:
+            item_id = item.id
             item.delete_from_database()
+            journal.forget_deleted_items((item_id, ))
 
     @staticmethod
     def save(item, async=True):
@@ -101,7 +137,7 @@ class GlobalInventory(dict):
                          "(async={})".format(item, async))
 
         if async:
-            GameThread(target=item.save_to_database).start()
+            save_queue.enqueue_item(item)
         else:
             item.save_to_database()
 
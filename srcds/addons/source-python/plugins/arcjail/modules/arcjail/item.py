@@ -15,19 +15,28 @@
 
 from players.helpers import index_from_steamid
 
+from ...classes.dirty_tracking import DirtyTracking
 from ...models.item import Item as DB_Item
+from ...models.user_item import UserItem as DB_UserItem
 
 from ...resource.logger import logger
 
-from ...resource.sqlalchemy import Session
+from ...resource.sqlalchemy import Session, upsert
 
 from ..players import player_manager
 
 from .item_classes import item_classes
+from .journal import journal
 
 
-class Item:
+# Columns that are overwritten when an item row already exists
+ITEM_UPDATE_COLUMNS = ('current_owner', 'class_id', 'instance_id', 'amount')
+
+
+class Item(DirtyTracking):
     def __init__(self, id_):
+        super().__init__()
+
         self.id = id_
         self._current_owner = ""
         self.class_id = None
@@ -36,6 +45,14 @@ class Item:
 
         self._loaded = False
 
+    @property
+    def current_owner(self):
+        return self._current_owner
+
+    def mark_dirty(self):
+        super().mark_dirty()
+        journal.track_item(self)
+
     @property
     def class_(self):
         return item_classes[self.class_id][self.instance_id]
@@ -52,6 +69,8 @@ class Item:
         else:
             self._current_owner = player.steamid
 
+        self.mark_dirty()
+
     player = property(get_player, set_player)
 
     @property
@@ -69,6 +88,11 @@ class Item:
             logger.log_warning(msg)
             raise KeyError(msg)
 
+        self._load_from_db_item(db_item)
+
+        db_session.close()
+
+    def _load_from_db_item(self, db_item):
         self._current_owner = db_item.current_owner
         self.class_id = db_item.class_id
         self.instance_id = db_item.instance_id
@@ -76,52 +100,124 @@ class Item:
 
         self._loaded = True
 
-        db_session.close()
+    @classmethod
+    def from_db_item(cls, db_item):
+        item = cls(db_item.id)
+        item._load_from_db_item(db_item)
+        return item
 
-    def save_to_database(self):
+    def _get_db_row(self):
+        db_row = {
+            'current_owner': self._current_owner,
+            'class_id': self.class_id,
+            'instance_id': self.instance_id,
+            'amount': self.amount,
+        }
+
+        if self.id is not None:
+            db_row['id'] = self.id
+
+        return db_row
+
+    def save_to_database(self, db_session=None):
         if not self._loaded:
             msg = "Item {} couldn't be synced with database".format(self)
             logger.log_warning(msg)
             raise RuntimeError(msg)
 
-        db_session = Session()
+        revision = self.revision
 
-        db_item = db_session.query(DB_Item).filter_by(id=self.id).first()
+        own_session = db_session is None
+        if own_session:
+            db_session = Session()
 
-        if db_item is None:
-            db_item = DB_Item()
-            db_session.add(db_item)
+        if self.id is None:
+            result = db_session.execute(
+                DB_Item.__table__.insert(), self._get_db_row())
 
-        db_item.current_owner = self._current_owner
-        db_item.class_id = self.class_id
-        db_item.instance_id = self.instance_id
-        db_item.amount = self.amount
+            self.id = result.inserted_primary_key[0]
 
-        db_session.commit()
+        else:
+            self.save_many((self, ), db_session)
 
-        self.id = db_item.id
+        if own_session:
+            db_session.commit()
+            db_session.close()
 
-        db_session.close()
+            self.mark_saved(revision)
 
-    def delete_from_database(self):
-        db_session = Session()
+    @staticmethod
+    def save_many(items, db_session):
+        """Write already created items with a single upsert.
 
-        db_item = db_session.query(DB_Item).filter_by(id=self.id).first()
-        if db_item is None:
-            db_session.close()
+        Return (item, revision) pairs to pass to mark_saved() once the
+        transaction is committed.
+        """
+        for item in items:
+            if item.id is None:
+                raise ValueError("Item {} is yet to be created in the "
+                                 "database".format(item))
+
+        revisions = [(item, item.revision) for item in items]
+
+        Item.write_rows([item._get_db_row() for item in items], db_session)
+
+        return revisions
+
+    @staticmethod
+    def write_rows(db_rows, db_session):
+        """Upsert rows of already created items made by _get_db_row()."""
+        upsert(
+            db_session, DB_Item.__table__, db_rows,
+            index_elements=('id', ),
+            update_columns=ITEM_UPDATE_COLUMNS,
+        )
+
+    @staticmethod
+    def delete_rows(item_id, db_session):
+        """Delete the rows of the item with the given ID.
+
+        Return False if there's no such item in the database.
+        """
+        db_session.execute(DB_UserItem.__table__.delete().where(
+            DB_UserItem.item_id == item_id))
+
+        result = db_session.execute(DB_Item.__table__.delete().where(
+            DB_Item.id == item_id))
+
+        return bool(result.rowcount)
+
+    def delete_from_database(self, db_session=None):
+        """Delete the item rows.
+
+        With a given session the item keeps its ID until the caller has
+        committed and called mark_deleted(), so a failed transaction can
+        be retried.
+        """
+        own_session = db_session is None
+        if own_session:
+            db_session = Session()
+
+        if not self.delete_rows(self.id, db_session):
+            if own_session:
+                db_session.rollback()
+                db_session.close()
 
             msg = "Item (id={}) does not exist in the database".format(self.id)
             logger.log_warning(msg)
             raise KeyError(msg)
 
-        db_session.delete(db_item)
+        if own_session:
+            db_session.commit()
+            db_session.close()
+
+            self.mark_deleted()
 
+    def mark_deleted(self):
+        """Forget the database ID once the deletion is committed."""
         self.id = None
         self._loaded = False
 
-        db_session.commit()
-        db_session.close()
-
     @staticmethod
     def delete(item, async=True):
         from .global_inventory import global_inventory
@@ -144,12 +240,14 @@ class Item:
             raise ValueError(msg)
 
         self.amount -= amount
+        self.mark_dirty()
 
         if not self.amount:
             Item.delete(self, async)
 
     def give(self, amount, async=True):
         self.amount += amount
+        self.mark_dirty()
 
     def __str__(self):
         return "<Item(id={}, class_id={}, instance_id={})>".format(
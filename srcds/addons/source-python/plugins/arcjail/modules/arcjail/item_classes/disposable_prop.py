@@ -18,10 +18,10 @@ from random import randint
 from engines.precache import Model
 from engines.sound import Attenuation, Sound
 from entities.entity import Entity
-from events import Event
 
 from mathlib import Vector
 
+from ....resource.profiler import Event
 from ....resource.strings import build_module_strings
 
 from ..item_instance import BaseItemInstance
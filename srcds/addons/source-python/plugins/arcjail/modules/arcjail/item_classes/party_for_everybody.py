@@ -14,11 +14,11 @@
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
 from filters.players import PlayerIter
-from listeners.tick import Delay
 
 from controlled_cvars.handlers import sound_nullable_handler
 
 from ....resource.strings import build_module_strings
+from ....resource.timer_wheel import timer_wheel
 
 from ... import build_module_config
 from ...players import broadcast
@@ -58,7 +58,7 @@ class PartyForEverybody(BaseItemInstance):
             for player_ in PlayerIter(['alive'], ['spec', 'un']):
                 player_.give_named_item(self['entity_to_give'])
 
-        Delay(self.get('delay', 0), party)
+        timer_wheel.delay(self.get('delay', 0), party)
 
         return None
 
@@ -12,9 +12,9 @@
 # You should have received a copy of the GNU General Public License
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
-from events import Event
 from listeners import OnClientDisconnect
 
+from ....resource.profiler import Event
 from ....resource.strings import build_module_strings
 
 from ...teams import PRISONERS_TEAM
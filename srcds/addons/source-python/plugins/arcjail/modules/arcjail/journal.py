@@ -0,0 +1,365 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Write-ahead journal of account and inventory changes.
+
+Changed users and items are appended to a local file as JSON lines. The
+lines are written and fsync'ed in batches every sync_interval seconds by
+a separate thread. After every successful save queue flush, the journal
+is rewritten to hold only state that is still unsaved, so it stays small.
+
+If the server crashes, replay() applies the journal to the database on
+the next load, before anything is read from it.
+"""
+
+import json
+import os
+from queue import Queue
+from threading import Lock
+from time import time
+from traceback import format_exc
+
+from listeners.tick import GameThread, TickRepeat
+
+from controlled_cvars.handlers import float_handler
+
+from ...internal_events import InternalEvent
+from ...models.arcjail_user import ArcjailUser as DB_ArcjailUser
+from ...models.item import Item as DB_Item
+from ...models.user_item import UserItem as DB_UserItem
+from ...resource.logger import logger
+from ...resource.paths import ARCJAIL_DATA_PATH
+from ...resource.sqlalchemy import Session, upsert
+
+from .. import build_module_config
+
+
+CHECK_INTERVAL = 0.1
+JOURNAL_FILE = ARCJAIL_DATA_PATH / "journal.jsonl"
+
+# Keeps IN (...) lists below the bound parameter limit of SQLite
+DELETE_CHUNK_SIZE = 500
+
+
+config_manager = build_module_config('arcjail/journal')
+
+config_manager.controlled_cvar(
+    float_handler,
+    "sync_interval",
+    default=1.0,
+    description="Write and fsync journaled account and inventory changes "
+                "every X seconds",
+)
+
+
+def serialize_user(arcjail_user):
+    return {
+        'type': 'user',
+        'steamid': arcjail_user.steamid,
+        'account': arcjail_user.account,
+        'last_online_reward': arcjail_user.last_online_reward,
+        'slot_data': list(arcjail_user.slot_data),
+        'time': time(),
+    }
+
+
+def serialize_item(item):
+    return {
+        'type': 'item',
+        'id': item.id,
+        'current_owner': item.current_owner,
+        'class_id': item.class_id,
+        'instance_id': item.instance_id,
+        'amount': item.amount,
+    }
+
+
+class Journal:
+    def __init__(self, path):
+        self._path = path
+        self._lock = Lock()
+
+        # Objects with unsaved state and the ones changed since last sync
+        self._tracked = {}
+        self._pending = {}
+
+        self._deleted_item_ids = set()
+        self._pending_deleted_item_ids = set()
+
+        self._checkpoint_requested = False
+        self._last_sync = time()
+
+        self._commands = Queue()
+        self._writer = None
+        self._file = None
+
+    def start(self):
+        if self._writer is not None:
+            return
+
+        self._file = open(self._path, 'a', encoding='utf-8')
+
+        self._writer = GameThread(target=self._work)
+        self._writer.start()
+
+    def stop(self):
+        """Write what's left and close the journal.
+
+        Should be called after everything has been saved, so that the
+        journal is left empty on a clean shutdown.
+        """
+        if self._writer is None:
+            return
+
+        self.request_checkpoint()
+        self.sync()
+
+        self._commands.put(None)
+        self._writer.join()
+        self._writer = None
+
+        self._file.close()
+        self._file = None
+
+    def track_user(self, arcjail_user):
+        if arcjail_user.steamid == "BOT":
+            return
+
+        key = ('user', arcjail_user.steamid)
+        with self._lock:
+            self._tracked[key] = self._pending[key] = arcjail_user
+
+    def track_item(self, item):
+        if item.id is None:
+            return
+
+        key = ('item', item.id)
+        with self._lock:
+            self._tracked[key] = self._pending[key] = item
+
+    def track_item_deletion(self, item):
+        key = ('item', item.id)
+        with self._lock:
+            self._tracked.pop(key, None)
+            self._pending.pop(key, None)
+
+            self._deleted_item_ids.add(item.id)
+            self._pending_deleted_item_ids.add(item.id)
+
+    def forget_deleted_items(self, item_ids):
+        """Called once the given item deletions are in the database."""
+        with self._lock:
+            self._deleted_item_ids.difference_update(item_ids)
+
+    def request_checkpoint(self):
+        """Drop saved state from the journal on the next sync."""
+        with self._lock:
+            self._checkpoint_requested = True
+
+    def sync(self):
+        with self._lock:
+            if self._checkpoint_requested:
+                self._checkpoint_requested = False
+
+                self._tracked = {
+                    key: obj for key, obj in self._tracked.items()
+                    if obj.dirty
+                }
+
+                objects = dict(self._tracked)
+                deleted_item_ids = set(self._deleted_item_ids)
+                command = 'rewrite'
+
+            else:
+                objects = self._pending
+                deleted_item_ids = self._pending_deleted_item_ids
+                command = 'append'
+
+            self._pending = {}
+            self._pending_deleted_item_ids = set()
+
+        entries = [{'type': 'item_deleted', 'id': item_id}
+                   for item_id in deleted_item_ids]
+
+        not_loaded = {}
+        for key, obj in objects.items():
+            # Don't let defaults of an object that is still loading
+            # overwrite the database on replay
+            if not obj.loaded:
+                not_loaded[key] = obj
+                continue
+
+            if key[0] == 'user':
+                entries.append(serialize_user(obj))
+            else:
+                entries.append(serialize_item(obj))
+
+        if not_loaded:
+            with self._lock:
+                for key, obj in not_loaded.items():
+                    self._pending.setdefault(key, obj)
+
+        if entries or command == 'rewrite':
+            self._commands.put(
+                (command, [json.dumps(entry) for entry in entries]))
+
+    def _append(self, lines):
+        if not lines:
+            return
+
+        self._file.write(''.join(line + '\n' for line in lines))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _rewrite(self, lines):
+        temp_path = self._path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(''.join(line + '\n' for line in lines))
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._file.close()
+        os.replace(temp_path, self._path)
+        self._file = open(self._path, 'a', encoding='utf-8')
+
+    def _work(self):
+        while True:
+            command = self._commands.get()
+            if command is None:
+                break
+
+            name, lines = command
+            try:
+                if name == 'rewrite':
+                    self._rewrite(lines)
+                else:
+                    self._append(lines)
+
+            except Exception:
+                logger.log_warning(
+                    "Journal: Couldn't write {} entries:\n{}".format(
+                        len(lines), format_exc()))
+
+    def tick(self):
+        if time() - self._last_sync < config_manager['sync_interval']:
+            return
+
+        self._last_sync = time()
+        self.sync()
+
+journal = Journal(JOURNAL_FILE)
+
+_tick_repeat = TickRepeat(journal.tick)
+
+
+def replay():
+    """Apply the journal of a crashed server to the database."""
+    from .arcjail_user import ArcjailUser
+
+    if not JOURNAL_FILE.isfile():
+        return
+
+    users = {}
+    items = {}
+    deleted_item_ids = set()
+
+    with open(JOURNAL_FILE, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # The write that was going on during the crash
+                logger.log_warning(
+                    "Journal.replay: Skipping broken entry {}".format(line))
+
+                continue
+
+            if entry['type'] == 'user':
+                users[entry['steamid']] = entry
+
+            elif entry['type'] == 'item':
+                items[entry['id']] = entry
+                deleted_item_ids.discard(entry['id'])
+
+            elif entry['type'] == 'item_deleted':
+                items.pop(entry['id'], None)
+                deleted_item_ids.add(entry['id'])
+
+    if not (users or items or deleted_item_ids):
+        return
+
+    logger.log_warning(
+        "Journal.replay: Restoring {} users, {} items and {} item "
+        "deletions that weren't saved before shutdown".format(
+            len(users), len(items), len(deleted_item_ids)))
+
+    db_session = Session()
+
+    deleted_item_ids = list(deleted_item_ids)
+    for i in range(0, len(deleted_item_ids), DELETE_CHUNK_SIZE):
+        chunk = deleted_item_ids[i:i + DELETE_CHUNK_SIZE]
+
+        db_session.execute(DB_UserItem.__table__.delete().where(
+            DB_UserItem.item_id.in_(chunk)))
+
+        db_session.execute(DB_Item.__table__.delete().where(
+            DB_Item.id.in_(chunk)))
+
+    upsert(
+        db_session, DB_Item.__table__,
+        [{key: value for key, value in entry.items() if key != 'type'}
+         for entry in items.values()],
+        index_elements=('id', ),
+        update_columns=('current_owner', 'class_id', 'instance_id', 'amount'),
+    )
+
+    upsert(
+        db_session, DB_ArcjailUser.__table__,
+        [{
+            'steamid': entry['steamid'],
+            'account': entry['account'],
+            'last_online_reward': entry['last_online_reward'],
+            'last_seen': entry['time'],
+        } for entry in users.values()],
+        index_elements=('steamid', ),
+        update_columns=('account', 'last_online_reward', 'last_seen'),
+    )
+
+    deleted_item_ids = set(deleted_item_ids)
+    if users:
+        ArcjailUser.save_slot_data({
+            steamid: [item_id for item_id in entry['slot_data']
+                      if item_id not in deleted_item_ids]
+            for steamid, entry in users.items()
+        }, db_session)
+
+    db_session.commit()
+    db_session.close()
+
+    # Everything is in the database now
+    open(JOURNAL_FILE, 'w').close()
+
+
+@InternalEvent('load')
+def on_load():
+    journal.start()
+    _tick_repeat.start(CHECK_INTERVAL, limit=0)
+
+
+@InternalEvent('unload')
+def on_unload():
+    # The journal itself is closed by the save queue after its final flush
+    _tick_repeat.stop()
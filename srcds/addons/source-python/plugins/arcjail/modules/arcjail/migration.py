@@ -0,0 +1,124 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Brings databases created by older ArcJail versions up to date.
+Everything here is safe to run on every plugin load.
+"""
+
+import json
+
+from sqlalchemy import func, inspect
+
+from ...models.arcjail_user import ArcjailUser as DB_ArcjailUser
+from ...models.item import Item as DB_Item
+from ...models.user_item import UserItem as DB_UserItem
+from ...resource.logger import logger
+from ...resource.sqlalchemy import engine, Session
+
+
+def ensure_indexes(*models):
+    """Create indexes that create_all() skips on already existing tables."""
+    inspector = inspect(engine)
+    for model in models:
+        table = model.__table__
+        existing_names = set(
+            index['name'] for index in inspector.get_indexes(table.name))
+
+        for index in table.indexes:
+            if index.name in existing_names:
+                continue
+
+            logger.log_debug("ArcJail: Creating index {} on {}".format(
+                index.name, table.name))
+
+            index.create(engine)
+
+
+def dedupe_users():
+    """Merge duplicate user rows so that steamid can be made unique.
+
+    The most recently seen row of every SteamID is kept.
+    """
+    db_session = Session()
+
+    steamids = [steamid for steamid, in db_session.query(
+        DB_ArcjailUser.steamid).group_by(DB_ArcjailUser.steamid).having(
+        func.count(DB_ArcjailUser.id) > 1)]
+
+    for steamid in steamids:
+        db_arcjail_users = db_session.query(DB_ArcjailUser).filter_by(
+            steamid=steamid).order_by(
+            DB_ArcjailUser.last_seen.desc(), DB_ArcjailUser.id.desc()).all()
+
+        logger.log_warning(
+            "ArcJail: Found {} user rows of (SteamID={}), keeping {}".format(
+                len(db_arcjail_users), steamid, db_arcjail_users[0]))
+
+        for db_arcjail_user in db_arcjail_users[1:]:
+            db_session.delete(db_arcjail_user)
+
+    db_session.commit()
+    db_session.close()
+
+
+def migrate_slot_data():
+    """Move JSON slot_data item lists to the user_items table."""
+    db_session = Session()
+
+    db_arcjail_users = db_session.query(DB_ArcjailUser).filter(
+        DB_ArcjailUser.slot_data.isnot(None)).all()
+
+    if not db_arcjail_users:
+        db_session.close()
+        return
+
+    logger.log_debug("ArcJail: Migrating inventories of {} users to "
+                     "user_items...".format(len(db_arcjail_users)))
+
+    existing_item_ids = set(
+        item_id for item_id, in db_session.query(DB_Item.id))
+
+    linked_item_ids = set(
+        item_id for item_id, in db_session.query(DB_UserItem.item_id))
+
+    for db_arcjail_user in db_arcjail_users:
+        for item_id in json.loads(db_arcjail_user.slot_data):
+            if item_id not in existing_item_ids:
+                continue
+
+            if item_id in linked_item_ids:
+                continue
+
+            db_user_item = DB_UserItem()
+            db_user_item.steamid = db_arcjail_user.steamid
+            db_user_item.item_id = item_id
+            db_session.add(db_user_item)
+
+            linked_item_ids.add(item_id)
+
+        db_arcjail_user.slot_data = None
+
+    db_session.commit()
+    db_session.close()
+
+    logger.log_debug("ArcJail: End of inventory migration")
+
+
+def migrate():
+    # Duplicate rows may still hold legacy slot_data
+    migrate_slot_data()
+    dedupe_users()
+    ensure_indexes(DB_ArcjailUser, DB_Item, DB_UserItem)
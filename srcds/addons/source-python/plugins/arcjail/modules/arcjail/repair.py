@@ -15,18 +15,17 @@
 
 """
 This module fixes consequences of server crashes.
-Since items are saved/deleted in the database immediately, while ArcjailUser's
-are only saved on their disconnection / round end, there might be the case
-where either:
-a) Item was removed from the database, but is still referenced in ArcjailUser
-b) Item was created in the database, but is yet to be referenced in ArcjailUser
+Since items are created in the database immediately, while ArcjailUser's
+(and their user_items references) are only saved on their disconnection /
+round end, there might be the case where either:
+a) Item was removed from the database, but is still referenced in user_items
+b) Item was created in the database, but is yet to be referenced in user_items
 """
 
-import json
-
 from ...internal_events import InternalEvent
 from ...models.arcjail_user import ArcjailUser as DB_ArcjailUser
 from ...models.item import Item as DB_Item
+from ...models.user_item import UserItem as DB_UserItem
 from ...resource.logger import logger
 from ...resource.sqlalchemy import Session
 
@@ -38,42 +37,44 @@ def repair():
 
     # Fix old references to deleted items
     logger.log_debug("Step 1/2...")
-    for db_arcjail_user in db_session.query(DB_ArcjailUser).all():
-        slot_data = json.loads(db_arcjail_user.slot_data)
-        new_slot_data = []
+    for db_user_item in db_session.query(DB_UserItem).outerjoin(
+            DB_Item, DB_UserItem.item_id == DB_Item.id).filter(
+            DB_Item.id.is_(None)):
 
-        for item_id in slot_data:
-            db_item = db_session.query(DB_Item).filter_by(id=item_id).first()
-            if db_item is not None:
-                new_slot_data.append(item_id)
-            else:
-                logger.log_debug("[!] User '{}' has invalid item '{}'".format(
-                    db_arcjail_user.id, item_id))
+        logger.log_debug("[!] User '{}' has invalid item '{}'".format(
+            db_user_item.steamid, db_user_item.item_id))
 
-        db_arcjail_user.slot_data = json.dumps(new_slot_data)
+        db_session.delete(db_user_item)
 
     # Fix missing references to newly obtained items
     # Also remove items that belong to deleted players
     logger.log_debug("Step 2/2...")
-    for db_item in db_session.query(DB_Item).all():
-        db_arcjail_user = db_session.query(DB_ArcjailUser).filter_by(
-            steamid=db_item.current_owner).first()
-
-        if db_arcjail_user is None:
+    for db_item, user_id, linked_item_id in db_session.query(
+            DB_Item, DB_ArcjailUser.id, DB_UserItem.item_id).outerjoin(
+            DB_ArcjailUser,
+            DB_Item.current_owner == DB_ArcjailUser.steamid).outerjoin(
+            DB_UserItem, DB_Item.id == DB_UserItem.item_id).filter(
+            (DB_ArcjailUser.id.is_(None)) | (DB_UserItem.item_id.is_(None))):
+
+        if user_id is None:
             logger.log_debug(
                 "[!] Item '{}' belongs to invalid user".format(db_item.id))
 
+            if linked_item_id is not None:
+                db_session.query(DB_UserItem).filter_by(
+                    item_id=db_item.id).delete(synchronize_session=False)
+
             db_session.delete(db_item)
             continue
 
-        slot_data = json.loads(db_arcjail_user.slot_data)
-        if db_item.id not in slot_data:
-            logger.log_debug(
-                "[!] User '{}' did not have item '{}' "
-                "that belongs to him".format(db_arcjail_user.id, db_item.id))
+        logger.log_debug(
+            "[!] User '{}' did not have item '{}' "
+            "that belongs to him".format(user_id, db_item.id))
 
-            slot_data.append(db_item.id)
-            db_arcjail_user.slot_data = json.dumps(slot_data)
+        db_user_item = DB_UserItem()
+        db_user_item.steamid = db_item.current_owner
+        db_user_item.item_id = db_item.id
+        db_session.add(db_user_item)
 
     db_session.commit()
     db_session.close()
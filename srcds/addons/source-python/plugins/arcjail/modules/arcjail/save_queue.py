@@ -0,0 +1,408 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Write-behind persistence for ArcjailUser and Item objects.
+
+Instead of spawning a thread and opening a session per saved object, callers
+enqueue objects here. Pending saves are coalesced (saving the same object
+twice before a flush only writes it once) and are written by a single
+database job in one transaction per flush window. The rows to write are
+copied on the game thread, and the objects are marked as saved there once
+the job is done.
+"""
+
+from concurrent.futures import wait
+from threading import Lock
+from time import time
+from traceback import format_exc
+
+from listeners.tick import TickRepeat
+
+from controlled_cvars.handlers import float_handler
+
+from ...internal_events import InternalEvent
+from ...resource.db_executor import db_executor
+from ...resource.logger import logger
+from ...resource.sqlalchemy import Session
+
+from .. import build_module_config
+
+from .item import Item
+from .journal import journal
+
+
+CHECK_INTERVAL = 1
+
+
+config_manager = build_module_config('arcjail/save_queue')
+
+config_manager.controlled_cvar(
+    float_handler,
+    "flush_interval",
+    default=5.0,
+    description="Write pending user and item saves to the database "
+                "every X seconds",
+)
+
+
+class SaveQueue:
+    def __init__(self):
+        self._lock = Lock()
+
+        self._users = {}
+        self._items = {}
+        self._deleted_items = {}
+
+        # Objects that are being written by the flush job right now
+        self._in_flight_users = {}
+        self._in_flight_deleted_item_ids = set()
+
+        # The batch of the flush job that isn't complete yet and its Future
+        self._flush_batch = None
+        self._flush_future = None
+        self._running = True
+        self._last_flush = time()
+
+        self._stats = {
+            'flushes': 0,
+            'failed_flushes': 0,
+            'users_written': 0,
+            'items_written': 0,
+            'items_deleted': 0,
+            'max_depth': 0,
+            'last_flush_duration': 0.0,
+            'max_flush_duration': 0.0,
+        }
+
+    @property
+    def depth(self):
+        with self._lock:
+            return self._get_depth()
+
+    def _get_depth(self):
+        return len(self._users) + len(self._items) + len(self._deleted_items)
+
+    def _update_max_depth(self):
+        self._stats['max_depth'] = max(
+            self._stats['max_depth'], self._get_depth())
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['depth'] = self._get_depth()
+            stats['pending_users'] = len(self._users)
+            stats['pending_items'] = len(self._items)
+            stats['pending_deletions'] = len(self._deleted_items)
+
+        return stats
+
+    def enqueue_user(self, arcjail_user):
+        with self._lock:
+            self._users[arcjail_user.steamid] = arcjail_user
+            self._update_max_depth()
+
+        if not self._running:
+            self.flush()
+
+    def enqueue_item(self, item):
+        if item.id is None:
+            raise ValueError("Item {} is yet to be created in the "
+                             "database".format(item))
+
+        with self._lock:
+            if item.id not in self._deleted_items:
+                self._items[item.id] = item
+                self._update_max_depth()
+
+        if not self._running:
+            self.flush()
+
+    def enqueue_item_deletion(self, item):
+        if item.id is None:
+            raise ValueError("Item {} is yet to be created in the "
+                             "database".format(item))
+
+        with self._lock:
+            self._items.pop(item.id, None)
+            self._deleted_items[item.id] = item
+            self._update_max_depth()
+
+        if not self._running:
+            self.flush()
+
+    def discard_item(self, item):
+        with self._lock:
+            self._items.pop(item.id, None)
+
+    def get_pending_user(self, steamid):
+        """Return the not yet written ArcjailUser with the given SteamID.
+
+        Its state is newer than what the database holds, so it should be
+        used instead of loading the user from the database.
+        """
+        with self._lock:
+            arcjail_user = self._users.get(steamid)
+            if arcjail_user is None:
+                arcjail_user = self._in_flight_users.get(steamid)
+
+        return arcjail_user
+
+    def is_item_deleted(self, item_id):
+        with self._lock:
+            return (item_id in self._deleted_items or
+                    item_id in self._in_flight_deleted_item_ids)
+
+    def _pop_pending(self):
+        with self._lock:
+            users = list(self._users.values())
+            items = list(self._items.values())
+            deleted_items = list(self._deleted_items.values())
+
+            self._users.clear()
+            self._items.clear()
+            self._deleted_items.clear()
+
+            self._in_flight_users = {
+                arcjail_user.steamid: arcjail_user for arcjail_user in users}
+
+            self._in_flight_deleted_item_ids = set(
+                item.id for item in deleted_items)
+
+        return users, items, deleted_items
+
+    def _requeue(self, users, items, deleted_items):
+        with self._lock:
+            for arcjail_user in users:
+                self._users.setdefault(arcjail_user.steamid, arcjail_user)
+
+            for item in deleted_items:
+                self._deleted_items.setdefault(item.id, item)
+
+            for item in items:
+                if item.id not in self._deleted_items:
+                    self._items.setdefault(item.id, item)
+
+    def _clear_in_flight(self):
+        with self._lock:
+            self._in_flight_users.clear()
+            self._in_flight_deleted_item_ids.clear()
+
+    def flush(self):
+        """Write everything that is pending in a single transaction."""
+        batch = self._prepare(*self._pop_pending())
+        if batch is not None:
+            self._complete(batch, self._write(batch))
+
+    def _prepare(self, users, items, deleted_items):
+        """Copy the state to write into plain rows.
+
+        Must be called on the game thread, so that the flush job never
+        reads users and items while the game is changing them.
+        """
+        from .arcjail_user import ArcjailUser
+
+        for arcjail_user in tuple(users):
+            if not arcjail_user.loaded:
+                logger.log_warning(
+                    "SaveQueue.flush: {} couldn't be synced with database, "
+                    "dropping it from the queue".format(arcjail_user))
+
+                users.remove(arcjail_user)
+
+        # Items that were deleted synchronously in the meantime
+        items = [item for item in items if item.loaded]
+
+        if not (users or items or deleted_items):
+            self._clear_in_flight()
+            return None
+
+        batch = ArcjailUser.get_save_data(users)
+
+        # Items that belong to the users are saved along with them
+        user_item_ids = set()
+        for slot_data in batch['slot_data'].values():
+            user_item_ids.update(slot_data)
+
+        for item in items:
+            if item.id not in user_item_ids:
+                batch['item_rows'].append(item._get_db_row())
+                batch['revisions'].append((item, item.revision))
+
+        batch['users'] = users
+        batch['items'] = items
+        batch['deleted_items'] = deleted_items
+        batch['deleted_item_ids'] = [item.id for item in deleted_items]
+
+        return batch
+
+    def _write(self, batch):
+        """Write a batch made by _prepare() in a single transaction.
+
+        Only reads the plain rows of the batch, so it can run on a DB
+        thread. Return a result to pass to _complete().
+        """
+        from .arcjail_user import ArcjailUser
+
+        start_time = time()
+
+        db_session = Session()
+        try:
+            # Items keep their IDs until the commit, so a failed flush
+            # requeues the deletions under the right IDs
+            deleted_item_ids = [
+                item_id for item_id in batch['deleted_item_ids']
+                if Item.delete_rows(item_id, db_session)]
+
+            ArcjailUser.write_save_data(batch, db_session)
+
+            db_session.commit()
+
+        except Exception:
+            db_session.rollback()
+            return {'error': format_exc()}
+
+        finally:
+            db_session.close()
+
+        return {
+            'error': None,
+            'deleted_item_ids': deleted_item_ids,
+            'duration': time() - start_time,
+        }
+
+    def _complete(self, batch, result):
+        """Apply the result of a flush. Must be called on the game thread."""
+        users = batch['users']
+        items = batch['items']
+        deleted_items = batch['deleted_items']
+
+        if result['error'] is not None:
+            self._requeue(users, items, deleted_items)
+            self._clear_in_flight()
+
+            with self._lock:
+                self._stats['failed_flushes'] += 1
+
+            logger.log_warning(
+                "SaveQueue.flush: Flush failed, {} objects returned "
+                "to the queue:\n{}".format(
+                    len(users) + len(items) + len(deleted_items),
+                    result['error']))
+
+            return
+
+        deleted_item_ids = set(result['deleted_item_ids'])
+        for item in deleted_items:
+            if item.id in deleted_item_ids:
+                item.mark_deleted()
+
+        for obj, revision in batch['revisions']:
+            obj.mark_saved(revision)
+
+        journal.forget_deleted_items(batch['deleted_item_ids'])
+        journal.request_checkpoint()
+
+        self._clear_in_flight()
+
+        duration = result['duration']
+        with self._lock:
+            self._stats['flushes'] += 1
+            self._stats['users_written'] += len(users)
+            self._stats['items_written'] += len(items)
+            self._stats['items_deleted'] += len(deleted_items)
+            self._stats['last_flush_duration'] = duration
+            self._stats['max_flush_duration'] = max(
+                self._stats['max_flush_duration'], duration)
+
+        logger.log_debug(
+            "SaveQueue.flush: Saved {} users, {} items, deleted {} items "
+            "in {:.3f}s".format(
+                len(users), len(items), len(deleted_items), duration))
+
+    def stop(self):
+        """Synchronously write everything that is left.
+
+        Objects enqueued after this are written immediately.
+        """
+        if not self._running:
+            return
+
+        self._running = False
+
+        if self._flush_batch is not None:
+            wait((self._flush_future, ))
+            self._finish_flush(self._flush_future)
+
+        self.flush()
+
+    def request_flush(self):
+        if not self._running:
+            self.flush()
+            return
+
+        # Don't stack flush jobs while the previous one isn't complete.
+        # It's only complete once its callback has run on the game thread
+        if self._flush_batch is not None:
+            return
+
+        self._last_flush = time()
+
+        users, items, deleted_items = self._pop_pending()
+
+        # Serialize with other database jobs of the affected players
+        steamids = set(arcjail_user.steamid for arcjail_user in users)
+        steamids.update(item.current_owner for item in items)
+        steamids.update(item.current_owner for item in deleted_items)
+        steamids.discard("")
+
+        batch = self._prepare(users, items, deleted_items)
+        if batch is None:
+            return
+
+        # Set before submitting, as the executor may run the job and its
+        # callback right away
+        self._flush_batch = batch
+        self._flush_future = db_executor.submit(
+            self._write, batch, keys=steamids, callback=self._finish_flush)
+
+    def _finish_flush(self, future):
+        """Complete the flush job. Does nothing if it's complete already."""
+        batch, self._flush_batch = self._flush_batch, None
+        if batch is not None:
+            self._complete(batch, future.result())
+
+    def tick(self):
+        if time() - self._last_flush < config_manager['flush_interval']:
+            return
+
+        if not self.depth:
+            return
+
+        self.request_flush()
+
+save_queue = SaveQueue()
+
+_tick_repeat = TickRepeat(save_queue.tick).start(CHECK_INTERVAL, limit=0)
+
+
+# Run after the default priority handlers (e.g. ArcjailUser's save_all())
+# have enqueued their last changes, so the final flush writes them and the
+# journal checkpoint below only keeps what really couldn't be saved
+@InternalEvent('unload', priority=-1)
+def on_unload():
+    _tick_repeat.stop()
+    save_queue.stop()
+    journal.stop()
@@ -16,9 +16,14 @@
 from commands.server import ServerCommand
 from core import echo_console
 
+from ...internal_events import internal_event_manager
+from ...resource.db_executor import db_executor
+from ...resource.sqlalchemy import get_pool_stats
+
 from ..arcjail.arcjail_user import arcjail_user_manager
 
 from .item_classes import get_item_instance
+from .save_queue import save_queue
 
 
 @ServerCommand('arcjail_give_item')
@@ -64,3 +69,67 @@ def server_arcjail_give_item(command):
         class_id, instance_id, amount=amount, async=False)
 
     echo_console("Given item ID: {}".format(item.id))
+
+
+@ServerCommand('arcjail_save_queue_status')
+def server_arcjail_save_queue_status(command):
+    stats = save_queue.get_stats()
+    echo_console("Pending: {} (users={}, items={}, deletions={}), "
+                 "max depth: {}".format(
+                    stats['depth'], stats['pending_users'],
+                    stats['pending_items'], stats['pending_deletions'],
+                    stats['max_depth']))
+
+    echo_console("Flushes: {} ({} failed), last took {:.3f}s, "
+                 "max {:.3f}s".format(
+                    stats['flushes'], stats['failed_flushes'],
+                    stats['last_flush_duration'],
+                    stats['max_flush_duration']))
+
+    echo_console("Written: {} users, {} items; deleted: {} items".format(
+        stats['users_written'], stats['items_written'],
+        stats['items_deleted']))
+
+
+@ServerCommand('arcjail_db_status')
+def server_arcjail_db_status(command):
+    stats = get_pool_stats()
+    echo_console("Pool: {}".format(stats['status']))
+
+    echo_console("Checkouts: {} ({} slow), total wait {:.3f}s, "
+                 "max wait {:.3f}s".format(
+                    stats['checkouts'], stats['slow_checkouts'],
+                    stats['total_wait'], stats['max_wait']))
+
+    stats = db_executor.get_stats()
+    echo_console("Workers: {}, queued jobs: {} (max {}), in flight: {}, "
+                 "key lanes: {}".format(
+                    stats['workers'], stats['queued'], stats['max_queued'],
+                    stats['in_flight'], stats['lanes']))
+
+    echo_console("Jobs: {} submitted, {} completed ({} failed), "
+                 "latency avg {:.3f}s, max {:.3f}s".format(
+                    stats['submitted'], stats['completed'], stats['failed'],
+                    stats['avg_latency'], stats['max_latency']))
+
+
+@ServerCommand('arcjail_internal_events_status')
+def server_arcjail_internal_events_status(command):
+    stats = internal_event_manager.get_stats()
+    if not stats:
+        echo_console("No internal events were profiled, enable the profiler "
+                     "with 'arcjail_profiler on'")
+        return
+
+    for event_name in sorted(
+            stats, key=lambda name: stats[name]['total_duration'],
+            reverse=True):
+
+        event_stats = stats[event_name]
+        echo_console("{}: fired {} times, {} handler calls, {} exceptions, "
+                     "total {:.3f}s, max {:.3f}s".format(
+                        event_name, event_stats['fired'],
+                        event_stats['handler_calls'],
+                        event_stats['exceptions'],
+                        event_stats['total_duration'],
+                        event_stats['max_duration']))
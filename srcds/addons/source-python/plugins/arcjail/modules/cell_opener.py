@@ -13,13 +13,12 @@
 # You should have received a copy of the GNU General Public License
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
-from events import Event
-from listeners.tick import Delay
-
 from controlled_cvars.handlers import bool_handler, float_handler
 
 from ..internal_events import InternalEvent
+from ..resource.profiler import Event
 from ..resource.strings import build_module_strings
+from ..resource.timer_wheel import ROUND, timer_wheel
 
 from . import build_module_config
 from .game_status import GameStatus, get_status
@@ -105,6 +104,9 @@ def get_close_denial_reason(player):
 
 @Event('round_start')
 def on_round_start(game_event):
+    # Timers of the previous round have been cancelled
+    _delays.clear()
+
     if not config_manager['enabled']:
         return
 
@@ -117,11 +119,8 @@ def on_round_start(game_event):
             broadcast(strings_module['opened not_started'])
             open()
 
-    if 'notstarted_check' in _delays:
-        _delays['notstarted_check'].cancel()
-
-    _delays['notstarted_check'] = Delay(
-        GAME_NOT_STARTED_CHECK_DELAY, check_callback)
+    _delays['notstarted_check'] = timer_wheel.delay(
+        GAME_NOT_STARTED_CHECK_DELAY, check_callback, owner=ROUND)
 
 
 @InternalEvent('jail_game_status_started')
@@ -139,8 +138,9 @@ def on_jail_game_status_started():
         if 'warning' in _delays:
             _delays['warning'].cancel()
 
-        _delays['warning'] = Delay(
-            config_manager['open_delay'] - WARNING_DELAY, warning_callback)
+        _delays['warning'] = timer_wheel.delay(
+            config_manager['open_delay'] - WARNING_DELAY, warning_callback,
+            owner=ROUND)
 
     def auto_open_callback():
         del _delays['auto_open']
@@ -151,16 +151,8 @@ def on_jail_game_status_started():
         _delays['auto_open'].cancel()
 
     if config_manager['open_delay'] >= 0:
-        _delays['auto_open'] = Delay(
-            config_manager['open_delay'], auto_open_callback)
-
-
-@InternalEvent('unload')
-def on_unload():
-    for delay in _delays.values():
-        delay.cancel()
-
-    _delays.clear()
+        _delays['auto_open'] = timer_wheel.delay(
+            config_manager['open_delay'], auto_open_callback, owner=ROUND)
 
 
 # =============================================================================
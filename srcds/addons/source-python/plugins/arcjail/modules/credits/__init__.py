@@ -15,15 +15,17 @@
 
 from configparser import ConfigParser
 
-from events import Event
 from listeners import OnClientDisconnect
 
 from ...resource.paths import ARCJAIL_DATA_PATH
+from ...resource.profiler import Event
 from ...resource.strings import build_module_strings
 
 from ..arcjail.arcjail_user import arcjail_user_manager
 from ..players import player_manager, tell
 
+from .ledger import credit_ledger
+
 
 strings_module = build_module_strings('credits/common')
 credits_earned_storage = {}
@@ -44,6 +46,8 @@ def earn_credits(player, credits, reason):
         player.index, 0) + credits
 
     arcjail_user.account += credits
+    arcjail_user.mark_dirty()
+    credit_ledger.record(arcjail_user, credits, reason)
 
     tell(player, strings_module['credits_earned'],
          credits=credits, reason=reason)
@@ -58,6 +62,8 @@ def spend_credits(player, credits, reason):
         player.index, 0) + credits
 
     arcjail_user.account -= credits
+    arcjail_user.mark_dirty()
+    credit_ledger.record(arcjail_user, -credits, reason)
 
     tell(player, strings_module['credits_paid'],
          credits=credits, reason=reason)
@@ -0,0 +1,327 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Append-only history of credit transactions.
+
+earn_credits() and spend_credits() only append to an in-memory buffer that
+is written to the credit_transactions table in batches by a database job.
+Compaction periodically folds transactions that are older than the
+retention period into a single credit_snapshots row per player.
+
+Every transaction stores the balance it resulted in, so accounts can be
+restored from the ledger if the server crashed before they were saved.
+Transactions of users who are still being loaded store no balance, as
+their account doesn't hold the real balance yet.
+"""
+
+from concurrent.futures import wait
+from threading import Lock
+from time import time
+from traceback import format_exc
+
+from listeners.tick import TickRepeat
+
+from controlled_cvars.handlers import float_handler, int_handler
+
+from sqlalchemy import func
+
+from ...internal_events import InternalEvent
+from ...models.arcjail_user import ArcjailUser as DB_ArcjailUser
+from ...models.credit_snapshot import CreditSnapshot as DB_CreditSnapshot
+from ...models.credit_transaction import (
+    CreditTransaction as DB_CreditTransaction)
+from ...resource.db_executor import db_executor
+from ...resource.logger import logger
+from ...resource.sqlalchemy import Session, upsert
+
+from .. import build_module_config
+
+
+CHECK_INTERVAL = 1
+MAX_REASON_LENGTH = 64
+
+# Keeps IN (...) lists below the bound parameter limit of SQLite
+QUERY_CHUNK_SIZE = 500
+
+
+config_manager = build_module_config('credits/ledger')
+
+config_manager.controlled_cvar(
+    float_handler,
+    "flush_interval",
+    default=5.0,
+    description="Write buffered credit transactions to the database "
+                "every X seconds",
+)
+config_manager.controlled_cvar(
+    int_handler,
+    "compaction_interval",
+    default=3600,
+    description="Compact the credit ledger every X seconds",
+)
+config_manager.controlled_cvar(
+    int_handler,
+    "retention_days",
+    default=30,
+    description="Keep individual credit transactions for X days before "
+                "compacting them into balance snapshots",
+)
+
+
+class CreditLedger:
+    def __init__(self):
+        self._lock = Lock()
+        self._buffer = []
+
+        self._flush_future = None
+        self._compaction_future = None
+        self._running = True
+
+        self._last_flush = time()
+        self._last_compaction = time()
+
+    def record(self, arcjail_user, amount, reason):
+        if arcjail_user.steamid == "BOT":
+            return
+
+        # Until the user is loaded, the account is just the default value
+        balance = arcjail_user.account if arcjail_user.loaded else None
+
+        row = {
+            'steamid': arcjail_user.steamid,
+            'time': int(time()),
+            'amount': amount,
+            'balance': balance,
+            'reason': reason.get_string()[:MAX_REASON_LENGTH],
+        }
+
+        with self._lock:
+            self._buffer.append(row)
+
+        if not self._running:
+            self.flush()
+
+    def _pop_buffer(self):
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+
+        return rows
+
+    def flush(self):
+        """Write all buffered transactions in a single transaction."""
+        self._write(self._pop_buffer())
+
+    def _write(self, rows):
+        if not rows:
+            return
+
+        db_session = Session()
+        try:
+            db_session.execute(DB_CreditTransaction.__table__.insert(), rows)
+            db_session.commit()
+
+        except Exception:
+            db_session.rollback()
+
+            # Put them back in front of what was recorded in the meantime
+            with self._lock:
+                self._buffer[:0] = rows
+
+            logger.log_warning(
+                "CreditLedger.flush: Flush failed, {} transactions returned "
+                "to the buffer:\n{}".format(len(rows), format_exc()))
+
+        finally:
+            db_session.close()
+
+    def request_flush(self):
+        if not self._running:
+            self.flush()
+            return
+
+        if self._flush_future is not None and not self._flush_future.done():
+            return
+
+        self._last_flush = time()
+
+        rows = self._pop_buffer()
+        if rows:
+            self._flush_future = db_executor.submit(self._write, rows)
+
+    def compact(self):
+        """Fold old transactions into per-player balance snapshots."""
+        cutoff = int(time()) - config_manager['retention_days'] * 86400
+
+        db_session = Session()
+        try:
+            latest_ids = db_session.query(
+                func.max(DB_CreditTransaction.id)).filter(
+                DB_CreditTransaction.time < cutoff,
+                DB_CreditTransaction.balance.isnot(None)).group_by(
+                DB_CreditTransaction.steamid)
+
+            snapshots = [{
+                'steamid': steamid,
+                'time': time_,
+                'balance': balance,
+                'transaction_id': transaction_id,
+            } for steamid, time_, balance, transaction_id in db_session.query(
+                DB_CreditTransaction.steamid,
+                DB_CreditTransaction.time,
+                DB_CreditTransaction.balance,
+                DB_CreditTransaction.id
+            ).filter(DB_CreditTransaction.id.in_(latest_ids))]
+
+            if not snapshots:
+                return
+
+            upsert(
+                db_session, DB_CreditSnapshot.__table__, snapshots,
+                index_elements=('steamid', ),
+                update_columns=('time', 'balance', 'transaction_id'),
+            )
+
+            max_id = max(snapshot['transaction_id'] for snapshot in snapshots)
+            deleted = db_session.query(DB_CreditTransaction).filter(
+                DB_CreditTransaction.time < cutoff,
+                DB_CreditTransaction.id <= max_id
+            ).delete(synchronize_session=False)
+
+            db_session.commit()
+
+        except Exception:
+            db_session.rollback()
+            logger.log_warning("CreditLedger.compact: Compaction failed:\n"
+                               "{}".format(format_exc()))
+
+            return
+
+        finally:
+            db_session.close()
+
+        logger.log_debug(
+            "CreditLedger.compact: Compacted {} transactions of {} "
+            "players".format(deleted, len(snapshots)))
+
+    def request_compaction(self):
+        self._last_compaction = time()
+
+        if (self._compaction_future is not None and
+                not self._compaction_future.done()):
+
+            return
+
+        self._compaction_future = db_executor.submit(self.compact)
+
+    def stop(self):
+        """Synchronously write everything that is left in the buffer.
+
+        Transactions recorded after this are written immediately.
+        """
+        if not self._running:
+            return
+
+        self._running = False
+
+        futures = [future for future in (
+            self._flush_future, self._compaction_future) if future is not None]
+
+        wait(futures)
+
+        self.flush()
+
+    def tick(self):
+        current_time = time()
+        if (current_time - self._last_compaction >=
+                config_manager['compaction_interval']):
+
+            self.request_compaction()
+
+        if current_time - self._last_flush >= config_manager['flush_interval']:
+            self.request_flush()
+
+credit_ledger = CreditLedger()
+
+_tick_repeat = TickRepeat(credit_ledger.tick).start(CHECK_INTERVAL, limit=0)
+
+
+def rebuild_balances():
+    """Restore accounts that weren't saved after their last transaction.
+
+    This happens when the server crashes between two saves. The balance of
+    the latest transaction (or snapshot) becomes the account again.
+    """
+    db_session = Session()
+
+    # Transactions without a balance were recorded before the user loaded
+    latest_ids = db_session.query(func.max(DB_CreditTransaction.id)).filter(
+        DB_CreditTransaction.balance.isnot(None)).group_by(
+        DB_CreditTransaction.steamid)
+
+    latest_transactions = db_session.query(
+        DB_CreditTransaction.steamid,
+        DB_CreditTransaction.time,
+        DB_CreditTransaction.balance
+    ).filter(DB_CreditTransaction.id.in_(latest_ids))
+
+    latest_snapshots = db_session.query(
+        DB_CreditSnapshot.steamid,
+        DB_CreditSnapshot.time,
+        DB_CreditSnapshot.balance)
+
+    latest = {}
+    for steamid, time_, balance in latest_snapshots:
+        latest[steamid] = time_, balance
+
+    for steamid, time_, balance in latest_transactions:
+        latest[steamid] = time_, balance
+
+    if not latest:
+        db_session.close()
+        return
+
+    steamids = list(latest.keys())
+    for i in range(0, len(steamids), QUERY_CHUNK_SIZE):
+        for db_arcjail_user in db_session.query(DB_ArcjailUser).filter(
+                DB_ArcjailUser.steamid.in_(
+                    steamids[i:i + QUERY_CHUNK_SIZE])):
+
+            time_, balance = latest[db_arcjail_user.steamid]
+            if (db_arcjail_user.last_seen is None or
+                    time_ <= db_arcjail_user.last_seen):
+
+                continue
+
+            if db_arcjail_user.account == balance:
+                continue
+
+            logger.log_warning(
+                "CreditLedger: Restoring account of (SteamID={}) from the "
+                "ledger: {} -> {}".format(
+                    db_arcjail_user.steamid, db_arcjail_user.account,
+                    balance))
+
+            db_arcjail_user.account = balance
+
+    db_session.commit()
+    db_session.close()
+
+
+# Run after the default priority handlers have recorded their changes
+@InternalEvent('unload', priority=-1)
+def on_unload():
+    _tick_repeat.stop()
+    credit_ledger.stop()
@@ -18,7 +18,6 @@ from entities.entity import Entity
 from entities.helpers import index_from_pointer
 from entities.hooks import EntityCondition, EntityPreHook
 from entities import TakeDamageInfo
-from listeners.tick import Delay
 from memory import make_object
 from messages import KeyHintText
 from players.constants import HideHudFlags
@@ -29,6 +28,7 @@ from controlled_cvars.handlers import int_handler
 from ..classes.base_player_manager import BasePlayerManager
 from ..internal_events import InternalEvent
 from ..resource.strings import build_module_strings
+from ..resource.timer_wheel import timer_wheel
 
 from . import build_module_config
 from .players import player_manager
@@ -249,9 +249,6 @@ def on_player_respawn(player):
     protected_player._spawn()
 
 
-delay = None
-
-
 @InternalEvent('load')
 def on_load():
     def callback():
@@ -259,13 +256,6 @@ def on_load():
             if not protected_player.dead:
                 protected_player._show_health()
 
-        global delay
-        delay = Delay(KEYHINT_REFRESH_INTERVAL, callback)
+        timer_wheel.delay(KEYHINT_REFRESH_INTERVAL, callback)
 
     callback()
-
-
-@InternalEvent('unload')
-def on_unload():
-    if delay:
-        delay.cancel()
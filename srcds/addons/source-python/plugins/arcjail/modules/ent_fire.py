@@ -15,12 +15,13 @@
 
 from entities.classes import server_classes
 from entities.datamaps import FieldType
-from events import Event
 from filters.entities import BaseEntityIter
 from filters.players import PlayerIter
-from listeners.tick import Delay
 from memory import make_object
 
+from ..resource.profiler import Event
+from ..resource.timer_wheel import timer_wheel
+
 
 _input_types = {
     FieldType.BOOLEAN: lambda arg: arg == '1',
@@ -166,16 +167,11 @@ class OutputConnection:
         self.caller = caller
         self.activator = activator
 
-        self._delayed_callbacks = []
         self._times_fired = 0
 
     def reset(self):
         """Cancel all pending callbacks and set fire count to zero."""
-        for delayed_callback in self._delayed_callbacks:
-            if delayed_callback.running:
-                delayed_callback.cancel()
-
-        self._delayed_callbacks.clear()
+        timer_wheel.cancel_owner(self)
         self._times_fired = 0
 
     def fire(self):
@@ -194,7 +190,7 @@ class OutputConnection:
             callback()
 
         else:
-            self._delayed_callbacks.append(Delay(self.delay, callback))
+            timer_wheel.delay(self.delay, callback, owner=self)
 
     def destroy(self):
         """
@@ -18,7 +18,6 @@ from entities.entity import Entity
 from entities.helpers import edict_from_index, index_from_pointer
 from entities.hooks import EntityCondition, EntityPreHook
 from listeners import OnEntitySpawned
-from listeners.tick import Delay
 from memory import make_object
 from mathlib import NULL_VECTOR
 from weapons.entity import Weapon
@@ -27,6 +26,7 @@ from weapons.manager import weapon_manager
 from ..internal_events import InternalEvent
 from ..classes.base_player_manager import BasePlayerManager
 from ..resource.memory import CCSPlayer
+from ..resource.timer_wheel import timer_wheel
 
 from .players import player_manager
 
@@ -45,7 +45,6 @@ PROJECTILE_CLASSNAMES = PROJECTILE_MAPPING.values()
 class SavedPlayer:
     def __init__(self, player):
         self._ammo_refill_delay = None
-        self._nade_refill_delay = None
         self.player = player
         self.health = 0
         self.saved_weapons = []
@@ -58,9 +57,9 @@ class SavedPlayer:
         if weapon_classname not in self.infinite_weapons:
             return
 
-        self._nade_refill_delay = Delay(
+        timer_wheel.delay(
             PROJECTILE_REFILL_DELAY,
-            self.player.give_named_item, weapon_classname
+            self.player.give_named_item, weapon_classname, owner=self
         )
 
     def save_health(self):
@@ -132,13 +131,12 @@ class SavedPlayer:
     def _refill_infinite_ammo(self):
         self.max_ammo(self.infinite_weapons)
 
-        self._ammo_refill_delay = Delay(
-            INFINITE_AMMO_REFILL_INTERVAL, self._refill_infinite_ammo)
+        self._ammo_refill_delay = timer_wheel.delay(
+            INFINITE_AMMO_REFILL_INTERVAL, self._refill_infinite_ammo,
+            owner=self)
 
     def infinite_on(self):
-        if (self._ammo_refill_delay is not None or
-                self._nade_refill_delay is not None):
-
+        if self._ammo_refill_delay is not None:
             raise ValueError("Infinite equipment is already turned on")
 
         maxed_weapon_classnames = map(
@@ -153,22 +151,18 @@ class SavedPlayer:
             self.infinite_weapons
         ))
 
-        self._ammo_refill_delay = Delay(
-            INFINITE_AMMO_REFILL_INTERVAL, self._refill_infinite_ammo)
+        self._ammo_refill_delay = timer_wheel.delay(
+            INFINITE_AMMO_REFILL_INTERVAL, self._refill_infinite_ammo,
+            owner=self)
 
     def infinite_off(self):
         if self._ammo_refill_delay is None:
             raise ValueError("Infinite equipment is already turned off")
 
-        self._ammo_refill_delay.cancel()
+        # Ammo refill and all pending grenade refills
+        timer_wheel.cancel_owner(self)
         self._ammo_refill_delay = None
 
-        if self._nade_refill_delay is not None:
-            if self._nade_refill_delay.running:
-                self._nade_refill_delay.cancel()
-
-            self._nade_refill_delay = None
-
 saved_player_manager = BasePlayerManager(SavedPlayer)
 
 
@@ -179,7 +173,8 @@ def on_player_created(player):
 
 @InternalEvent('player_deleted')
 def on_player_deleted(player):
-    saved_player_manager.delete(player)
+    saved_player = saved_player_manager.delete(player)
+    timer_wheel.cancel_owner(saved_player)
 
 
 @OnEntitySpawned
@@ -13,13 +13,13 @@
 # You should have received a copy of the GNU General Public License
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
-from events import Event
-from listeners.tick import Delay
 from messages import Shake
 
 from ..internal_events import InternalEvent
 from ..classes.base_player_manager import BasePlayerManager
+from ..resource.profiler import Event
 from ..resource.strings import build_module_strings
+from ..resource.timer_wheel import ROUND, timer_wheel
 
 from .damage_hook import get_hook, protected_player_manager
 
@@ -70,7 +70,7 @@ class FallProtectedPlayer:
 
             self._counter = None
 
-        self._delay = Delay(seconds, delay_callback)
+        self._delay = timer_wheel.delay(seconds, delay_callback, owner=ROUND)
         self.p_player.set_protected()
 
     def unprotect(self):
@@ -91,7 +91,7 @@ class FallProtectedPlayer:
         return self._counter is not None
 
     def cancel_delay(self):
-        if self._delay is not None and self._delay.running:
+        if self._delay is not None:
             self._delay.cancel()
 
 
@@ -116,12 +116,6 @@ def on_player_death_real(game_event):
     p_player.cancel_delay()
 
 
-@Event('round_start')
-def on_round_start(game_event):
-    for p_player in fall_protected_player_manager.values():
-        p_player.cancel_delay()
-
-
 def protect(player, map_data):
     if map_data['FALL_DAMAGE_PROTECTION_TIMEOUT'] <= 0:
         return
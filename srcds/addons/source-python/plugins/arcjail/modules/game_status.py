@@ -13,9 +13,8 @@
 # You should have received a copy of the GNU General Public License
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
-from events import Event
-
 from ..internal_events import InternalEvent
+from ..resource.profiler import Event
 from ..resource.strings import build_module_strings
 
 
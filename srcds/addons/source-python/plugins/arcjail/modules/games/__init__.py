@@ -18,9 +18,7 @@ from traceback import format_exc
 from warnings import warn
 
 from commands.say import SayCommand
-from events import Event
 from filters.players import PlayerIter
-from listeners.tick import Delay
 from menus import PagedMenu, PagedOption
 from players.helpers import get_client_language
 
@@ -34,10 +32,14 @@ from controlled_cvars.handlers import (
 )
 
 from ...arcjail import load_downloadables
+from ...classes.stage_engine import (
+    game_event_handler, game_internal_event_handler, GameMeta, push, stage)
 from ...info import info
 from ...internal_events import InternalEvent
 from ...resource.paths import ARCJAIL_LOG_PATH
+from ...resource.profiler import Event
 from ...resource.strings import build_module_strings, COLOR_SCHEME
+from ...resource.timer_wheel import timer_wheel
 
 from .. import build_module_config, parse_modules
 from ..admin import section
@@ -54,6 +56,9 @@ MIN_PLAYERS_IN_GAME = 2
 MAX_PLAYERS_NAMES_LIST_LENGTH = 36
 MAX_PLAYER_NAME_LENGTH = 10
 
+# Owner of the flawless effects timers, not tied to any game instance
+FLAWLESS_EFFECTS = 'flawless-effects'
+
 strings_module = build_module_strings('games/common')
 strings_game_captions = BaseLangStrings(Path(info.basename) / "games")
 config_manager = build_module_config('games/common')
@@ -237,7 +242,6 @@ _available_game_classes = []
 _downloadables_sounds = load_downloadables('games-base-sounds.res')
 _downloadables_materials = load_downloadables('games-base-materials.res')
 _saved_game_status = None
-_flawless_effects_delays = []
 
 
 def _launch_game(launcher, leader_player, players, **kwargs):
@@ -421,11 +425,7 @@ def reset():
 
     _popups.clear()
 
-    for flawless_efects_delay in _flawless_effects_delays:
-        if flawless_efects_delay.running:
-            flawless_efects_delay.cancel()
-
-    _flawless_effects_delays.clear()
+    timer_wheel.cancel_owner(FLAWLESS_EFFECTS)
 
 
 def play_flawless_effects(players):
@@ -438,7 +438,7 @@ def play_flawless_effects(players):
             for player in players:
                 show_overlay(player, config_manager['flawless_material'], 3)
 
-    _flawless_effects_delays.append(Delay(1.5, callback))
+    timer_wheel.delay(1.5, callback, owner=FLAWLESS_EFFECTS)
 
 
 def format_player_names(players):
@@ -572,129 +572,6 @@ if section is not None:
     )
 
 
-# =============================================================================
-# >> DECORATORS
-# =============================================================================
-def stage(stage_id):
-    def stage_gen(func):
-        stage_ = Stage(stage_id)
-        stage_.callback = func
-        return stage_
-    return stage_gen
-
-
-class Stage:
-    def __init__(self, stage_id):
-        self.stage_id = stage_id
-        self.callback = None
-        self.game_instance = None
-
-    def __call__(self, *args, **kwargs):
-        if self.callback is not None:
-            self.callback(self.game_instance, *args, **kwargs)
-
-
-def game_event_handler(alias, event):
-    def decorator(func):
-        game_event_handler_ = GameEventHandler(alias, event)
-        game_event_handler_.callback = func
-        return game_event_handler_
-    return decorator
-
-
-class GameEventHandler:
-    def __init__(self, alias, event):
-        self.alias = alias
-        self.event = event
-        self.callback = None
-        self.game_instance = None
-
-    def __call__(self, event_data):
-        if self.callback is not None:
-            self.callback(self.game_instance, event_data)
-
-    def __eq__(self, other):
-        if not isinstance(other, GameEventHandler):
-            return False
-
-        return (
-            (self.game_instance, self.callback) ==
-            (other.game_instance, other.callback)
-        )
-
-
-def game_internal_event_handler(alias, event):
-    def decorator(func):
-        game_internal_event_handler_ = GameInternalEventHandler(alias, event)
-        game_internal_event_handler_.callback = func
-        return game_internal_event_handler_
-    return decorator
-
-
-class GameInternalEventHandler:
-    def __init__(self, alias, event):
-        self.alias = alias
-        self.event = event
-        self.callback = None
-        self.game_instance = None
-
-    def __call__(self, **kwargs):
-        if self.callback is not None:
-            self.callback(self.game_instance, **kwargs)
-
-
-class Push:
-    def __init__(self, slot_id, push_id):
-        self.slot_id = slot_id
-        self.push_id = push_id
-        self.callback = None
-        self.game_instance = None
-
-    def __call__(self, args):
-        if self.callback is not None:
-            self.callback(self.game_instance, args)
-
-
-def push(slot_id, push_id):
-    def decorator(func):
-        push_ = Push(slot_id, push_id)
-        push_.callback = func
-        return push_
-    return decorator
-
-
-# =============================================================================
-# >> METACLASS
-# =============================================================================
-class GameMeta(type):
-    def __new__(mcs, name, bases, namespace):
-        cls = super().__new__(mcs, name, bases, namespace)
-
-        cls._stages_map = {}
-        cls._internal_events = {}
-        cls._events = {}
-        cls._stage_groups = {}
-        for base in bases[::-1]:
-            cls._events.update(base._events)
-            cls._stages_map.update(base._stages_map)
-            cls._stage_groups.update(base._stage_groups)
-
-        for key, value in namespace.items():
-            if isinstance(value, Stage):
-                cls._stages_map[value.stage_id] = value
-
-            elif isinstance(value, GameInternalEventHandler):
-                cls._internal_events[value.alias] = value
-
-            elif isinstance(value, GameEventHandler):
-                cls._events[value.alias] = value
-
-            elif key == 'stage_groups':
-                cls._stage_groups.update(value)
-
-        return cls
-
-
 # =============================================================================
 # >> BASE CLASSES IMPORT
 # =============================================================================
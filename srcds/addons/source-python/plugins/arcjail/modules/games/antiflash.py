@@ -17,9 +17,9 @@ from entities.entity import Entity
 from listeners import on_entity_created_listener_manager
 from memory import make_object
 from memory.hooks import HookType
-from events import Event
 
 from ...internal_events import InternalEvent
+from ...resource.profiler import Event
 
 from ..effects.dissolve import dissolve
 
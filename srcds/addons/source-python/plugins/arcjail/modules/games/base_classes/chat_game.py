@@ -15,8 +15,6 @@
 
 from random import randrange
 
-from listeners.tick import Delay
-
 from controlled_cvars.handlers import (
     bool_handler, float_handler, int_handler, sound_nullable_handler)
 
@@ -154,9 +152,7 @@ class ChatGame(PlayerPreserving):
             def callback():
                 self.set_stage_group('chatgame-print-rules')
 
-            self._delays.append(Delay(
-                config_manager['rules_print_interval'], callback
-            ))
+            self.delay(config_manager['rules_print_interval'], callback)
 
     @stage('chatgame-generate-test')
     def stage_chatgame_generate_test(self):
@@ -179,7 +175,7 @@ class ChatGame(PlayerPreserving):
         else:
             delay = randrange(min_delay, max_delay)
 
-        self._delays.append(Delay(delay, ask_callback))
+        self.delay(delay, ask_callback)
 
     @stage('chatgame-improperly-configured')
     def stage_chatgame_improperly_configured(self):
@@ -193,7 +189,7 @@ class ChatGame(PlayerPreserving):
         def timeout_callback():
             self.set_stage_group('chatgame-timed-out')
 
-        self._delays.append(Delay(timeout, timeout_callback))
+        self.delay(timeout, timeout_callback)
 
         broadcast(self._question)
 
@@ -13,6 +13,8 @@
 # You should have received a copy of the GNU General Public License
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
+from ....resource.timer_wheel import timer_wheel
+
 from ...players import broadcast, player_manager
 
 from ...rebels import get_rebels
@@ -41,7 +43,6 @@ class JailGame(BaseGame):
         super().__init__(leader_player, players, **kwargs)
 
         self._popups = {}
-        self._delays = []
 
     @stage('unsend-popups')
     def stage_unsend_popups(self):
@@ -50,13 +51,13 @@ class JailGame(BaseGame):
 
         self._popups.clear()
 
+    def delay(self, seconds, callback, *args):
+        """Schedule a callback that is cancelled along with the game."""
+        return timer_wheel.delay(seconds, callback, *args, owner=self)
+
     @stage('cancel-delays')
     def stage_cancel_delays(self):
-        for delay in self._delays:
-            if delay.running:
-                delay.cancel()
-
-        self._delays.clear()
+        timer_wheel.cancel_owner(self)
 
     @stage('abort')
     def stage_abort(self):
@@ -14,7 +14,6 @@
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
 from contextlib import suppress
-from random import shuffle
 
 from cvars import ConVar
 from entities.helpers import edict_from_index
@@ -28,7 +27,7 @@ from ...equipment_switcher import (
 from ...falldmg_protector import unprotect
 from ...jail_map import (
     get_cage_names, get_games, get_map_string, get_players_in_area,
-    register_push_handler, teleport_player, unregister_push_handler)
+    register_push_handler, teleport_to_spawnpoint, unregister_push_handler)
 from ...noblock import lock as lock_noblock
 from ...noblock import unlock as unlock_noblock
 from ...noblock import set_default, set_force_off, set_force_on
@@ -38,7 +37,7 @@ from ...silent_cvars import silent_set
 
 from .. import (
     config_manager, format_player_names, GameLauncher, helper_set_loser,
-    helper_set_neutral, helper_set_winner, Push, stage, strings_game_captions,
+    helper_set_neutral, helper_set_winner, stage, strings_game_captions,
     strings_module)
 
 from .prepare_time import PrepareTime
@@ -142,7 +141,6 @@ class MapGame(PrepareTime):
         self._starting_player_number = len(players)
         self._results = {}
 
-        self._pushes = {}
         self._cvars = {
             'pushscale': 1,
             'timescale': 1,
@@ -150,17 +148,7 @@ class MapGame(PrepareTime):
         }
         self.map_data = kwargs['map_data']
 
-        for attr_name in dir(self):
-            try:    # Be ready for undefined (undefined yet) attributes
-                attr = getattr(self, attr_name)
-            except AttributeError:
-                continue
-
-            if not isinstance(attr, Push):
-                continue
-
-            attr.game_instance = self
-            self._pushes[(attr.slot_id, attr.push_id)] = attr
+        self._pushes = self.bind_push_handlers()
 
     @property
     def caption(self):
@@ -321,13 +309,12 @@ class MapGame(PrepareTime):
     @stage('mapgame-teleport-players')
     def stage_mapgame_teleport_players(self):
         """Teleport players and game leader."""
-        spawnpoints = list(self.map_data.get_spawnpoints('team1'))
-        shuffle(spawnpoints)
-
-        for player in self._players:
-            teleport_player(player, spawnpoints.pop())
+        spawnpoint_allocator = self.map_data.get_spawnpoint_allocator('team1')
+        spawnpoint_allocator.shuffle()
+        spawnpoint_allocator.teleport(self._players)
 
-        teleport_player(self.leader, self.map_data.get_spawnpoints('team0')[0])
+        teleport_to_spawnpoint(
+            self.leader, self.map_data.get_spawnpoint_allocator('team0')[0])
 
     @stage('mapgame-equip-weapons')
     def stage_mapgame_equip_weapons(self):
@@ -20,7 +20,7 @@ from core import GAME_NAME
 from ....internal_events import InternalEvent
 from ....resource.strings import COLOR_SCHEME
 
-from ...jail_map import teleport_player, get_games
+from ...jail_map import get_games, teleport_to_spawnpoint
 from ...player_colors import cancel_color_request, make_color_request
 from ...players import broadcast, player_manager, tell
 from ...rebels import get_rebels
@@ -132,69 +132,27 @@ class MapGameTeamBased(MapGame):
 
     @stage('mapgame-teleport-players2')
     def stage_mapgame_teleport_players2(self):
-        spawnpoints = list(self.map_data.get_spawnpoints('team1'))
-        shuffle(spawnpoints)
-
-        for player in self._team1:
-            teleport_player(player, spawnpoints.pop())
-
-        spawnpoints = list(self.map_data.get_spawnpoints('team2'))
-        shuffle(spawnpoints)
-
-        for player in self._team2:
-            teleport_player(player, spawnpoints.pop())
-
-        teleport_player(self.leader, self.map_data.get_spawnpoints('team0')[0])
+        self._teleport_teams((self._team1, self._team2))
 
     @stage('mapgame-teleport-players3')
     def stage_mapgame_teleport_players3(self):
-        spawnpoints = list(self.map_data.get_spawnpoints('team1'))
-        shuffle(spawnpoints)
-
-        for player in self._team1:
-            teleport_player(player, spawnpoints.pop())
-
-        spawnpoints = list(self.map_data.get_spawnpoints('team2'))
-        shuffle(spawnpoints)
-
-        for player in self._team2:
-            teleport_player(player, spawnpoints.pop())
-
-        spawnpoints = list(self.map_data.get_spawnpoints('team3'))
-        shuffle(spawnpoints)
-
-        for player in self._team3:
-            teleport_player(player, spawnpoints.pop())
-
-        teleport_player(self.leader, self.map_data.get_spawnpoints('team0')[0])
+        self._teleport_teams((self._team1, self._team2, self._team3))
 
     @stage('mapgame-teleport-players4')
     def stage_mapgame_teleport_players4(self):
-        spawnpoints = list(self.map_data.get_spawnpoints('team1'))
-        shuffle(spawnpoints)
-
-        for player in self._team1:
-            teleport_player(player, spawnpoints.pop())
-
-        spawnpoints = list(self.map_data.get_spawnpoints('team2'))
-        shuffle(spawnpoints)
+        self._teleport_teams(
+            (self._team1, self._team2, self._team3, self._team4))
 
-        for player in self._team2:
-            teleport_player(player, spawnpoints.pop())
-
-        spawnpoints = list(self.map_data.get_spawnpoints('team3'))
-        shuffle(spawnpoints)
-
-        for player in self._team3:
-            teleport_player(player, spawnpoints.pop())
-
-        spawnpoints = list(self.map_data.get_spawnpoints('team4'))
-        shuffle(spawnpoints)
+    def _teleport_teams(self, teams):
+        for team_num, team in enumerate(teams, 1):
+            spawnpoint_allocator = self.map_data.get_spawnpoint_allocator(
+                'team{}'.format(team_num))
 
-        for player in self._team4:
-            teleport_player(player, spawnpoints.pop())
+            spawnpoint_allocator.shuffle()
+            spawnpoint_allocator.teleport(team)
 
-        teleport_player(self.leader, self.map_data.get_spawnpoints('team0')[0])
+        teleport_to_spawnpoint(
+            self.leader, self.map_data.get_spawnpoint_allocator('team0')[0])
 
     @stage('mapgame-teambased-split-teams')
     def stage_mapgame_teambased_split_teams(self):
@@ -15,19 +15,19 @@
 
 from random import choice
 
-from listeners.tick import Delay
 from players.teams import teams_by_name
 
 from ....resource.strings import build_module_strings
 
 from ...jail_map import get_players_in_area
 
-from .. import add_available_game, push, stage
+from .. import add_available_game, game_internal_event_handler, push, stage
 from ..base_classes.map_game import MapGame
 
 
-RECOLLECT_PLAYERS_INTERVAL = 0.25
-MAX_RECOLLECT_ITERATIONS = 8
+# How long to wait for players to show up in the finish areas after the
+# map has reported the end of the race
+COLLECT_PLAYERS_TIMEOUT = 2.0
 
 
 strings_module = build_module_strings('games/race')
@@ -46,7 +46,8 @@ class RaceBase(MapGame):
     def __init__(self, leader_player, players, **kwargs):
         super().__init__(leader_player, players, **kwargs)
 
-        self._recollect_delay = None
+        self._collect_area_type = None
+        self._collect_delay = None
 
     @staticmethod
     def _filter_func(player):
@@ -60,87 +61,96 @@ class RaceBase(MapGame):
 
     @stage('cancel-recollect-delay')
     def stage_cancel_recollect_delay(self):
-        if self._recollect_delay is not None:
-            if self._recollect_delay.running:
-                self._recollect_delay.cancel()
+        self._collect_area_type = None
 
-            self._recollect_delay = None
+        if self._collect_delay is not None:
+            self._collect_delay.cancel()
+            self._collect_delay = None
 
     @push(None, 'end_game')
     def push_end_game(self, args):
         self.set_stage_group('game-end-draw')
 
+    def start_collecting(self, area_type):
+        """Wait for players in the areas of the given type.
 
-class RaceSingleWinnerStandard(RaceBase):
-    _caption = strings_module['title single_winner standard']
-    module = 'race_single_winner_standard'
+        Calls players_collected() with the players that are in those
+        areas now or enter them within COLLECT_PLAYERS_TIMEOUT.
+        """
+        if self._collect_area_type is not None:
+            return
 
-    def collect_winners(self, iteration=1):
-        winners = set()
-        for area_name in self.map_data.get_areas('winners'):
-            winners.update(get_players_in_area(area_name))
+        self._collect_area_type = area_type
+        if self._check_collected_players():
+            return
 
-        winners = list(filter(self._filter_func, winners))
+        self._collect_delay = self.delay(
+            COLLECT_PLAYERS_TIMEOUT, self._collect_timed_out)
 
-        if not winners:
-            if iteration == MAX_RECOLLECT_ITERATIONS:
-                self.set_stage_group('game-end-draw')
+    def _check_collected_players(self):
+        players = set()
+        for area_name in self.map_data.get_areas(self._collect_area_type):
+            players.update(get_players_in_area(area_name))
 
-            else:
-                self._recollect_delay = Delay(
-                    RECOLLECT_PLAYERS_INTERVAL,
-                    self.collect_winners,
-                    iteration + 1,
-                )
+        players = list(filter(self._filter_func, players))
+        if not players:
+            return False
 
-        else:
-            self._results['losers'] = ()
-            self._results['winners'] = (choice(tuple(winners)), )
-            self.set_stage_group('game-end-players-won')
+        self.stage_cancel_recollect_delay()
+        self.players_collected(players)
+        return True
 
-    @push(None, 'race_player_won')
-    def push_race_player_won(self, args):
-        if self._recollect_delay is not None:
+    def _collect_timed_out(self):
+        self._collect_delay = None
+        self._collect_area_type = None
+        self.set_stage_group('game-end-draw')
+
+    def players_collected(self, players):
+        raise NotImplementedError
+
+    @game_internal_event_handler(
+        'race-player-entered-area', 'player_entered_area')
+    def event_race_player_entered_area(self, player, area_name):
+        if self._collect_area_type is None:
             return
 
-        self.collect_winners()
+        if area_name not in (
+                area_name_.lower() for area_name_ in
+                self.map_data.get_areas(self._collect_area_type)):
 
-add_available_game(RaceSingleWinnerStandard)
+            return
 
+        self._check_collected_players()
 
-class RaceMultipleWinnersStandard(RaceBase):
-    _caption = strings_module['title multiple_winners standard']
-    module = 'race_multiple_winners_standard'
 
-    def collect_winners(self, iteration=1):
-        winners = set()
-        for area_name in self.map_data.get_areas('winners'):
-            winners.update(get_players_in_area(area_name))
+class RaceSingleWinnerStandard(RaceBase):
+    _caption = strings_module['title single_winner standard']
+    module = 'race_single_winner_standard'
+
+    def players_collected(self, players):
+        self._results['losers'] = ()
+        self._results['winners'] = (choice(tuple(players)), )
+        self.set_stage_group('game-end-players-won')
 
-        winners = list(filter(self._filter_func, winners))
+    @push(None, 'race_player_won')
+    def push_race_player_won(self, args):
+        self.start_collecting('winners')
 
-        if not winners:
-            if iteration == MAX_RECOLLECT_ITERATIONS:
-                self.set_stage_group('game-end-draw')
+add_available_game(RaceSingleWinnerStandard)
 
-            else:
-                self._recollect_delay = Delay(
-                    RECOLLECT_PLAYERS_INTERVAL,
-                    self.collect_winners,
-                    iteration + 1,
-                )
 
-        else:
-            self._results['losers'] = ()
-            self._results['winners'] = winners
-            self.set_stage_group('game-end-players-won')
+class RaceMultipleWinnersStandard(RaceBase):
+    _caption = strings_module['title multiple_winners standard']
+    module = 'race_multiple_winners_standard'
+
+    def players_collected(self, players):
+        self._results['losers'] = ()
+        self._results['winners'] = players
+        self.set_stage_group('game-end-players-won')
 
     @push(None, 'race_players_won')
     def push_race_players_won(self, args):
-        if self._recollect_delay is not None:
-            return
-
-        self.collect_winners()
+        self.start_collecting('winners')
 
 add_available_game(RaceMultipleWinnersStandard)
 
@@ -149,35 +159,14 @@ class RaceSingleLoserStandard(RaceBase):
     _caption = strings_module['title single_loser standard']
     module = 'race_single_loser_standard'
 
-    def collect_losers(self, iteration=1):
-        losers = set()
-        for area_name in self.map_data.get_areas('losers'):
-            losers.update(get_players_in_area(area_name))
-
-        losers = list(filter(self._filter_func, losers))
-
-        if not losers:
-            if iteration == MAX_RECOLLECT_ITERATIONS:
-                self.set_stage_group('game-end-draw')
-
-            else:
-                self._recollect_delay = Delay(
-                    RECOLLECT_PLAYERS_INTERVAL,
-                    self.collect_losers,
-                    iteration + 1,
-                )
-
-        else:
-            self._results['losers'] = (choice(tuple(losers)), )
-            self._results['winners'] = ()
-            self.set_stage_group('game-end-players-won')
+    def players_collected(self, players):
+        self._results['losers'] = (choice(tuple(players)), )
+        self._results['winners'] = ()
+        self.set_stage_group('game-end-players-won')
 
     @push(None, 'race_player_lost')
     def push_race_player_lost(self, args):
-        if self._recollect_delay is not None:
-            return
-
-        self.collect_losers()
+        self.start_collecting('losers')
 
 add_available_game(RaceSingleLoserStandard)
 
@@ -186,34 +175,13 @@ class RaceMultipleLosersStandard(RaceBase):
     _caption = strings_module['title multiple_losers standard']
     module = 'race_multiple_losers_standard'
 
-    def collect_losers(self, iteration=1):
-        losers = set()
-        for area_name in self.map_data.get_areas('losers'):
-            losers.update(get_players_in_area(area_name))
-
-        losers = list(filter(self._filter_func, losers))
-
-        if not losers:
-            if iteration == MAX_RECOLLECT_ITERATIONS:
-                self.set_stage_group('game-end-draw')
-
-            else:
-                self._recollect_delay = Delay(
-                    RECOLLECT_PLAYERS_INTERVAL,
-                    self.collect_losers,
-                    iteration + 1,
-                )
-
-        else:
-            self._results['losers'] = losers
-            self._results['winners'] = ()
-            self.set_stage_group('game-end-players-won')
+    def players_collected(self, players):
+        self._results['losers'] = players
+        self._results['winners'] = ()
+        self.set_stage_group('game-end-players-won')
 
     @push(None, 'race_players_lost')
     def push_race_players_lost(self, args):
-        if self._recollect_delay is not None:
-            return
-
-        self.collect_losers()
+        self.start_collecting('losers')
 
 add_available_game(RaceMultipleLosersStandard)
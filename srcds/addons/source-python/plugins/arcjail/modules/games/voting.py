@@ -15,13 +15,13 @@
 
 from random import choice
 
-from listeners.tick import Delay
 from menus import PagedMenu, PagedOption
 
 from controlled_cvars.handlers import float_handler
 
 from ...internal_events import InternalEvent
 from ...resource.strings import build_module_strings
+from ...resource.timer_wheel import timer_wheel
 
 from .. import build_module_config
 from ..jail_menu import new_available_option
@@ -70,7 +70,7 @@ class GameVoting(dict):
     def start(self, popup, targets, timeout):
         self._popup = popup
         self._max_players = len(targets)
-        self._timeout_delay = Delay(timeout, self.finish)
+        self._timeout_delay = timer_wheel.delay(timeout, self.finish)
 
         popup.send(*[player.index for player in targets])
 
@@ -79,9 +79,7 @@ class GameVoting(dict):
             return
 
         if self._timeout_delay is not None:
-            if self._timeout_delay.running:
-                self._timeout_delay.cancel()
-
+            self._timeout_delay.cancel()
             self._timeout_delay = None
 
         self._popup.close()
@@ -16,9 +16,8 @@
 from datetime import datetime
 from time import time
 
-from listeners.tick import GameThread
-
 from ..internal_events import InternalEvent
+from ..resource.db_executor import db_executor
 from ..resource.sqlalchemy import Session
 from ..resource.strings import build_module_strings
 from ..models.guards_license import GuardsLicense as DB_GuardsLicense
@@ -73,7 +72,7 @@ class GuardsLicensesManager(dict):
             db_session.commit()
             db_session.close()
 
-        GameThread(target=save_revocation).start()
+        db_executor.submit(save_revocation, key=player.steamid)
 
     def give_license(self, issuer, player, duration):
         if self.has_license(player):
@@ -103,7 +102,7 @@ class GuardsLicensesManager(dict):
             new_license_.id = db_guards_license.id
             db_session.close()
 
-        GameThread(target=save_new_license).start()
+        db_executor.submit(save_new_license, key=player.steamid)
 
     def load_license(self, player):
         db_session = Session()
@@ -135,8 +134,8 @@ def format_ts(ts):
 @InternalEvent('player_created')
 def on_player_created(player):
     guards_licenses_manager[player.index] = None
-    GameThread(
-        target=guards_licenses_manager.load_license, args=(player, )).start()
+    db_executor.submit(
+        guards_licenses_manager.load_license, player, key=player.steamid)
 
 
 @InternalEvent('player_deleted')
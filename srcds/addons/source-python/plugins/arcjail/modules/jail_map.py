@@ -13,33 +13,61 @@
 # You should have received a copy of the GNU General Public License
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
+import hashlib
 import json
+import os
+from random import shuffle
 from traceback import format_exc
 from warnings import warn
 
 from commands.server import ServerCommand
+from core import echo_console
 from engines.server import global_vars
-from events import Event
+from listeners import OnTick
 from mathlib import QAngle, Vector as Vector_MathLib
 
 from path import Path
 
 from advanced_ts import BaseLangStrings
 
-from ..classes.geometry import Point, Vector, ConvexArea
+from controlled_cvars.handlers import int_handler
+
+from ..classes.geometry import (
+    Point, ConvexArea, ConvexAreaSet, merge_bounds)
 from ..classes.meta_parser import MetaParser
 from ..classes.string_values import value_from_string
 from ..info import info
 from ..internal_events import InternalEvent
+from ..resource.logger import logger
 from ..resource.paths import (
     ARCJAIL_DATA_PATH, MAPDATA_PATH, MAP_TRANSLATION_PATH)
+from ..resource.profiler import Event
 
 from .ent_fire import new_output_connection
 from .players import player_manager
 
+from . import build_module_config
+
 
+# Bump when the layout of compiled mapdata changes
+MAPDATA_CACHE_VERSION = 3
 ORIGIN_OFFSET_Z = 32
 
+# Moving faster than this between two samples is taken for a teleport
+# rather than for passing through the areas in between
+MAX_MOVE_PER_TICK = 64
+
+
+config_manager = build_module_config('jail_map')
+
+config_manager.controlled_cvar(
+    int_handler,
+    "area_sample_interval",
+    default=4,
+    description="Check which areas players are in every X ticks "
+                "and fire area enter/leave events",
+)
+
 
 class CorruptGameSettings(Exception):
     pass
@@ -57,12 +85,80 @@ class Area:
     def __init__(self):
         self.structures = []
 
+        # AABB of all structures, None if some structure is unbounded
+        self.bounds = None
+
+    def add_structure(self, structure):
+        self.structures.append(structure)
+        self.bounds = merge_bounds(
+            [structure.bounds for structure in self.structures])
+
 
 class Spawnpoint:
     def __init__(self, origin, angles):
         self.origin = tuple(origin)
         self.angles = tuple(angles)
 
+        # Engine types, so that teleporting doesn't need to convert
+        self.vector = Vector_MathLib(*self.origin)
+        self.qangle = QAngle(*self.angles)
+
+
+class SpawnpointAllocator:
+    """Resolved spawnpoints handed out to players in turns.
+
+    shuffle() randomizes the order and starts over. Players beyond the
+    number of spawnpoints get the first spawnpoints again, so they are
+    stacked on top of the players who were teleported there before them.
+    An allocator without spawnpoints doesn't teleport anyone.
+    """
+    def __init__(self, spawnpoints=()):
+        self._spawnpoints = list(spawnpoints)
+        self._cursor = 0
+
+    def __len__(self):
+        return len(self._spawnpoints)
+
+    def __getitem__(self, index):
+        return self._spawnpoints[index]
+
+    def shuffle(self):
+        shuffle(self._spawnpoints)
+        self._cursor = 0
+
+    def teleport(self, players):
+        spawnpoints = self._spawnpoints
+        if not spawnpoints:
+            logger.log_warning(
+                "SpawnpointAllocator.teleport: No spawnpoints to teleport "
+                "players to")
+
+            return
+
+        cursor = self._cursor
+        for player in players:
+            spawnpoint = spawnpoints[cursor % len(spawnpoints)]
+            player.origin = spawnpoint.vector
+            player.view_angle = spawnpoint.qangle
+            area_occupancy.forget_position(player)
+            cursor += 1
+
+        self._cursor = cursor % len(spawnpoints)
+
+        area_occupancy.invalidate()
+
+
+def resolve_spawnpoints(spawnpoint_names):
+    spawnpoints = []
+    for spawnpoint_name in spawnpoint_names:
+        try:
+            spawnpoints.append(MapData.spawnpoints[spawnpoint_name])
+        except KeyError:
+            warn(InvalidValue(
+                "Unknown spawnpoint: '{0}'".format(spawnpoint_name)))
+
+    return SpawnpointAllocator(spawnpoints)
+
 
 class StageActionGame:
     def __init__(self):
@@ -99,6 +195,10 @@ class LRGame(StageActionGame):
     def __init__(self):
         super().__init__()
         self.spawnpoints = []
+        self.spawnpoint_allocator = SpawnpointAllocator()
+
+    def resolve_spawnpoints(self):
+        self.spawnpoint_allocator = resolve_spawnpoints(self.spawnpoints)
 
 
 class Game(StageActionGame):
@@ -113,6 +213,7 @@ class Game(StageActionGame):
         }
         self._actions['OnLastRequestStart'] = []
         self._spawnpoints = {}
+        self._spawnpoint_allocators = {}
         self._settings = {}
 
     def add_spawnpoint(self, team, spawnpoint):
@@ -124,6 +225,18 @@ class Game(StageActionGame):
     def get_spawnpoints(self, team):
         return tuple(self._spawnpoints.get(team, ()))
 
+    def resolve_spawnpoints(self):
+        self._spawnpoint_allocators = {
+            team: resolve_spawnpoints(spawnpoint_names)
+            for team, spawnpoint_names in self._spawnpoints.items()
+        }
+
+    def get_spawnpoint_allocator(self, team):
+        if team not in self._spawnpoint_allocators:
+            self._spawnpoint_allocators[team] = SpawnpointAllocator()
+
+        return self._spawnpoint_allocators[team]
+
     def add_area(self, type_, area):
         type_title = {
             0: 'generic',
@@ -159,6 +272,11 @@ class MapData:
     connections = {}
 
     areas = {}
+    compiled_areas = ConvexAreaSet()
+
+    # What compile_map_data() returned for the loaded map
+    compiled = None
+
     lrs = {}
     spawnpoints = {}
     games = {}
@@ -177,6 +295,8 @@ class MapData:
         cls.connections = {}
 
         cls.areas = {}
+        cls.compiled_areas = ConvexAreaSet()
+        cls.compiled = None
         cls.lrs = {}
         cls.spawnpoints = {}
         cls.games = {}
@@ -255,129 +375,426 @@ def get_jail_names():
     return tuple(MapData.jails)
 
 
-def reload_map_info():
-    MapData.reset()
-
-    mapdata_json = MAPDATA_PATH / '{0}.json'.format(global_vars.map_name)
-    if not mapdata_json.isfile():
-        return
+def compile_map_data(data):
+    """Turn parsed mapdata JSON into plain, JSON-serializable data.
 
-    with open(mapdata_json) as f:
-        try:
-            data = json.load(f)
-        except:
-            raise CorruptMapData("Can't load JSON for {0}!".format(
-                mapdata_json
-            ))
+    This is the expensive part of loading a map: areas are built from
+    their faces and stored as compiled ConvexArea attributes.
+    """
+    compiled = {
+        'connections': {},
+        'areas': [],
+        'spawnpoints': {},
+        'lrs': {},
+        'games': {},
+        'cages': [],
+        'jails': [],
+        'shop_windows': [],
+    }
 
     for section_name, section in data.items():
         if section_name == 'settings':
-            for output_name, connections in section.get('connections', {}).items():
-                MapData.connections[output_name] = []
-                for connection_json in connections:
-                    connection = new_output_connection(connection_json)
-                    MapData.connections[output_name].append(connection)
-
+            compiled['connections'] = dict(section.get('connections', {}))
             continue
 
         if section_name == 'areas':
             for area_name, area in section.items():
-                MapData.areas[area_name] = Area()
+                structures = []
                 for structure in area['structures']:
                     sides = ConvexArea([
                         ConvexArea.ConvexAreaFace(map(
-                            lambda p: Point(map(float, p.split())),
+                            lambda p: Point.from_xyz(*map(float, p.split())),
                             side[1:-1].split(') (')  # TODO: Use regex here
                         )) for side in structure
                     ])
 
-                    MapData.areas[area_name].structures.append(sides)
+                    structures.append(sides.get_compiled())
+
+                source_hash = hashlib.sha1(json.dumps(
+                    area, sort_keys=True).encode('utf-8')).hexdigest()
+
+                compiled['areas'].append(
+                    (area_name, source_hash, structures))
             continue
 
         if section_name == 'spawnpoints':
             for spawnpoint_name, spawnpoint in section.items():
-                origin = tuple(map(float, spawnpoint['origin'].split()))
-                angles = tuple(map(float, spawnpoint['angles'].split()))
-                MapData.spawnpoints[spawnpoint_name] = Spawnpoint(
-                    origin, angles)
+                # Lists, so that entries loaded from the cache compare equal
+                origin = list(map(float, spawnpoint['origin'].split()))
+                angles = list(map(float, spawnpoint['angles'].split()))
+                compiled['spawnpoints'][spawnpoint_name] = [origin, angles]
             continue
 
         if section_name == 'lrs':
             for game_name, game in section.items():
-                MapData.lrs[game_name] = LRGame()
-                MapData.lrs[game_name].module = game['module']
-
-                for output_name, connections in game['connections'].items():
-                    for connection_json in connections:
-                        MapData.lrs[game_name].set_action(
-                            output_name, connection_json)
-
-                for spawnpoint_name in game['spawnpoints']:
-                    MapData.lrs[game_name].spawnpoints.append(spawnpoint_name)
+                compiled['lrs'][game_name] = {
+                    'module': game['module'],
+                    'connections': game['connections'],
+                    'spawnpoints': list(game['spawnpoints']),
+                }
             continue
 
         if section_name == 'games':
             for game_name, game in section.items():
-                MapData.games[game_name] = Game()
-                MapData.games[game_name].module = game['module']
-                MapData.games[game_name].slot_id = game['slot_id']
-                MapData.games[game_name].caption = game.get('caption')
-
-                for output_name, connections in game['connections'].items():
-                    for connection_json in connections:
-                        MapData.games[game_name].set_action(
-                            output_name, connection_json)
-
-                for team, spawnpoints in game['spawnpoints'].items():
-                    for spawnpoint_name in spawnpoints:
-                        MapData.games[game_name].add_spawnpoint(
-                            team, spawnpoint_name)
-
                 if not game['areas']:
                     raise CorruptMapData(
                         "Game '{0}' lacks its game areas".format(game_name))
 
-                for area in game['areas']:
-                    MapData.games[game_name].add_area(
-                        area['areatype'], area['name'])
-
-                for setting in _game_settings.values():
-                    default_value = setting['default']
-                    map_value = game['settings'].get(setting['fgd'], None)
-
-                    if map_value is None:
-                        value = default_value
-                    else:
-                        try:
-                            value = value_from_string(
-                                map_value, setting['type'])
-                        except TypeError:
-                            warn(
-                                InvalidValue(
-                                    "Invalid setting value for '{0}': "
-                                    "'{1}'".format(setting['name'], map_value)
-                                )
-                            )
-                            value = default_value
-
-                    MapData.games[game_name][setting['name']] = value
-
+                # Settings are resolved on load, gamesettings.dat may change
+                compiled['games'][game_name] = game
             continue
 
-        if section_name == 'cages':
-            for cage_name in section:
-                MapData.cages.append(cage_name)
+        if section_name in ('cages', 'jails', 'shop_windows'):
+            compiled[section_name].extend(section)
             continue
 
-        if section_name == 'jails':
-            for jail_name in section:
-                MapData.jails.append(jail_name)
+    return compiled
+
+
+def get_file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def load_map_data_cache(source_path, cache_path):
+    """Return compiled mapdata from cache_path if it's still valid.
+
+    The cache is valid if the source file has the same modification time
+    and size as when the cache was written, or failing that, the same
+    hash. Return None if the cache is missing or outdated.
+    """
+    if not cache_path.isfile():
+        return None
+
+    source_stat = os.stat(source_path)
+
+    try:
+        with open(cache_path, encoding='utf-8') as f:
+            header = json.loads(f.readline())
+            if header.get('version') != MAPDATA_CACHE_VERSION:
+                return None
+
+            if (header['source_mtime'] != source_stat.st_mtime_ns or
+                    header['source_size'] != source_stat.st_size):
+
+                if header['source_hash'] != get_file_hash(source_path):
+                    return None
+
+                # Source was touched but not changed
+                touched = True
+
+            else:
+                touched = False
+
+            compiled = json.loads(f.readline())
+
+    except Exception:
+        logger.log_warning(
+            "load_map_data_cache: Can't read {}, ignoring it:\n{}".format(
+                cache_path, format_exc()))
+
+        return None
+
+    if touched:
+        save_map_data_cache(source_path, cache_path, compiled)
+
+    return compiled
+
+
+def save_map_data_cache(source_path, cache_path, compiled):
+    source_stat = os.stat(source_path)
+    header = {
+        'version': MAPDATA_CACHE_VERSION,
+        'source_mtime': source_stat.st_mtime_ns,
+        'source_size': source_stat.st_size,
+        'source_hash': get_file_hash(source_path),
+    }
+
+    # JSON, as anyone who can write the cache file mustn't be able to run
+    # code through it. The header is on a line of its own so that checking
+    # it is cheap
+    temp_path = cache_path + '.tmp'
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(header) + '\n')
+            f.write(json.dumps(compiled) + '\n')
+
+        os.replace(temp_path, cache_path)
+
+    except OSError:
+        logger.log_warning(
+            "save_map_data_cache: Can't write {}:\n{}".format(
+                cache_path, format_exc()))
+
+
+def build_connections(connections_json):
+    return [new_output_connection(connection_json)
+            for connection_json in connections_json]
+
+
+def build_area(structures):
+    area = Area()
+    for structure in structures:
+        area.add_structure(ConvexArea.from_compiled(*structure))
+
+    return area
+
+
+def build_lr(game):
+    lr = LRGame()
+    lr.module = game['module']
+
+    for output_name, connections in game['connections'].items():
+        for connection_json in connections:
+            lr.set_action(output_name, connection_json)
+
+    for spawnpoint_name in game['spawnpoints']:
+        lr.spawnpoints.append(spawnpoint_name)
+
+    lr.resolve_spawnpoints()
+
+    return lr
+
+
+def build_game(game_name, game):
+    map_game = Game()
+    map_game.module = game['module']
+    map_game.slot_id = game['slot_id']
+    map_game.caption = game.get('caption')
+
+    for output_name, connections in game['connections'].items():
+        for connection_json in connections:
+            map_game.set_action(output_name, connection_json)
+
+    for team, spawnpoints in game['spawnpoints'].items():
+        for spawnpoint_name in spawnpoints:
+            map_game.add_spawnpoint(team, spawnpoint_name)
+
+    map_game.resolve_spawnpoints()
+
+    for area in game['areas']:
+        map_game.add_area(area['areatype'], area['name'])
+
+    for setting in _game_settings.values():
+        default_value = setting['default']
+        map_value = game['settings'].get(setting['fgd'], None)
+
+        if map_value is None:
+            value = default_value
+        else:
+            try:
+                value = value_from_string(map_value, setting['type'])
+            except TypeError:
+                warn(
+                    InvalidValue(
+                        "Invalid setting value for '{0}': "
+                        "'{1}'".format(setting['name'], map_value)
+                    )
+                )
+                value = default_value
+
+        map_game[setting['name']] = value
+
+    return map_game
+
+
+def apply_map_data(compiled):
+    for output_name, connections in compiled['connections'].items():
+        MapData.connections[output_name] = build_connections(connections)
+
+    for area_name, source_hash, structures in compiled['areas']:
+        MapData.areas[area_name] = build_area(structures)
+
+    for spawnpoint_name, (origin, angles) in compiled['spawnpoints'].items():
+        MapData.spawnpoints[spawnpoint_name] = Spawnpoint(origin, angles)
+
+    for game_name, game in compiled['lrs'].items():
+        MapData.lrs[game_name] = build_lr(game)
+
+    for game_name, game in compiled['games'].items():
+        MapData.games[game_name] = build_game(game_name, game)
+
+    MapData.cages.extend(compiled['cages'])
+    MapData.jails.extend(compiled['jails'])
+    MapData.shop_windows.extend(compiled['shop_windows'])
+
+    MapData.compiled = compiled
+
+
+def _update_section(section, old_entries, new_entries, build, destroy=None):
+    """Rebuild the entries of a MapData dict that differ, return the count.
+
+    old_entries and new_entries map names to compiled data. Entries that
+    are equal in both are left untouched.
+    """
+    changed = 0
+    for name, old_entry in old_entries.items():
+        if name in new_entries and new_entries[name] == old_entry:
             continue
 
-        if section_name == 'shop_windows':
-            MapData.shop_windows.extend(section)
+        if destroy is not None and name in section:
+            destroy(section[name])
+
+        del section[name]
+        changed += 1
+
+    for name, new_entry in new_entries.items():
+        if name in section:
             continue
 
+        section[name] = build(name, new_entry)
+        if name not in old_entries:
+            changed += 1
+
+    return changed
+
+
+def update_map_data(compiled):
+    """Bring MapData in line with compiled, only rebuilding what changed.
+
+    Unchanged games, last requests, areas and connections keep their
+    objects, so running games and hooked outputs aren't disturbed.
+    Return the number of changed entries per section.
+    """
+    old = MapData.compiled
+    changes = {}
+
+    def destroy_connections(connections):
+        for connection in connections:
+            connection.destroy()
+
+    changes['connections'] = _update_section(
+        MapData.connections, old['connections'], compiled['connections'],
+        lambda name, connections: build_connections(connections),
+        destroy_connections)
+
+    # Compiled structures aren't stable between compilations, so areas
+    # are compared by the hash of their source
+    old_areas = {name: source_hash
+                 for name, source_hash, structures in old['areas']}
+    new_areas = {name: source_hash
+                 for name, source_hash, structures in compiled['areas']}
+    new_structures = {name: structures
+                      for name, source_hash, structures in compiled['areas']}
+
+    changes['areas'] = _update_section(
+        MapData.areas, old_areas, new_areas,
+        lambda name, source_hash: build_area(new_structures[name]))
+
+    # Keep the order of the file
+    MapData.areas = {name: MapData.areas[name] for name in new_areas}
+
+    changes['spawnpoints'] = _update_section(
+        MapData.spawnpoints, old['spawnpoints'], compiled['spawnpoints'],
+        lambda name, spawnpoint: Spawnpoint(*spawnpoint))
+
+    # Unchanged games would keep the replaced spawnpoints otherwise
+    if changes['spawnpoints']:
+        for lr in MapData.lrs.values():
+            lr.resolve_spawnpoints()
+
+        for game in MapData.games.values():
+            game.resolve_spawnpoints()
+
+    changes['lrs'] = _update_section(
+        MapData.lrs, old['lrs'], compiled['lrs'],
+        lambda name, game: build_lr(game),
+        lambda lr: lr.destroy_connections())
+
+    changes['games'] = _update_section(
+        MapData.games, old['games'], compiled['games'], build_game,
+        lambda game: game.destroy_connections())
+
+    for section_name in ('cages', 'jails', 'shop_windows'):
+        changes[section_name] = int(
+            old[section_name] != compiled[section_name])
+
+        getattr(MapData, section_name)[:] = compiled[section_name]
+
+    MapData.compiled = compiled
+
+    if changes['areas']:
+        MapData.compiled_areas = ConvexAreaSet(
+            (area_name, area.structures)
+            for area_name, area in MapData.areas.items())
+
+        area_occupancy.invalidate()
+
+    return changes
+
+
+def load_compiled_map_data():
+    """Return compiled mapdata of the current map, None if there's none."""
+    mapdata_json = MAPDATA_PATH / '{0}.json'.format(global_vars.map_name)
+    if not mapdata_json.isfile():
+        return None
+
+    mapdata_cache = MAPDATA_PATH / '{0}.cache'.format(global_vars.map_name)
+
+    compiled = load_map_data_cache(mapdata_json, mapdata_cache)
+    if compiled is None:
+        with open(mapdata_json) as f:
+            try:
+                data = json.load(f)
+            except:
+                raise CorruptMapData("Can't load JSON for {0}!".format(
+                    mapdata_json
+                ))
+
+        compiled = compile_map_data(data)
+        save_map_data_cache(mapdata_json, mapdata_cache, compiled)
+
+    return compiled
+
+
+def reload_map_info():
+    MapData.reset()
+
+    compiled = load_compiled_map_data()
+    if compiled is None:
+        return
+
+    apply_map_data(compiled)
+
+    MapData.compiled_areas = ConvexAreaSet(
+        (area_name, area.structures)
+        for area_name, area in MapData.areas.items())
+
+    area_occupancy.reset()
+
+    reload_map_strings()
+
+
+def update_map_info():
+    """Reload mapdata, only rebuilding the entries that have changed.
+
+    Return the number of changed entries per section, or None if a full
+    reload had to be done instead.
+    """
+    compiled = load_compiled_map_data()
+    if compiled is None or MapData.compiled is None:
+        destroy_map_connections()
+        reload_map_info()
+        return None
+
+    changes = update_map_data(compiled)
+
+    reload_map_strings()
+
+    return changes
+
+
+def destroy_map_connections():
+    for game in MapData.games.values():
+        game.destroy_connections()
+
+    for lr in MapData.lrs.values():
+        lr.destroy_connections()
+
+    MapData.destroy_connections()
+
+
+def reload_map_strings():
     global _map_strings
 
     path = MAP_TRANSLATION_PATH / '{0}.ini'.format(global_vars.map_name)
@@ -406,50 +823,273 @@ def is_shop_window(entity):
 
 
 def is_point_in_area(point, area):
+    if area.bounds is not None:
+        (min_x, min_y, min_z), (max_x, max_y, max_z) = area.bounds
+        if not (min_x <= point.x <= max_x and
+                min_y <= point.y <= max_y and
+                min_z <= point.z <= max_z):
+
+            return False
+
     for structure in area.structures:
         if point in structure:
             return True
     return False
 
 
-def is_player_in_area(player, area_name):
-    area_name = area_name.lower()
-    if area_name not in MapData.areas:
-        return False
+def get_player_xyz(player):
+    x, y, z = player.origin
+    return x, y, z + ORIGIN_OFFSET_Z
+
 
-    player_point = Point(tuple(player.origin)) + Vector(0, 0, ORIGIN_OFFSET_Z)
-    return is_point_in_area(player_point, MapData.areas[area_name])
+def get_area_matrix(players):
+    """Return a players x areas matrix telling who is in which area.
+
+    Columns follow MapData.compiled_areas.names.
+    """
+    return MapData.compiled_areas.test(
+        [get_player_xyz(player) for player in players])
+
+
+class AreaOccupancy:
+    """Which players are in which areas, computed at most once per tick.
+
+    Queries only update the occupancy, they never fire events. Changes
+    are fired as 'player_entered_area' and 'player_left_area' internal
+    events by sample(), which is called every tick, so those events come
+    at least every area_sample_interval ticks.
+
+    The path between two samples is checked as well, so areas that a
+    player went through in the meantime get both events.
+    """
+    def __init__(self):
+        self._tick = None
+        self._players = []
+        self._positions = []
+        self._players_by_area = {}
+        self._areas_by_index = {}
+
+        # Index -> tick the player's areas were last computed at
+        self._ticks_by_index = {}
+
+        # State as of the last sample, which events are fired against
+        self._sample_tick = None
+        self._sampled_areas_by_index = {}
+
+        # Index -> (tick, (x, y, z)) of the last sample
+        self._positions_by_index = {}
+
+    def reset(self):
+        self._tick = None
+        self._players = []
+        self._positions = []
+        self._players_by_area.clear()
+        self._areas_by_index.clear()
+        self._ticks_by_index.clear()
+        self._sample_tick = None
+        self._sampled_areas_by_index.clear()
+        self._positions_by_index.clear()
+
+    def invalidate(self):
+        self._tick = None
+        self._ticks_by_index.clear()
+
+    def refresh(self):
+        """Compute the areas of all players. Doesn't fire any events."""
+        if self._tick == global_vars.tick_count:
+            return
+
+        self._tick = global_vars.tick_count
+
+        players = list(player_manager.values())
+        positions = [get_player_xyz(player) for player in players]
+        area_names = MapData.compiled_areas.names
+
+        players_by_area = {area_name: set() for area_name in area_names}
+        areas_by_index = {}
+        for player, row in zip(
+                players, MapData.compiled_areas.test(positions)):
+
+            areas = tuple(area_name for area_name, inside in zip(
+                area_names, row) if inside)
+
+            for area_name in areas:
+                players_by_area[area_name].add(player)
+
+            areas_by_index[player.index] = areas
+
+        self._players = players
+        self._positions = positions
+        self._players_by_area = players_by_area
+        self._areas_by_index = areas_by_index
+        self._ticks_by_index = dict.fromkeys(areas_by_index, self._tick)
+
+    def _refresh_player(self, player):
+        """Compute the areas of a single player, without firing events."""
+        area_names = MapData.compiled_areas.names
+        row, = MapData.compiled_areas.test([get_player_xyz(player)])
+        areas = tuple(area_name for area_name, inside in zip(
+            area_names, row) if inside)
+
+        for area_name in area_names:
+            players = self._players_by_area.setdefault(area_name, set())
+            if area_name in areas:
+                players.add(player)
+            else:
+                players.discard(player)
+
+        self._areas_by_index[player.index] = areas
+        self._ticks_by_index[player.index] = global_vars.tick_count
+
+        return areas
+
+    def _fire_changes(self):
+        players, positions = self._players, self._positions
+        areas_by_index = self._areas_by_index
+        old_areas_by_index = self._sampled_areas_by_index
+        old_positions_by_index = self._positions_by_index
+
+        # Handlers may query or invalidate the occupancy, so the sampled
+        # state is replaced before any of them is called
+        self._sampled_areas_by_index = dict(areas_by_index)
+        self._positions_by_index = {
+            player.index: (self._tick, position)
+            for player, position in zip(players, positions)
+            if player.index in areas_by_index
+        }
+
+        for player, position in zip(players, positions):
+            # Forgotten since the refresh
+            if player.index not in areas_by_index:
+                continue
+
+            old_areas = old_areas_by_index.get(player.index, ())
+            new_areas = areas_by_index[player.index]
+
+            for area_name in old_areas:
+                if area_name not in new_areas:
+                    InternalEvent.fire('player_left_area',
+                                       player=player, area_name=area_name)
+
+            for area_name in new_areas:
+                if area_name not in old_areas:
+                    InternalEvent.fire('player_entered_area',
+                                       player=player, area_name=area_name)
+
+            if player.index not in old_positions_by_index:
+                continue
+
+            for area_name in self._get_passed_areas(
+                    old_positions_by_index[player.index], position):
+
+                if area_name in old_areas or area_name in new_areas:
+                    continue
+
+                InternalEvent.fire('player_entered_area',
+                                   player=player, area_name=area_name)
+
+                InternalEvent.fire('player_left_area',
+                                   player=player, area_name=area_name)
+
+    def _get_passed_areas(self, old_sample, position):
+        old_tick, old_position = old_sample
+        if old_position == position:
+            return ()
+
+        ticks = max(self._tick - old_tick, 1)
+        distance = sum((a - b) ** 2 for a, b in zip(
+            old_position, position)) ** 0.5
+
+        if distance > MAX_MOVE_PER_TICK * ticks:
+            return ()
+
+        if distance < MapData.compiled_areas.min_thickness:
+            return ()
+
+        return tuple(area_name for area_name, t_enter, t_exit in
+                     MapData.compiled_areas.intersect_segment(
+                         old_position, position))
+
+    def sample(self):
+        """Refresh the occupancy and fire events for what has changed."""
+        if not MapData.compiled_areas.names:
+            return
+
+        if (self._sample_tick is not None and
+                global_vars.tick_count - self._sample_tick <
+                config_manager['area_sample_interval']):
+
+            return
+
+        self._sample_tick = global_vars.tick_count
+
+        self.refresh()
+        self._fire_changes()
+
+    def get_players_in_area(self, area_name):
+        self.refresh()
+        return self._players_by_area.get(area_name, set())
+
+    def get_player_areas(self, player):
+        if self._ticks_by_index.get(player.index) == global_vars.tick_count:
+            return self._areas_by_index[player.index]
+
+        return self._refresh_player(player)
+
+    def forget_position(self, player):
+        """Don't treat the next move of the player as a walk."""
+        self._positions_by_index.pop(player.index, None)
+
+    def forget_player(self, player):
+        self._areas_by_index.pop(player.index, None)
+        self._ticks_by_index.pop(player.index, None)
+        self._sampled_areas_by_index.pop(player.index, None)
+        self._positions_by_index.pop(player.index, None)
+        for players in self._players_by_area.values():
+            players.discard(player)
+
+area_occupancy = AreaOccupancy()
+
+
+def is_player_in_area(player, area_name):
+    return area_name.lower() in area_occupancy.get_player_areas(player)
 
 
 def get_player_areas(player):
-    rs = []
-    player_point = Point(tuple(player.origin)) + Vector(0, 0, ORIGIN_OFFSET_Z)
-    for area_name, area in MapData.areas.items():
-        if is_point_in_area(player_point, area):
-            rs.append(area_name)
-    return tuple(rs)
+    return area_occupancy.get_player_areas(player)
 
 
 def get_players_in_area(area_name):
-    area_name = area_name.lower()
-    if area_name not in MapData.areas:
-        return []
+    return list(area_occupancy.get_players_in_area(area_name.lower()))
+
 
-    rs = []
-    for player in player_manager.values():
-        player_point = (Point(tuple(player.origin)) +
-                        Vector(0, 0, ORIGIN_OFFSET_Z))
+def get_nearest_area(player):
+    """Return (area name, signed distance) of the area nearest to player."""
+    return MapData.compiled_areas.nearest(*get_player_xyz(player))
 
-        if is_point_in_area(player_point, MapData.areas[area_name]):
-            rs.append(player)
 
-    return rs
+def get_distance_to_area(player, area_name):
+    """Return the signed distance from player to the given area.
+
+    Negative distances mean the player is inside.
+    """
+    x, y, z = get_player_xyz(player)
+    return min(
+        (structure.signed_distance_xyz(x, y, z)
+         for structure in MapData.areas[area_name.lower()].structures),
+        default=float('inf'))
 
 
 def teleport_player(player, spawnpoint_name):
-    spawnpoint = MapData.spawnpoints[spawnpoint_name]
-    player.origin = Vector_MathLib(*spawnpoint.origin)
-    player.view_angle = QAngle(*spawnpoint.angles)
+    teleport_to_spawnpoint(player, MapData.spawnpoints[spawnpoint_name])
+
+
+def teleport_to_spawnpoint(player, spawnpoint):
+    player.origin = spawnpoint.vector
+    player.view_angle = spawnpoint.qangle
+
+    area_occupancy.forget_position(player)
+    area_occupancy.invalidate()
 
 
 def get_map_var(var_name, default=None):
@@ -536,6 +1176,16 @@ def on_load():
     InternalEvent.fire('map_data_ready')
 
 
+@InternalEvent('player_deleted')
+def on_player_deleted(player):
+    area_occupancy.forget_player(player)
+
+
+@OnTick
+def listener_on_tick():
+    area_occupancy.sample()
+
+
 @InternalEvent('jail_game_started')
 def on_jail_game_started():
     for connection_string in get_map_var_list('OnJailRoundStart'):
@@ -570,15 +1220,27 @@ def srv_push(command):
 
 @ServerCommand('arcjail_reload_map_data')
 def srv_arcjail_reload_map_data(command):
-    for game in MapData.games.values():
-        game.destroy_connections()
+    if len(command) > 1 and command[1] == 'full':
+        destroy_map_connections()
+        reload_map_info()
+        echo_console("Map data reloaded")
+        return
 
-    for lr in MapData.lrs.values():
-        lr.destroy_connections()
+    changes = update_map_info()
+    if changes is None:
+        echo_console("Map data reloaded")
+        return
 
-    MapData.destroy_connections()
+    changed_sections = ["{}: {}".format(section_name, count)
+                        for section_name, count in sorted(changes.items())
+                        if count]
 
-    reload_map_info()
+    if not changed_sections:
+        echo_console("Map data is up to date")
+        return
+
+    echo_console("Map data updated ({})".format(
+        ", ".join(changed_sections)))
 
 
 @ServerCommand('arcjail_reload_map_scripts')
@@ -15,10 +15,10 @@
 
 from spam_proof_commands.client import ClientCommand
 from spam_proof_commands.say import SayCommand
-from events import Event
 from menus import PagedMenu, PagedOption
 
 from ..internal_events import InternalEvent
+from ..resource.profiler import Event
 from ..resource.strings import build_module_strings
 
 from .players import player_manager, tell
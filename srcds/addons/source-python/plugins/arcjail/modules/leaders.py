@@ -14,12 +14,12 @@
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
 from spam_proof_commands.say import SayCommand
-from events import Event
 
 from controlled_cvars import InvalidValue
 from controlled_cvars.handlers import bool_handler
 
 from ..internal_events import InternalEvent
+from ..resource.profiler import Event
 from ..resource.strings import build_module_strings
 
 from . import build_module_config
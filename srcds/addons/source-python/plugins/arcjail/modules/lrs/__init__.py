@@ -18,9 +18,7 @@ from traceback import format_exc
 from warnings import warn
 
 from commands.say import SayCommand
-from events import Event
 from filters.players import PlayerIter
-from listeners.tick import Delay
 from menus import PagedMenu, PagedOption
 
 from controlled_cvars import InvalidValue
@@ -30,7 +28,9 @@ from controlled_cvars.handlers import (
 
 from ...arcjail import load_downloadables
 from ...internal_events import InternalEvent
+from ...resource.profiler import Event
 from ...resource.strings import build_module_strings
+from ...resource.timer_wheel import ROUND, timer_wheel
 
 from ..game_status import (
     GameStatus, get_status, set_status, strings_module as strings_game_status)
@@ -452,15 +452,12 @@ def send_rebel_popup(player, launcher, guard, settings):
             else:
                 tell(player, strings_module['fail decline'])
 
-        _rebel_delays[player.index] = Delay(
-            config_manager['ask_guard_timeout'], auto_action)
+        _rebel_delays[player.index] = timer_wheel.delay(
+            config_manager['ask_guard_timeout'], auto_action, owner=ROUND)
 
         def select_callback_rebel(popup, player_index, option):
             if player.index in _rebel_delays:
-                if _rebel_delays[player.index].running:
-                    _rebel_delays[player.index].cancel()
-
-                del _rebel_delays[player.index]
+                _rebel_delays.pop(player.index).cancel()
 
             if option.value:
                 reason = get_lr_denial_reason(player)
@@ -694,6 +691,9 @@ def reset():
 
     _popups.clear()
 
+    # Round timers are cancelled by the timer wheel itself
+    _rebel_delays.clear()
+
 
 @Event('player_death')
 def on_player_death(game_event):
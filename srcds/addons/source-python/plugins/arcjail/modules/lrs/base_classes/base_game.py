@@ -13,6 +13,7 @@
 # You should have received a copy of the GNU General Public License
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
+from ....classes.stage_engine import StageEngine
 from ....internal_events import InternalEvent
 
 from ...games.base_classes.base_game import BaseGame
@@ -30,26 +31,16 @@ class BaseGame(BaseGame):
             return self.game_class(players, **kwargs)
 
     def __init__(self, players, **kwargs):
+        # The games BaseGame needs a leader, LRs only run the stage engine
+        StageEngine.__init__(self)
+
         self._prisoner, self._guard = players
         self._players = list(players)
         self._players_all = list(players)
-        self._lock_stage_queue = False
-        self._cur_stage_id = None
-        self._stage_queue = []
-        self._executed_stages = []
         self._settings = kwargs
         self._status = None
         self._results = {}
 
-        for stage_ in self._stages_map.values():
-            stage_.game_instance = self
-
-        for game_event_handler_ in self._events.values():
-            game_event_handler_.game_instance = self
-
-        for game_internal_event_handler_ in self._internal_events.values():
-            game_internal_event_handler_.game_instance = self
-
     @property
     def caption(self):
         return self._caption
@@ -15,8 +15,6 @@
 
 from random import randrange
 
-from listeners.tick import Delay
-
 from ...games.base_classes.chat_game import (
     config_manager as config_manager_games, strings_module as strings_games)
 
@@ -83,9 +81,7 @@ class ChatGame(NoOffenseGame):
             def callback():
                 self.set_stage_group('chatgame-print-rules')
 
-            self._delays.append(Delay(
-                config_manager_games['rules_print_interval'], callback
-            ))
+            self.delay(config_manager_games['rules_print_interval'], callback)
 
     @stage('chatgame-generate-test')
     def stage_chatgame_generate_test(self):
@@ -108,7 +104,7 @@ class ChatGame(NoOffenseGame):
         else:
             delay = randrange(min_delay, max_delay)
 
-        self._delays.append(Delay(delay, ask_callback))
+        self.delay(delay, ask_callback)
 
     @stage('chatgame-improperly-configured')
     def stage_chatgame_improperly_configured(self):
@@ -122,7 +118,7 @@ class ChatGame(NoOffenseGame):
         def timeout_callback():
             self.set_stage_group('chatgame-timed-out')
 
-        self._delays.append(Delay(timeout, timeout_callback))
+        self.delay(timeout, timeout_callback)
 
         broadcast(self._question)
 
@@ -14,7 +14,6 @@
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
 from contextlib import suppress
-from random import shuffle
 
 from entities.helpers import edict_from_index
 
@@ -28,7 +27,7 @@ from ...equipment_switcher import (
     unregister_weapon_pickup_filter)
 from ...falldmg_protector import unprotect
 from ...games import play_flawless_effects
-from ...jail_map import get_lrs, teleport_player
+from ...jail_map import get_lrs
 from ...players import player_manager
 from ...show_damage import show_damage
 
@@ -73,7 +72,6 @@ class CombatGame(PrepareTime):
             self.guard.index: True,
         }
         self._counters = {}
-        self._delays = []
 
     @stage('basegame-entry')
     def stage_basegame_entry(self):
@@ -128,11 +126,8 @@ class CombatGame(PrepareTime):
         if self.map_data is None:
             return
 
-        spawnpoints = list(self.map_data.spawnpoints)
-        shuffle(spawnpoints)
-
-        for player in self._players:
-            teleport_player(player, spawnpoints.pop())
+        self.map_data.spawnpoint_allocator.shuffle()
+        self.map_data.spawnpoint_allocator.teleport(self._players)
 
     @stage('mapgame-equip-weapons')
     def stage_mapgame_equip_weapons(self):
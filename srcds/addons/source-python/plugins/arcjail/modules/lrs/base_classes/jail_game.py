@@ -14,6 +14,7 @@
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
 from ....internal_events import InternalEvent
+from ....resource.timer_wheel import timer_wheel
 
 from ...players import broadcast, player_manager
 
@@ -48,7 +49,6 @@ class JailGame(BaseGame):
         super().__init__(players, **kwargs)
 
         self._popups = {}
-        self._delays = []
 
     @stage('set-initial-status')
     def stage_set_initial_status(self):
@@ -84,13 +84,13 @@ class JailGame(BaseGame):
 
         self._popups.clear()
 
+    def delay(self, seconds, callback, *args):
+        """Schedule a callback that is cancelled along with the game."""
+        return timer_wheel.delay(seconds, callback, *args, owner=self)
+
     @stage('cancel-delays')
     def stage_cancel_delays(self):
-        for delay in self._delays:
-            if delay.running:
-                delay.cancel()
-
-        self._delays.clear()
+        timer_wheel.cancel_owner(self)
 
     @stage('abort')
     def stage_abort(self):
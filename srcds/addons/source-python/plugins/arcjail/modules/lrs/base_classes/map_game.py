@@ -14,14 +14,12 @@
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
 from contextlib import suppress
-from random import shuffle
 
 from cvars import ConVar
 from entities.constants import INVALID_ENTITY_INDEX
 from entities.entity import Entity
 from entities.helpers import edict_from_index
 
-from ...games import Push
 from ...games.base_classes.map_game import DEFAULT_GRAVITY
 from ...equipment_switcher import (
     register_weapon_drop_filter, register_weapon_pickup_filter,
@@ -29,7 +27,7 @@ from ...equipment_switcher import (
     unregister_weapon_pickup_filter)
 from ...falldmg_protector import unprotect
 from ...jail_map import (
-    get_games, get_map_string, register_push_handler, teleport_player,
+    get_games, get_map_string, register_push_handler,
     unregister_push_handler)
 from ...noblock import lock as lock_noblock
 from ...noblock import unlock as unlock_noblock
@@ -98,7 +96,6 @@ class MapGame(PrepareTime):
     def __init__(self, players, **kwargs):
         super().__init__(players, **kwargs)
 
-        self._pushes = {}
         self._cvars = {
             'pushscale': 1,
             'timescale': 1,
@@ -106,17 +103,7 @@ class MapGame(PrepareTime):
         }
         self.map_data = kwargs['map_data']
 
-        for attr_name in dir(self):
-            try:  # Be ready for undefined (undefined yet) attributes
-                attr = getattr(self, attr_name)
-            except AttributeError:
-                continue
-
-            if not isinstance(attr, Push):
-                continue
-
-            attr.game_instance = self
-            self._pushes[(attr.slot_id, attr.push_id)] = attr
+        self._pushes = self.bind_push_handlers()
 
     @property
     def caption(self):
@@ -252,11 +239,9 @@ class MapGame(PrepareTime):
     @stage('mapgame-teleport-players')
     def stage_mapgame_teleport_players(self):
         """Teleport players and game leader."""
-        spawnpoints = list(self.map_data.get_spawnpoints('team1'))
-        shuffle(spawnpoints)
-
-        for player in self._players:
-            teleport_player(player, spawnpoints.pop())
+        spawnpoint_allocator = self.map_data.get_spawnpoint_allocator('team1')
+        spawnpoint_allocator.shuffle()
+        spawnpoint_allocator.teleport(self._players)
 
     @stage('mapgame-equip-weapons')
     def stage_mapgame_equip_weapons(self):
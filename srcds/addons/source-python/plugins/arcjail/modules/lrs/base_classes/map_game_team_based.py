@@ -13,9 +13,7 @@
 # You should have received a copy of the GNU General Public License
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
-from random import shuffle
-
-from ...jail_map import get_games, teleport_player
+from ...jail_map import get_games
 
 from .. import stage
 
@@ -33,15 +31,13 @@ class MapGameTeamBased(MapGame):
 
     @stage('mapgame-teleport-players2')
     def stage_mapgame_teleport_players2(self):
-        spawnpoints = list(self.map_data.get_spawnpoints('team1'))
-        shuffle(spawnpoints)
-
-        teleport_player(self.prisoner, spawnpoints.pop())
+        for team, player in (('team1', self.prisoner),
+                             ('team2', self.guard)):
 
-        spawnpoints = list(self.map_data.get_spawnpoints('team2'))
-        shuffle(spawnpoints)
+            spawnpoint_allocator = self.map_data.get_spawnpoint_allocator(team)
 
-        teleport_player(self.guard, spawnpoints.pop())
+            spawnpoint_allocator.shuffle()
+            spawnpoint_allocator.teleport((player, ))
 
     @classmethod
     def get_available_launchers(cls):
@@ -14,7 +14,7 @@
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
 from events.manager import event_manager
-from listeners.tick import Delay, on_tick_listener_manager
+from listeners.tick import on_tick_listener_manager
 from messages import TextMsg
 
 from ....internal_events import internal_event_manager
@@ -69,7 +69,7 @@ class PrepareTime(JailGame):
                 self.undo_stages('prepare-start')
                 self.set_stage_group('prepare-continue')
 
-            self._prepare_delay = Delay(
+            self._prepare_delay = self.delay(
                 config_manager['prepare_timeout'], callback)
 
             def countdown(ticks_left):
@@ -86,7 +86,8 @@ class PrepareTime(JailGame):
                 if config_manager['countdown_sound'] is not None:
                     config_manager['countdown_sound'].play(*indexes)
 
-                self._prepare_countdown = Delay(1.0, countdown, ticks_left - 1)
+                self._prepare_countdown = self.delay(
+                    1.0, countdown, ticks_left - 1)
 
             countdown(int(config_manager['prepare_timeout']))
 
@@ -146,7 +147,7 @@ class PrepareTime(JailGame):
     @stage('prepare-cancel-delays')
     def stage_prepare_cancel_delays(self):
         for delay in (self._prepare_delay, self._prepare_countdown):
-            if delay is not None and delay.running:
+            if delay is not None:
                 delay.cancel()
 
     @stage('prepare-cancel-countdown')
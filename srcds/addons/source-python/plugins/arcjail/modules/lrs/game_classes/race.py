@@ -15,15 +15,13 @@
 
 from random import choice
 
-from listeners.tick import Delay
 from players.teams import teams_by_name
 
 from ...games.game_classes.race import (
-    MAX_RECOLLECT_ITERATIONS, RECOLLECT_PLAYERS_INTERVAL,
-    strings_module as strings_games)
+    COLLECT_PLAYERS_TIMEOUT, strings_module as strings_games)
 from ...jail_map import get_players_in_area
 
-from .. import add_available_game, push, stage
+from .. import add_available_game, game_internal_event_handler, push, stage
 from ..base_classes.map_game import MapGame
 
 
@@ -40,7 +38,8 @@ class RaceBase(MapGame):
     def __init__(self, players, **kwargs):
         super().__init__(players, **kwargs)
 
-        self._recollect_delay = None
+        self._collect_area_type = None
+        self._collect_delay = None
 
     @staticmethod
     def _filter_func(player):
@@ -54,55 +53,85 @@ class RaceBase(MapGame):
 
     @stage('cancel-recollect-delay')
     def stage_cancel_recollect_delay(self):
-        if self._recollect_delay is not None:
-            if self._recollect_delay.running:
-                self._recollect_delay.cancel()
+        self._collect_area_type = None
 
-            self._recollect_delay = None
+        if self._collect_delay is not None:
+            self._collect_delay.cancel()
+            self._collect_delay = None
 
     @push(None, 'end_game')
     def push_end_game(self, args):
         self.set_stage_group('draw')
 
+    def start_collecting(self, area_type):
+        """Wait for players in the areas of the given type.
 
-class RaceSingleWinnerStandard(RaceBase):
-    caption = strings_games['title single_winner standard']
-    module = 'race_single_winner_standard'
+        Calls players_collected() with the players that are in those
+        areas now or enter them within COLLECT_PLAYERS_TIMEOUT.
+        """
+        if self._collect_area_type is not None:
+            return
 
-    def collect_winners(self, iteration=1):
-        winners = set()
-        for area_name in self.map_data.get_areas('winners'):
-            winners.update(get_players_in_area(area_name))
+        self._collect_area_type = area_type
+        if self._check_collected_players():
+            return
 
-        winners = list(filter(self._filter_func, winners))
+        self._collect_delay = self.delay(
+            COLLECT_PLAYERS_TIMEOUT, self._collect_timed_out)
 
-        if not winners:
-            if iteration == MAX_RECOLLECT_ITERATIONS:
-                self.set_stage_group('draw')
+    def _check_collected_players(self):
+        players = set()
+        for area_name in self.map_data.get_areas(self._collect_area_type):
+            players.update(get_players_in_area(area_name))
 
-            else:
-                self._recollect_delay = Delay(
-                    RECOLLECT_PLAYERS_INTERVAL,
-                    self.collect_winners,
-                    iteration + 1,
-                )
+        players = list(filter(self._filter_func, players))
+        if not players:
+            return False
 
-        else:
-            self._results['winner'] = winner = choice(tuple(winners))
+        self.stage_cancel_recollect_delay()
+        self.players_collected(players)
+        return True
 
-            if winner == self.prisoner:
-                self._results['loser'] = self.guard
-            else:
-                self._results['loser'] = self.prisoner
+    def _collect_timed_out(self):
+        self._collect_delay = None
+        self._collect_area_type = None
+        self.set_stage_group('draw')
 
-            self.set_stage_group('win')
+    def players_collected(self, players):
+        raise NotImplementedError
+
+    @game_internal_event_handler(
+        'race-player-entered-area', 'player_entered_area')
+    def event_race_player_entered_area(self, player, area_name):
+        if self._collect_area_type is None:
+            return
+
+        if area_name not in (
+                area_name_.lower() for area_name_ in
+                self.map_data.get_areas(self._collect_area_type)):
 
-    @push(None, 'race_player_won')
-    def push_race_player_won(self, args):
-        if self._recollect_delay is not None:
             return
 
-        self.collect_winners()
+        self._check_collected_players()
+
+
+class RaceSingleWinnerStandard(RaceBase):
+    caption = strings_games['title single_winner standard']
+    module = 'race_single_winner_standard'
+
+    def players_collected(self, players):
+        self._results['winner'] = winner = choice(tuple(players))
+
+        if winner == self.prisoner:
+            self._results['loser'] = self.guard
+        else:
+            self._results['loser'] = self.prisoner
+
+        self.set_stage_group('win')
+
+    @push(None, 'race_player_won')
+    def push_race_player_won(self, args):
+        self.start_collecting('winners')
 
 add_available_game(RaceSingleWinnerStandard)
 
@@ -111,39 +140,18 @@ class RaceSingleLoserStandard(RaceBase):
     caption = strings_games['title single_loser standard']
     module = 'race_single_loser_standard'
 
-    def collect_losers(self, iteration=1):
-        losers = set()
-        for area_name in self.map_data.get_areas('losers'):
-            losers.update(get_players_in_area(area_name))
-
-        losers = list(filter(self._filter_func, losers))
-
-        if not losers:
-            if iteration == MAX_RECOLLECT_ITERATIONS:
-                self.set_stage_group('draw')
-
-            else:
-                self._recollect_delay = Delay(
-                    RECOLLECT_PLAYERS_INTERVAL,
-                    self.collect_losers,
-                    iteration + 1,
-                )
+    def players_collected(self, players):
+        self._results['loser'] = loser = choice(tuple(players))
 
+        if loser == self.prisoner:
+            self._results['winner'] = self.guard
         else:
-            self._results['loser'] = loser = choice(tuple(losers))
-
-            if loser == self.prisoner:
-                self._results['winner'] = self.guard
-            else:
-                self._results['winner'] = self.prisoner
+            self._results['winner'] = self.prisoner
 
-            self.set_stage_group('win')
+        self.set_stage_group('win')
 
     @push(None, 'race_player_lost')
     def push_race_player_lost(self, args):
-        if self._recollect_delay is not None:
-            return
-
-        self.collect_losers()
+        self.start_collecting('losers')
 
 add_available_game(RaceSingleLoserStandard)
@@ -15,7 +15,6 @@
 
 from entities.constants import DamageTypes
 from events import event_manager
-from listeners.tick import Delay
 from memory import make_object
 from weapons.entity import Weapon
 
@@ -216,8 +215,7 @@ class Shot4Shot(CombatGame):
         opponent = self.prisoner if player == self.guard else self.guard
 
         self._shots_fired += 1
-        self._delays.append(Delay(
-            BULLET_TRAVEL_TIME, self._competitive_bullet_hit, opponent))
+        self.delay(BULLET_TRAVEL_TIME, self._competitive_bullet_hit, opponent)
 
     def _competitive_bullet_hit(self, opponent):
         score_guard = self._score[self.guard.index]
@@ -13,8 +13,6 @@
 # You should have received a copy of the GNU General Public License
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
-from listeners.tick import Delay
-
 from controlled_cvars.handlers import float_handler
 
 from ...resource.strings import build_module_strings
@@ -106,8 +104,7 @@ class WinReward(JailGame):
         def timeout_callback():
             self.set_stage_group('winreward-timed-out')
 
-        self._delays.append(
-            Delay(config_manager['duration'], timeout_callback))
+        self.delay(config_manager['duration'], timeout_callback)
 
     @stage('winreward-timed-out')
     def stage_wireward_timed_out(self):
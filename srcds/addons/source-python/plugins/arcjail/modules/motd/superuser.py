@@ -13,12 +13,11 @@
 # You should have received a copy of the GNU General Public License
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
-import json
-
 from players.helpers import get_client_language
 
 from ...models.arcjail_user import ArcjailUser as DB_ArcjailUser
 from ...models.item import Item as DB_Item
+from ...models.user_item import UserItem as DB_UserItem
 from ...resource.sqlalchemy import Session
 from ...resource.strings import build_module_strings
 
@@ -78,12 +77,9 @@ def send_page(player):
         if data['action'] == "view-inventory":
             inventory_items = []
 
-            for item_id in json.loads(db_arcjail_user.slot_data):
-                db_item = db_session.query(DB_Item).filter_by(
-                    id=item_id).first()
-
-                if db_item is None:
-                    continue
+            for db_item in db_session.query(DB_Item).join(
+                    DB_UserItem, DB_UserItem.item_id == DB_Item.id).filter(
+                    DB_UserItem.steamid == data['steamid']):
 
                 item_instance = item_classes[db_item.class_id][
                     db_item.instance_id]
@@ -135,19 +131,14 @@ def send_page(player):
                     'popup_error': error.get_string(language),
                 }
 
-            slot_data = json.loads(db_arcjail_user.slot_data)
-            for item_id in slot_data:
-                db_item = db_session.query(DB_Item).filter_by(
-                    id=item_id).first()
-
-                if db_item is None:
-                    continue
-
-                if (db_item.class_id, db_item.instance_id) == (
-                        data['class_id'], data['instance_id']):
+            db_item = db_session.query(DB_Item).join(
+                DB_UserItem, DB_UserItem.item_id == DB_Item.id).filter(
+                DB_UserItem.steamid == data['steamid'],
+                DB_Item.class_id == data['class_id'],
+                DB_Item.instance_id == data['instance_id']).first()
 
-                    db_item.amount += data['amount']
-                    break
+            if db_item is not None:
+                db_item.amount += data['amount']
 
             else:
                 db_item = DB_Item()
@@ -157,10 +148,12 @@ def send_page(player):
                 db_item.current_owner = data['steamid']
 
                 db_session.add(db_item)
-                db_session.commit()
+                db_session.flush()
 
-                slot_data.append(db_item.id)
-                db_arcjail_user.slot_data = json.dumps(slot_data)
+                db_user_item = DB_UserItem()
+                db_user_item.steamid = data['steamid']
+                db_user_item.item_id = db_item.id
+                db_session.add(db_user_item)
 
             db_session.commit()
             db_session.close()
@@ -14,13 +14,13 @@
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
 from spam_proof_commands.say import SayCommand
-from events import Event
 from filters.players import PlayerIter
-from listeners.tick import Delay
 
 from controlled_cvars.handlers import bool_handler, float_handler
 
+from ..resource.profiler import Event
 from ..resource.strings import build_module_strings
+from ..resource.timer_wheel import ROUND, timer_wheel
 
 from .players import player_manager, tell
 
@@ -98,9 +98,6 @@ def get_noblock_denial_reason(player):
 
 @Event('round_start')
 def on_round_start(game_event):
-    for delay in _delays.values():
-        delay.cancel()
-
     _delays.clear()
     unlock()
 
@@ -129,8 +126,8 @@ def say_noblock(command, index, team_only):
         else:
             set_force_off(player)
 
-    _delays[player.index] = Delay(
-        config_manager['chat_command_duration'], callback)
+    _delays[player.index] = timer_wheel.delay(
+        config_manager['chat_command_duration'], callback, owner=ROUND)
 
     if config_manager['default']:
         set_force_off(player)
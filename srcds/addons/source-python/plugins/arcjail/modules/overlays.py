@@ -13,32 +13,26 @@
 # You should have received a copy of the GNU General Public License
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
-from events import Event
-from listeners.tick import Delay
-
 from ..classes.base_player_manager import BasePlayerManager
 from ..internal_events import InternalEvent
+from ..resource.profiler import Event
+from ..resource.timer_wheel import timer_wheel
 
 
 class OverlayPlayer:
     def __init__(self, player):
         self.player = player
         self._overlays = []
-        self._delays = []
 
     def show(self, path, seconds=-1):
         self._overlays.insert(0, path)
         if seconds > 0:
-            self._delays.append(Delay(seconds, self._remove, path))
+            timer_wheel.delay(seconds, self._remove, path, owner=self)
 
         self._update()
 
     def clear(self):
-        for delay in self._delays:
-            if delay.running:
-                delay.cancel()
-
-        self._delays.clear()
+        timer_wheel.cancel_owner(self)
 
         self._overlays.clear()
         self._update()
@@ -64,7 +58,8 @@ def on_player_created(player):
 
 @InternalEvent('player_deleted')
 def on_player_deleted(player):
-    overlay_player_manager.delete(player)
+    overlay_player = overlay_player_manager.delete(player)
+    timer_wheel.cancel_owner(overlay_player)
 
 
 @Event('round_start')
@@ -14,10 +14,10 @@
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
 from colors import Color
-from events import Event
 from players.helpers import index_from_userid
 
 from ..internal_events import InternalEvent
+from ..resource.profiler import Event
 
 
 DEFAULT_COLOR = Color(255, 255, 255)
@@ -13,7 +13,6 @@
 # You should have received a copy of the GNU General Public License
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
-from events import Event
 from filters.players import PlayerIter
 from listeners import OnClientActive, OnClientDisconnect, OnLevelInit
 from messages import SayText2
@@ -21,6 +20,7 @@ from players.entity import Player
 
 from ..classes.base_player_manager import BasePlayerManager
 from ..internal_events import InternalEvent
+from ..resource.profiler import Event
 from ..resource.strings import COLOR_SCHEME, strings_common
 
 
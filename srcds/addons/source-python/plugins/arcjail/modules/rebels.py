@@ -14,10 +14,8 @@
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
 from commands.client import ClientCommand
-from events import Event
 from filters.players import PlayerIter
 from filters.entities import EntityIter
-from listeners.tick import Delay
 
 from mathlib import NULL_VECTOR
 
@@ -25,7 +23,9 @@ from controlled_cvars.handlers import (bool_handler, color_handler,
                                        list_handler, sound_handler)
 
 from ..internal_events import InternalEvent
+from ..resource.profiler import Event
 from ..resource.strings import build_module_strings
+from ..resource.timer_wheel import ROUND, get_player_owner, timer_wheel
 
 from . import build_module_config
 from .admin import section
@@ -229,7 +229,8 @@ def mark_weapon_hot(entity):
     def cool_weapon(entity=entity):
         _hot_weapons.pop(entity.index, None)
 
-    _hot_weapons[entity.index] = Delay(HOT_WEAPON_TIMEOUT, cool_weapon)
+    _hot_weapons[entity.index] = timer_wheel.delay(
+        HOT_WEAPON_TIMEOUT, cool_weapon, owner=ROUND)
 
 
 @Event('player_death_real')
@@ -341,6 +342,7 @@ def on_player_deleted(player):
 @Event('round_start')
 def on_round_start(game_event):
     reset_rebels()
+    _hot_weapons.clear()
 
     global _round_end
     _round_end = False
@@ -387,7 +389,7 @@ def cmd_on_drop(command, index):
 
             mark_weapon_hot(entity)
 
-    Delay(0, confirm_weapon_drop)
+    timer_wheel.delay(0, confirm_weapon_drop, owner=get_player_owner(player))
 
     return True
 
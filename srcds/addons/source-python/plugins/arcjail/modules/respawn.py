@@ -13,7 +13,6 @@
 # You should have received a copy of the GNU General Public License
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
-from events import Event
 from filters.players import PlayerIter
 from menus import PagedMenu, PagedOption
 from players.constants import LifeState
@@ -21,6 +20,7 @@ from players.constants import LifeState
 from controlled_cvars.handlers import bool_handler
 
 from ..internal_events import InternalEvent
+from ..resource.profiler import Event
 from ..resource.strings import build_module_strings
 
 from . import build_module_config
@@ -53,6 +53,7 @@ def check_rewards():
             continue
 
         arcjail_user.last_online_reward = current_time
+        arcjail_user.mark_dirty()
         arcjail_user.give_item('gift', 'online_reward', amount=1, async=True)
 
         item_instance = get_item_instance('gift', 'online_reward')
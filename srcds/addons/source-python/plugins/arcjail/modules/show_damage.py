@@ -13,7 +13,6 @@
 # You should have received a copy of the GNU General Public License
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
-from listeners.tick import Delay
 from messages import TextMsg
 
 from controlled_cvars.handlers import sound_nullable_handler, string_handler
@@ -21,6 +20,7 @@ from controlled_cvars.handlers import sound_nullable_handler, string_handler
 from ..internal_events import InternalEvent
 from ..classes.base_player_manager import BasePlayerManager
 from ..resource.strings import build_module_strings
+from ..resource.timer_wheel import get_player_owner, timer_wheel
 
 from . import build_module_config
 from .overlays import show_overlay
@@ -79,13 +79,13 @@ class ShowDamagePlayer:
             )
 
         # Cancel delays if any
-        if (self._reset_text_delay is not None and
-                self._reset_text_delay.running):
-
+        if self._reset_text_delay is not None:
             self._reset_text_delay.cancel()
 
         # Relaunch delays
-        self._reset_text_delay = Delay(TEXT_VISIBLE_TIMEOUT, self._reset_text)
+        self._reset_text_delay = timer_wheel.delay(
+            TEXT_VISIBLE_TIMEOUT, self._reset_text,
+            owner=get_player_owner(self.player))
 
 
 show_damage_player_manager = BasePlayerManager(ShowDamagePlayer)
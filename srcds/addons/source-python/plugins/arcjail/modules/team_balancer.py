@@ -17,7 +17,6 @@ from enum import IntEnum
 
 from commands.client import ClientCommand
 from cvars import cvar
-from events import Event
 from messages import TextMsg, VGUIMenu
 from players.teams import teams_by_name
 
@@ -25,6 +24,7 @@ from controlled_cvars import InvalidValue
 from controlled_cvars.handlers import bool_handler, sound_nullable_handler
 
 from ..internal_events import InternalEvent
+from ..resource.profiler import Event
 from ..resource.strings import build_module_strings
 
 from . import build_module_config
@@ -13,12 +13,11 @@
 # You should have received a copy of the GNU General Public License
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
-from listeners.tick import Delay
-
 from controlled_cvars.handlers import bool_handler, sound_handler
 
 from ..arcjail import load_downloadables
 from ..internal_events import InternalEvent
+from ..resource.timer_wheel import get_player_owner, timer_wheel
 
 from . import build_module_config
 from .players import player_manager
@@ -53,8 +52,9 @@ def announce(player):
 @InternalEvent('player_respawn')
 def on_player_respawn(player):
     if player.index not in _announced_uids:
-        _announced_uids[player.index] = Delay(
-            SPAWN_ANNOUNCE_DELAY, announce, player)
+        _announced_uids[player.index] = timer_wheel.delay(
+            SPAWN_ANNOUNCE_DELAY, announce, player,
+            owner=get_player_owner(player))
 
 
 @InternalEvent('players_loaded')
@@ -66,10 +66,4 @@ def on_players_loaded():
 
 @InternalEvent('player_deleted')
 def on_player_deleted(player):
-    if player.index in _announced_uids:
-        if (_announced_uids[player.index] is not None and
-                _announced_uids[player.index].running):
-
-            _announced_uids[player.index].cancel()
-
-        del _announced_uids[player.index]
+    _announced_uids.pop(player.index, None)
@@ -0,0 +1,286 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Fixed-size thread pool for database jobs.
+
+Jobs can be tagged with one or more keys (usually SteamIDs). Jobs that share
+a key are executed strictly in submission order, one at a time, so that
+e.g. a player's load can never race their save. Jobs without keys run as
+soon as a worker is free.
+
+An executor without workers runs every job synchronously on the thread
+that submits it.
+"""
+
+from collections import deque
+from concurrent.futures import Future
+from queue import Empty, Queue
+from threading import Condition, Lock
+from time import time
+from traceback import format_exc
+
+from listeners import OnTick
+from listeners.tick import GameThread
+
+from sqlalchemy.pool import StaticPool
+
+from ..internal_events import InternalEvent
+
+from .config import config
+from .logger import logger
+from .sqlalchemy import engine
+
+
+class DBJob:
+    def __init__(self, target, args, keys, callback):
+        self.target = target
+        self.args = args
+        self.keys = keys
+        self.callback = callback
+        self.future = Future()
+        self.submitted_at = time()
+
+        # Number of key lanes in which this job is not at the head yet
+        self.blockers = 0
+
+    def run(self):
+        if not self.future.set_running_or_notify_cancel():
+            return
+
+        try:
+            result = self.target(*self.args)
+        except Exception as e:
+            logger.log_warning("DBExecutor: Exception in {}:\n{}".format(
+                self.target, format_exc()))
+
+            self.future.set_exception(e)
+        else:
+            self.future.set_result(result)
+
+
+class DBExecutor:
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+
+        self._lock = Lock()
+        self._idle = Condition(self._lock)
+        self._ready = Queue()
+        self._lanes = {}
+        self._workers = []
+        self._callbacks = Queue()
+        self._running = False
+
+        # Submitted jobs that haven't been released from their lanes yet
+        self._pending = 0
+
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'queued': 0,
+            'in_flight': 0,
+            'max_queued': 0,
+            'total_latency': 0.0,
+            'max_latency': 0.0,
+        }
+
+    def start(self):
+        if self._running or not self.max_workers:
+            return
+
+        self._running = True
+        for i in range(self.max_workers):
+            worker = GameThread(target=self._work)
+            worker.start()
+            self._workers.append(worker)
+
+    def shutdown(self):
+        """Finish all submitted jobs and stop the workers.
+
+        Jobs submitted after this are executed synchronously.
+        """
+        if not self._running:
+            return
+
+        # Jobs waiting in key lanes only reach the ready queue once the
+        # job before them finishes, so the workers can't be told to stop
+        # before every lane has drained
+        with self._lock:
+            self._running = False
+            while self._pending:
+                self._idle.wait()
+
+        for worker in self._workers:
+            self._ready.put(None)
+
+        for worker in self._workers:
+            worker.join()
+
+        self._workers.clear()
+        self.process_callbacks()
+
+    def submit(self, target, *args, key=None, keys=(), callback=None):
+        """Schedule target(*args) and return a Future of its result.
+
+        If given, callback(future) is called on the game thread once the
+        job is done.
+        """
+        keys = set(keys)
+        if key is not None:
+            keys.add(key)
+
+        job = DBJob(target, args, tuple(keys), callback)
+
+        with self._lock:
+            self._stats['submitted'] += 1
+
+            # Checked under the lock, so shutdown() can't miss this job
+            running = self._running
+            if running:
+                self._enqueue(job)
+
+        if not running:
+            self._execute(job)
+            self.process_callbacks()
+
+        return job.future
+
+    def _enqueue(self, job):
+        """Put the job into its key lanes. Must be called with the lock."""
+        self._pending += 1
+        self._stats['queued'] += 1
+        self._stats['max_queued'] = max(
+            self._stats['max_queued'], self._stats['queued'])
+
+        for key in job.keys:
+            lane = self._lanes.setdefault(key, deque())
+            if lane:
+                job.blockers += 1
+
+            lane.append(job)
+
+        if not job.blockers:
+            self._ready.put(job)
+
+    def _execute(self, job):
+        with self._lock:
+            self._stats['in_flight'] += 1
+
+        job.run()
+
+        latency = time() - job.submitted_at
+        with self._lock:
+            self._stats['in_flight'] -= 1
+            self._stats['completed'] += 1
+            if (not job.future.cancelled() and
+                    job.future.exception() is not None):
+                self._stats['failed'] += 1
+
+            self._stats['total_latency'] += latency
+            self._stats['max_latency'] = max(
+                self._stats['max_latency'], latency)
+
+        if job.callback is not None:
+            self._callbacks.put(job)
+
+    def _release(self, job):
+        with self._lock:
+            for key in job.keys:
+                lane = self._lanes[key]
+                lane.popleft()
+
+                if not lane:
+                    del self._lanes[key]
+                    continue
+
+                next_job = lane[0]
+                next_job.blockers -= 1
+                if not next_job.blockers:
+                    self._ready.put(next_job)
+
+            self._pending -= 1
+            if not self._pending:
+                self._idle.notify_all()
+
+    def _work(self):
+        while True:
+            job = self._ready.get()
+            if job is None:
+                break
+
+            with self._lock:
+                self._stats['queued'] -= 1
+
+            try:
+                self._execute(job)
+            finally:
+                self._release(job)
+
+    def process_callbacks(self):
+        """Call callbacks of finished jobs. Must run on the game thread."""
+        while True:
+            try:
+                job = self._callbacks.get_nowait()
+            except Empty:
+                break
+
+            try:
+                job.callback(job.future)
+            except Exception:
+                logger.log_warning(
+                    "DBExecutor: Exception in callback {}:\n{}".format(
+                        job.callback, format_exc()))
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['lanes'] = len(self._lanes)
+
+        stats['workers'] = len(self._workers)
+        stats['avg_latency'] = (
+            stats['total_latency'] / stats['completed']
+            if stats['completed'] else 0.0)
+
+        return stats
+
+
+max_workers = config['database'].getint('workers', fallback=2)
+
+# The game thread uses the database too, so a single shared connection
+# can't be handed to DB threads at all
+if isinstance(engine.pool, StaticPool):
+    if max_workers:
+        logger.log_warning(
+            "DBExecutor: The database uses a single connection, ignoring "
+            "workers={} and running database jobs on the game "
+            "thread".format(max_workers))
+
+    max_workers = 0
+
+db_executor = DBExecutor(max_workers)
+
+db_executor.start()
+
+
+@OnTick
+def listener_on_tick():
+    db_executor.process_callbacks()
+
+
+# Run after the save queue and the credit ledger have flushed
+@InternalEvent('unload', priority=-2)
+def on_unload():
+    db_executor.shutdown()
@@ -0,0 +1,161 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Opt-in per-handler profiler for game events and internal events.
+
+While the profiler is disabled, profiled call sites only check a single
+attribute before calling the handler directly.
+"""
+
+from time import perf_counter
+
+from commands.server import ServerCommand
+from core import echo_console
+import events
+
+from .logger import logger
+
+
+DEFAULT_REPORT_LIMIT = 30
+
+
+def get_handler_name(handler):
+    """Return a readable name for the handler to report it under."""
+    profile_name = getattr(handler, 'profile_name', None)
+    if profile_name is not None:
+        return profile_name
+
+    qualname = getattr(handler, '__qualname__', None)
+    if qualname is None:
+        return repr(handler)
+
+    return "{}.{}".format(handler.__module__, qualname)
+
+
+class HandlerStats:
+    __slots__ = ('calls', 'total_duration', 'max_duration', 'exceptions')
+
+    def __init__(self):
+        self.calls = 0
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+        self.exceptions = 0
+
+
+class HandlerProfiler:
+    def __init__(self):
+        self.enabled = False
+        self._stats = {}
+
+    def call(self, event_name, handler, *args, **kwargs):
+        """Call the handler and record the call under the event name."""
+        key = event_name, get_handler_name(handler)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = HandlerStats()
+
+        start_time = perf_counter()
+        try:
+            return handler(*args, **kwargs)
+        except Exception:
+            stats.exceptions += 1
+            raise
+        finally:
+            duration = perf_counter() - start_time
+
+            stats.calls += 1
+            stats.total_duration += duration
+            stats.max_duration = max(stats.max_duration, duration)
+
+    def reset(self):
+        self._stats.clear()
+
+    def get_report(self, limit=DEFAULT_REPORT_LIMIT):
+        """Return report lines for the slowest handlers, slowest first."""
+        items = sorted(
+            self._stats.items(),
+            key=lambda item: item[1].total_duration, reverse=True)
+
+        lines = []
+        for (event_name, handler_name), stats in items[:limit]:
+            lines.append(
+                "{:.4f}s total, {:.4f}s max, {} calls, {} exceptions - "
+                "{}: {}".format(
+                    stats.total_duration, stats.max_duration, stats.calls,
+                    stats.exceptions, event_name, handler_name))
+
+        return lines
+
+handler_profiler = HandlerProfiler()
+
+
+class Event(events.Event):
+    """events.Event that reports its handler to the handler profiler."""
+    def __call__(self, callback):
+        def profiled_callback(game_event):
+            if handler_profiler.enabled:
+                return handler_profiler.call(
+                    game_event.name, callback, game_event)
+
+            return callback(game_event)
+
+        profiled_callback.profile_name = get_handler_name(callback)
+
+        return super().__call__(profiled_callback)
+
+
+@ServerCommand('arcjail_profiler')
+def server_arcjail_profiler(command):
+    try:
+        action = command[1]
+    except IndexError:
+        echo_console("Usage: arcjail_profiler <on|off|reset|report> [limit]")
+        return
+
+    if action == 'on':
+        handler_profiler.enabled = True
+        echo_console("Handler profiler enabled")
+
+    elif action == 'off':
+        handler_profiler.enabled = False
+        echo_console("Handler profiler disabled")
+
+    elif action == 'reset':
+        handler_profiler.reset()
+        echo_console("Handler profiler stats cleared")
+
+    elif action == 'report':
+        try:
+            limit = int(command[2])
+        except IndexError:
+            limit = DEFAULT_REPORT_LIMIT
+        except ValueError:
+            echo_console("Error: limit should be an integer")
+            return
+
+        lines = handler_profiler.get_report(limit)
+        if not lines:
+            echo_console("No handler calls were profiled")
+            return
+
+        for line in lines:
+            echo_console(line)
+
+        logger.log_message("Handler profiler report:\n\t{}".format(
+            "\n\t".join(lines)))
+
+    else:
+        echo_console("Unknown action '{}'".format(action))
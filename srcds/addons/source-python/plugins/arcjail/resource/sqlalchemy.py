@@ -13,16 +13,224 @@
 # You should have received a copy of the GNU General Public License
 # along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
 
-from sqlalchemy import create_engine
+import sqlite3
+from threading import Lock
+from time import time
+
+from sqlalchemy import and_, bindparam, create_engine, event
+from sqlalchemy.engine.url import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
 
 from .config import config
+from .logger import logger
 from .paths import ARCJAIL_DATA_PATH
 
+try:
+    from sqlalchemy.dialects.mysql import insert as mysql_insert
+except ImportError:
+    mysql_insert = None
+
+try:
+    from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+except ImportError:
+    postgresql_insert = None
+
+try:
+    from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+except ImportError:
+    sqlite_insert = None
+
+# SQLite only understands ON CONFLICT since 3.24
+if sqlite3.sqlite_version_info < (3, 24, 0):
+    sqlite_insert = None
+
+
+database_config = config['database']
+
+_pool_stats_lock = Lock()
+pool_stats = {
+    'checkouts': 0,
+    'slow_checkouts': 0,
+    'total_wait': 0.0,
+    'max_wait': 0.0,
+}
+
+
+class TimedPoolMixin:
+    """Log connection checkouts that had to wait for a free connection."""
+    slow_checkout_threshold = database_config.getfloat(
+        'slow_checkout_threshold', fallback=0.05)
+
+    def _do_get(self):
+        start_time = time()
+        connection_record = super()._do_get()
+        wait = time() - start_time
+
+        slow = wait >= self.slow_checkout_threshold
+        with _pool_stats_lock:
+            pool_stats['checkouts'] += 1
+            pool_stats['total_wait'] += wait
+            pool_stats['max_wait'] = max(pool_stats['max_wait'], wait)
+
+            if slow:
+                pool_stats['slow_checkouts'] += 1
+
+        if slow:
+            logger.log_warning(
+                "Database connection checkout took {:.3f}s "
+                "({})".format(wait, self.status()))
+
+        return connection_record
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedStaticPool(TimedPoolMixin, StaticPool):
+    pass
+
+
+def get_engine_options(url):
+    if url.get_backend_name() != 'sqlite':
+        return {
+            'poolclass': TimedQueuePool,
+            'pool_size': database_config.getint('pool_size', fallback=5),
+            'max_overflow': database_config.getint(
+                'max_overflow', fallback=10),
+            'pool_timeout': database_config.getint(
+                'pool_timeout', fallback=30),
+            'pool_recycle': database_config.getint(
+                'pool_recycle', fallback=3600),
+        }
+
+    # A single connection is single-threaded only: the game thread's own
+    # sessions would share it with the DB threads, so db_executor runs
+    # jobs on the game thread then, and sqlite3 keeps checking that the
+    # connection isn't used anywhere else
+    if (url.database in (None, '', ':memory:') or
+            database_config.getboolean('sqlite_static_pool', fallback=False)):
+
+        return {'poolclass': TimedStaticPool}
+
+    return {
+        # Connections are shared between the server thread and DB threads
+        'connect_args': {'check_same_thread': False},
+        'poolclass': TimedQueuePool,
+        'pool_size': database_config.getint('pool_size', fallback=5),
+        'max_overflow': database_config.getint('max_overflow', fallback=10),
+        'pool_timeout': database_config.getint('pool_timeout', fallback=30),
+    }
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+
+    journal_mode = database_config.get('sqlite_journal_mode', fallback='WAL')
+    if journal_mode:
+        cursor.execute("PRAGMA journal_mode={}".format(journal_mode))
+
+    synchronous = database_config.get('sqlite_synchronous', fallback='NORMAL')
+    if synchronous:
+        cursor.execute("PRAGMA synchronous={}".format(synchronous))
 
-engine = create_engine(config['database']['uri'].format(
+    cursor.execute("PRAGMA busy_timeout={:d}".format(
+        database_config.getint('sqlite_busy_timeout', fallback=5000)))
+
+    cursor.close()
+
+
+url = make_url(database_config['uri'].format(
     arcjail_data_path=ARCJAIL_DATA_PATH,
 ))
+
+engine = create_engine(url, **get_engine_options(url))
+
+if url.get_backend_name() == 'sqlite':
+    event.listen(engine, 'connect', set_sqlite_pragmas)
+
+
+def get_pool_stats():
+    with _pool_stats_lock:
+        stats = dict(pool_stats)
+
+    stats['status'] = engine.pool.status()
+    return stats
+
+
+def _upsert_fallback(db_session, table, rows, index_elements, update_columns):
+    key_clause = and_(*[
+        table.c[column] == bindparam('_key_' + column)
+        for column in index_elements
+    ])
+
+    # Setting key columns to themselves works as "do nothing on conflict"
+    values = {
+        column: bindparam('_value_' + column)
+        for column in (update_columns or index_elements)
+    }
+
+    update_stmt = table.update().where(key_clause).values(values)
+    insert_stmt = table.insert()
+
+    for row in rows:
+        params = {'_key_' + column: row[column] for column in index_elements}
+        params.update({
+            '_value_' + column: row[column]
+            for column in (update_columns or index_elements)
+        })
+
+        if not db_session.execute(update_stmt, params).rowcount:
+            db_session.execute(insert_stmt, row)
+
+
+def upsert(db_session, table, rows, index_elements, update_columns=()):
+    """Insert rows, updating update_columns of the ones that already exist.
+
+    Rows are matched by index_elements, which must be covered by a primary
+    key or a unique index. With no update_columns existing rows are left
+    intact. Uses a single INSERT ... ON CONFLICT / ON DUPLICATE KEY
+    statement where the database and SQLAlchemy support it.
+    """
+    if not rows:
+        return
+
+    backend = engine.dialect.name
+
+    if backend == 'sqlite' and sqlite_insert is not None:
+        insert = sqlite_insert
+    elif backend == 'postgresql' and postgresql_insert is not None:
+        insert = postgresql_insert
+    elif backend == 'mysql' and mysql_insert is not None:
+        insert = mysql_insert
+    else:
+        _upsert_fallback(
+            db_session, table, rows, index_elements, update_columns)
+
+        return
+
+    stmt = insert(table)
+    if backend == 'mysql':
+        if update_columns:
+            stmt = stmt.on_duplicate_key_update({
+                column: stmt.inserted[column] for column in update_columns
+            })
+        else:
+            stmt = stmt.prefix_with('IGNORE')
+
+    elif update_columns:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=index_elements,
+            set_={column: stmt.excluded[column] for column in update_columns}
+        )
+
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+
+    db_session.execute(stmt, rows)
+
+
 Base = declarative_base()
 Session = sessionmaker(bind=engine)
@@ -0,0 +1,286 @@
+# This file is part of ArcJail.
+#
+# ArcJail is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ArcJail is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ArcJail.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Hierarchical timer wheel for delayed callbacks.
+
+All ArcJail delays live in a single wheel that is advanced by one tick
+listener. Every timer belongs to an owner (a player, a game instance, the
+current round...), and all timers of an owner can be cancelled at once
+without walking them: cancelled timers are simply dropped when the wheel
+reaches them.
+"""
+
+from math import ceil
+from traceback import format_exc
+
+from engines.server import global_vars
+from listeners import OnLevelInit, OnTick
+
+from ..internal_events import InternalEvent
+
+from .logger import logger
+from .profiler import Event
+
+
+# Slot count (as a power of 2) of every level of the wheel. With 8-6-6-6
+# bits the wheel covers 2^26 ticks (12 days at 64 ticks/s), later timers
+# wait in an overflow list.
+WHEEL_LEVEL_BITS = (8, 6, 6, 6)
+
+# Owner of the timers that are cancelled on round start and map change
+ROUND = 'round'
+
+
+def get_player_owner(player):
+    """Return the owner of the timers cancelled once the player leaves."""
+    return 'player', player.index
+
+
+class TimerGroup:
+    __slots__ = ('owner', 'live', 'cancelled')
+
+    def __init__(self, owner):
+        self.owner = owner
+        self.live = 0
+        self.cancelled = False
+
+
+class Timer:
+    __slots__ = ('wheel', 'expires', 'callback', 'args', 'kwargs', 'group',
+                 'pending')
+
+    def __init__(self, wheel, expires, callback, args, kwargs, group):
+        self.wheel = wheel
+        self.expires = expires
+        self.callback = callback
+        self.args = args
+        self.kwargs = kwargs
+        self.group = group
+        self.pending = True
+
+    def __repr__(self):
+        return "<Timer({}, owner={})>".format(self.callback, self.owner)
+
+    @property
+    def owner(self):
+        return self.group.owner
+
+    @property
+    def running(self):
+        return self.pending and not self.group.cancelled
+
+    def cancel(self):
+        """Cancel the timer. Does nothing if it has fired already."""
+        if not self.running:
+            return
+
+        self.wheel._release(self)
+        self.wheel._stats['cancelled'] += 1
+
+
+class TimerWheel:
+    def __init__(self, level_bits=WHEEL_LEVEL_BITS):
+        self._masks = []
+        self._shifts = []
+        self._limits = []
+
+        shift = 0
+        for bits in level_bits:
+            self._masks.append((1 << bits) - 1)
+            self._shifts.append(shift)
+            shift += bits
+            self._limits.append(1 << shift)
+
+        self._span = 1 << shift
+        self._levels = [[[] for i in range(mask + 1)] for mask in self._masks]
+        self._overflow = []
+
+        self._tick = 0
+        self._groups = {}
+        self._live = 0
+
+        self._stats = {
+            'scheduled': 0,
+            'fired': 0,
+            'cancelled': 0,
+            'failed': 0,
+            'cascaded': 0,
+        }
+
+    def __len__(self):
+        return self._live
+
+    def _get_group(self, owner):
+        group = self._groups.get(owner)
+        if group is None:
+            group = self._groups[owner] = TimerGroup(owner)
+
+        return group
+
+    def _insert(self, timer):
+        delta = timer.expires - self._tick
+        for level, limit in enumerate(self._limits):
+            if delta < limit:
+                index = timer.expires >> self._shifts[level]
+                self._levels[level][index & self._masks[level]].append(timer)
+                return
+
+        self._overflow.append(timer)
+
+    def _release(self, timer):
+        timer.pending = False
+        self._live -= 1
+
+        group = timer.group
+        group.live -= 1
+        if not group.live:
+            del self._groups[group.owner]
+
+    def delay(self, seconds, callback, *args, owner=None, **kwargs):
+        """Call callback(*args, **kwargs) in the given number of seconds.
+
+        The delay is rounded up to whole ticks, a zero delay fires on the
+        next tick. Return a Timer that can be cancelled.
+        """
+        ticks = ceil(seconds / global_vars.interval_per_tick - 1e-6)
+        group = self._get_group(owner)
+
+        timer = Timer(
+            self, self._tick + max(1, ticks), callback, args, kwargs, group)
+
+        self._insert(timer)
+
+        group.live += 1
+        self._live += 1
+        self._stats['scheduled'] += 1
+
+        return timer
+
+    def cancel_owner(self, owner):
+        """Cancel all timers of the owner and return their number."""
+        group = self._groups.pop(owner, None)
+        if group is None:
+            return 0
+
+        group.cancelled = True
+        self._live -= group.live
+        self._stats['cancelled'] += group.live
+
+        return group.live
+
+    def count(self, owner):
+        """Return the number of live timers of the owner."""
+        group = self._groups.get(owner)
+        return 0 if group is None else group.live
+
+    def get_owner_counts(self):
+        return {owner: group.live for owner, group in self._groups.items()}
+
+    def clear(self):
+        """Cancel all timers."""
+        for owner in tuple(self._groups):
+            self.cancel_owner(owner)
+
+        for slots in self._levels:
+            for slot in slots:
+                slot.clear()
+
+        self._overflow.clear()
+
+    def _cascade(self, timers):
+        for timer in timers:
+            if timer.running:
+                self._insert(timer)
+                self._stats['cascaded'] += 1
+
+    def tick(self):
+        self._tick += 1
+        tick = self._tick
+
+        # Move timers that are now within reach of a lower level
+        for level in range(1, len(self._levels)):
+            shift = self._shifts[level]
+            if tick & ((1 << shift) - 1):
+                break
+
+            slots = self._levels[level]
+            index = (tick >> shift) & self._masks[level]
+            timers, slots[index] = slots[index], []
+            self._cascade(timers)
+
+        else:
+            if not tick & (self._span - 1):
+                timers, self._overflow = self._overflow, []
+                self._cascade(timers)
+
+        slots = self._levels[0]
+        index = tick & self._masks[0]
+        timers = slots[index]
+        if not timers:
+            return
+
+        slots[index] = []
+        for timer in timers:
+            if not timer.running:
+                continue
+
+            self._release(timer)
+            self._stats['fired'] += 1
+
+            try:
+                timer.callback(*timer.args, **timer.kwargs)
+            except Exception:
+                self._stats['failed'] += 1
+                logger.log_warning(
+                    "TimerWheel.tick: Exception in {}:\n{}".format(
+                        timer.callback, format_exc()))
+
+    def get_stats(self):
+        stats = dict(self._stats)
+        stats['live'] = self._live
+        stats['owners'] = len(self._groups)
+        stats['tick'] = self._tick
+
+        return stats
+
+timer_wheel = TimerWheel()
+
+
+@OnTick
+def listener_on_tick():
+    timer_wheel.tick()
+
+
+# Modules import the wheel before registering their own handlers, so round
+# timers are gone before any of them schedules new ones
+@Event('round_start')
+def on_round_start(game_event):
+    timer_wheel.cancel_owner(ROUND)
+
+
+@OnLevelInit
+def listener_on_level_init(map_name):
+    timer_wheel.cancel_owner(ROUND)
+
+
+@InternalEvent('player_deleted')
+def on_player_deleted(player):
+    timer_wheel.cancel_owner(get_player_owner(player))
+
+
+@InternalEvent('unload')
+def on_unload():
+    timer_wheel.clear()